@@ -0,0 +1,415 @@
+import argparse
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from data_logger import StreamingLogger, write_log
+from simulation import ReactorSimulator
+from worker import SimSnapshot
+from period_predictor import PeriodPredictor
+from inhour import InhourTable, inhour_root_direct
+
+def time_per_call(fn, number=20000, repeat=5):
+    # Best-of-`repeat` average wall time of one call, in microseconds
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+def _design_matrix_feedback(sim, x_new):
+    # The per-call lstsq design-matrix evaluation update_simulation used to do
+    xs = np.atleast_1d(x_new).astype(float)
+    zz = (xs - sim.x_mu) / sim.x_sig
+    A_new = np.column_stack([np.ones_like(zz), zz, zz**2])
+    Y_hat = A_new @ sim.C_temp
+    return Y_hat[0] if np.isscalar(x_new) else Y_hat
+
+def _design_matrix_feedback_derivative(sim, x_new):
+    xs = np.atleast_1d(x_new).astype(float)
+    zz = (xs - sim.x_mu) / sim.x_sig
+    dY_dz = sim.C_temp[1, :] + 2 * sim.C_temp[2, :] * zz.reshape(-1, 1)
+    dY_dx = dY_dz / sim.x_sig
+    return dY_dx[0] if np.isscalar(x_new) else dY_dx
+
+def bench_temp_feedback():
+    sim = ReactorSimulator()
+    power = 2.5e5
+
+    def before():
+        # Three value evaluations and one derivative per tick
+        _design_matrix_feedback(sim, power)
+        _design_matrix_feedback(sim, power)
+        _design_matrix_feedback_derivative(sim, power)
+        _design_matrix_feedback(sim, power)
+
+    def after():
+        # rho + derivative for the kinetics step, fuel temperatures for the history
+        sim.temp_feedback.rho(power)
+        sim.temp_feedback.fuel_temps(power)
+
+    before_us = time_per_call(before)
+    after_us = time_per_call(after)
+    return {"before_us_per_tick": before_us, "after_us_per_tick": after_us, "speedup": before_us / after_us}
+
+def _bank_to_zero_rho(sim, names):
+    # Bisect a common position for `names` at which the rods' reactivity is zero
+    lo, hi = sim.min_position, sim.max_position
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        for name in names:
+            sim.rod_positions[name] = mid
+        if sim.calculate_rod_rho() > 0:
+            hi = mid
+        else:
+            lo = mid
+
+def _set_power(sim, power):
+    sim.reset_simulation_state()
+    sim.power = power
+    sim.C = sim.beta_i / (sim.Lambda * sim.lam_i) * power
+
+def _pulse_simulator(integrator, dollars=2.0, power=50.0, rtol=1e-4):
+    # Critical at `power` on Shim/Reg, then the transient rod is fired for a `dollars` insertion
+    sim = ReactorSimulator()
+    sim.integrator = integrator
+    sim.adaptive_kinetics.rtol = rtol
+    sim.rod_positions["Tran"] = sim.rod_worth.pulse_start_position(dollars)
+    _bank_to_zero_rho(sim, ("Shim1", "Shim2", "Reg"))
+    _set_power(sim, power)
+    sim.rod_positions["Tran"] = sim.max_position
+    sim.rod_rho = sim.calculate_rod_rho()
+    sim.running = True
+    return sim
+
+def _pulse_trajectory(integrator, step, duration=0.2, sample_dt=0.05, rtol=1e-4):
+    # Power sampled every sample_dt; returns (samples, peak power, CPU seconds)
+    sim = _pulse_simulator(integrator, rtol=rtol)
+    n_sub = max(1, int(round(sample_dt / step)))
+    samples = []
+    peak = sim.power
+    start = time.process_time()
+    for _ in range(int(round(duration / sample_dt))):
+        for _ in range(n_sub):
+            sim.advance(sample_dt / n_sub, "OUT")
+            peak = max(peak, sim.power)
+        if integrator == "adaptive":
+            peak = max(peak, sim.adaptive_kinetics.peak_power)
+        samples.append(sim.power)
+    return np.array(samples), peak, time.process_time() - start
+
+def bench_kinetics_accuracy():
+    """Error vs. CPU time for a $2 pulse from 50 W.
+
+    Each scheme is measured against its own converged solution: the legacy
+    semi-implicit step converges to a slightly different model (its b
+    coefficient carries an extra sum(lam_i beta_i)/Lambda * P term), so the
+    gap between the two references is reported separately.
+    """
+    semi_ref, semi_ref_peak, _ = _pulse_trajectory("semi-implicit", 1e-5)
+    ode_ref, ode_ref_peak, _ = _pulse_trajectory("adaptive", 0.05, rtol=1e-9)
+    results = {"model_gap": float(np.max(np.abs(semi_ref - ode_ref) / ode_ref))}
+    for dt in (0.05, 0.01, 1e-3, 1e-4):
+        samples, peak, cpu = _pulse_trajectory("semi-implicit", dt)
+        results[f"semi_dt{dt:g}_err"] = float(np.max(np.abs(samples - semi_ref) / semi_ref))
+        results[f"semi_dt{dt:g}_peak_err"] = abs(peak / semi_ref_peak - 1.0)
+        results[f"semi_dt{dt:g}_cpu_s"] = cpu
+    for rtol in (1e-3, 1e-4, 1e-6):
+        samples, peak, cpu = _pulse_trajectory("adaptive", 0.05, rtol=rtol)
+        results[f"adaptive_rtol{rtol:g}_err"] = float(np.max(np.abs(samples - ode_ref) / ode_ref))
+        results[f"adaptive_rtol{rtol:g}_peak_err"] = abs(peak / ode_ref_peak - 1.0)
+        results[f"adaptive_rtol{rtol:g}_cpu_s"] = cpu
+    return results
+
+def bench_period_predictor():
+    # Cost of one GUI-tick prediction at steady 50 W and while a rod is being withdrawn
+    sim = _pulse_simulator("semi-implicit", dollars=0.3)
+    sim.rod_positions["Tran"] = sim.rod_worth.pulse_start_position(0.3)
+    sim.rod_rho = sim.calculate_rod_rho()
+    predictor = PeriodPredictor(sim)
+    start = time.perf_counter()
+    predictor.tables(sim.integrator)
+    build_s = time.perf_counter() - start
+    steady_us = time_per_call(predictor.predict, number=2000)
+    sim.pressed_state["Tran_up"] = True
+    withdrawing_us = time_per_call(predictor.predict, number=2000)
+    return {"table_build_s": build_s, "steady_us": steady_us, "withdrawing_us": withdrawing_us}
+
+def bench_inhour():
+    # Table lookup vs. the direct root find, plus the table's worst error over random reactivities
+    sim = ReactorSimulator()
+    start = time.perf_counter()
+    table = InhourTable(sim.beta_i, sim.lam_i, sim.Lambda, sim.beta_eff)
+    build_s = time.perf_counter() - start
+    lookup_us = time_per_call(lambda: table.period(23.7))
+    direct_us = time_per_call(lambda: inhour_root_direct(23.7, sim.beta_i, sim.lam_i, sim.Lambda, sim.beta_eff), number=200)
+    return {"table_build_s": build_s, "lookup_us": lookup_us, "direct_us": direct_us, "max_rel_err": table.check()}
+
+def _auto_step_response(demand, warmup=200.0, duration=400.0, dt=0.05):
+    # Auto mode holds 50 W for `warmup` s (the servo finds critical on Reg), then demand steps to `demand`
+    sim = ReactorSimulator()
+    sim.rod_positions.update({"Tran": 480.0, "Reg": 480.0})
+    _bank_to_zero_rho(sim, ("Shim1", "Shim2"))
+    _set_power(sim, 50.0)
+    sim.running = True
+    sim.mode_selected = "Auto"
+    sim.auto_controller.demand = 50.0
+    for _ in range(int(round(warmup / dt))):
+        sim.advance(dt, "OUT")
+    sim.auto_controller.demand = demand
+    n = int(round(duration / dt))
+    power = np.empty(n)
+    for k in range(n):
+        sim.advance(dt, "OUT")
+        power[k] = sim.power
+    return power
+
+def bench_auto_controller(demands=(1e3, 1e4, 1e5, 2.5e5), band=0.02):
+    """Settling time (into +-band of demand), overshoot and shortest 1 s-averaged period after a demand step from 50 W."""
+    dt = 0.05
+    lag = int(round(1.0 / dt))
+    results = {}
+    for demand in demands:
+        power = _auto_step_response(demand, dt=dt)
+        outside = np.nonzero(np.abs(power / demand - 1.0) > band)[0]
+        settle = (outside[-1] + 1) * dt if len(outside) else 0.0
+        rise = np.log(power[lag:] / power[:-lag])
+        min_period = 1.0 / float(rise.max()) if rise.max() > 0 else float("inf")
+        label = f"{demand:g}W"
+        results[f"{label}_settle_s"] = float(settle)
+        results[f"{label}_overshoot"] = float(power.max() / demand - 1.0)
+        results[f"{label}_min_period_s"] = min_period
+    return results
+
+def bench_pulse_sequence(cylinder=650.0, power=50.0):
+    """Pulse fired from critical at 50 W: wall time for the 1 s sequence (incl. the 1 ms TR stroke steps) and the pulse report."""
+    sim = ReactorSimulator()
+    _bank_to_zero_rho(sim, [name for name in sim.rod_names if name != "Tran"])
+    _set_power(sim, power)
+    sim.S = 0.0
+    sim.modes.select("Pulse")
+    sim.modes.cylinder_position = cylinder
+    sim.modes.fire()
+    start = time.perf_counter()
+    while sim.modes.state == "PULSE_FIRED":
+        sim.advance(0.05, "OUT")
+    results = {"wall_ms": (time.perf_counter() - start) * 1e3}
+    results.update({key: float(value) for key, value in sim.modes.pulse_report.items() if value is not None})
+    return results
+
+def _critical_simulator(power=2.5e5, integrator="semi-implicit"):
+    # Running and critical at `power` on the Shims, temperature at its equilibrium, history window as in the GUI
+    sim = ReactorSimulator()
+    sim.integrator = integrator
+    sim.rod_positions.update({"Tran": 960.0, "Reg": 480.0})
+    feedback, _ = sim.temp_feedback.rho(power)
+    lo, hi = sim.min_position, sim.max_position
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        sim.rod_positions.update({"Shim1": mid, "Shim2": mid})
+        if sim.calculate_rod_rho() + feedback > 0:
+            hi = mid
+        else:
+            lo = mid
+    _set_power(sim, power)
+    sim.S = 0.0
+    sim.running = True
+    return sim
+
+def bench_update_simulation():
+    """Cost of one GUI tick of physics (advance + history append) at 250 kW, at 1x and 20x speed."""
+    results = {}
+    for integrator in ("semi-implicit", "adaptive"):
+        sim = _critical_simulator(integrator=integrator)
+        label = integrator.replace("-", "_")
+        results[f"{label}_us"] = time_per_call(lambda: sim.update_simulation(0.05, "OUT"), number=2000)
+        results[f"{label}_20x_us"] = time_per_call(lambda: sim.update_simulation(1.0, "OUT"), number=200)
+    return results
+
+def bench_rod_rho():
+    sim = _critical_simulator()
+    return {"calculate_rod_rho_us": time_per_call(sim.calculate_rod_rho)}
+
+def bench_predict_temp_feedback():
+    # Scalar call as in reset_simulation_state, and a 1000-point batch as used for tables and plots
+    sim = ReactorSimulator()
+    powers = np.logspace(-3, 6, 1000)
+    return {
+        "scalar_us": time_per_call(lambda: sim.predict_temp_feedback(2.5e5)),
+        "batch1000_us": time_per_call(lambda: sim.predict_temp_feedback(powers), number=2000),
+    }
+
+def bench_gui_frame(frames=400, history_s=600.0, plot_window="10 s"):
+    """Plot frame and status table cost with a full history window, on Qt's offscreen platform.
+
+    The panels are drawn at 1600x900 like a maximised window; the plots run
+    `frames` ticks so both the blitted frames and the full redraws on x-window
+    shifts are included in the mean and 95th percentile. `plot_window` is the
+    top panel's Plot choice; "10 min" exercises the min/max downsampler.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from ui_plots import RightPanel
+    from ui_top import TopPanel
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    sim = _critical_simulator()
+    sim.set_history_window(history_s)
+    for _ in range(int(round(history_s / 0.05))):
+        sim.update_simulation(0.05, "OUT")
+
+    top_panel = TopPanel(sim, "", "")
+    top_panel.plot_window_combo.setCurrentText(plot_window)
+    panel = RightPanel(sim, top_panel)
+    panel.resize(1600, 900)
+    panel.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    panel.update_plots(SimSnapshot(sim, 0, period=sim.stable_period()))
+    app.processEvents()
+    first_ms = (time.perf_counter() - start) * 1e3
+    panel.frame_times.clear()
+    for tick in range(1, frames + 1):
+        sim.update_simulation(0.05, "OUT")
+        panel.update_plots(SimSnapshot(sim, tick, period=sim.stable_period()))
+        app.processEvents()
+    report = panel.frame_time_report()
+
+    snapshot = SimSnapshot(sim, frames, period=sim.stable_period())
+    status_us = time_per_call(lambda: panel.update_status_table(snapshot, 250.0, "kW", 1.0, "ON", "OUT", "MANUAL"),
+                              number=2000)
+    panel.close()
+    top_panel.close()
+    app.processEvents()
+    return {"first_frame_ms": first_ms, "frame_mean_ms": report["mean_ms"], "frame_p95_ms": report["p95_ms"],
+            "over_target": report["over_target"], "status_table_us": status_us}
+
+def bench_csv_save(duration=3600.0, dt=0.05):
+    """A 1 hour session log (one row per 0.05 s tick): streaming it while running, Save As, and a full CSV rewrite."""
+    sim = ReactorSimulator()
+    columns = ["time", "rho", "temperature", "power"] + sim.rod_names + ["source"]
+    n = int(round(duration / dt))
+    rng = np.random.default_rng(0)
+    data = np.column_stack([np.arange(n) * dt] + [rng.uniform(0.0, 1e3, n) for _ in columns[1:]])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = StreamingLogger(columns, path=os.path.join(tmp, "session.csv"))
+        rows = data.tolist()
+        start = time.perf_counter()
+        for row in rows:
+            logger.log(row)
+        logger.flush()
+        log_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        logger.save_as(os.path.join(tmp, "saved.csv"))
+        save_as_s = time.perf_counter() - start
+        logger.close()
+
+        start = time.perf_counter()
+        write_log(os.path.join(tmp, "rewrite.csv"), {name: data[:, i] for i, name in enumerate(columns)})
+        write_s = time.perf_counter() - start
+        size_mb = os.path.getsize(os.path.join(tmp, "saved.csv")) / 1e6
+    return {"log_us_per_row": log_s / n * 1e6, "save_as_s": save_as_s, "write_log_s": write_s, "size_mb": size_mb}
+
+BENCHMARKS = {
+    "temp_feedback": bench_temp_feedback,
+    "kinetics_accuracy": bench_kinetics_accuracy,
+    "period_predictor": bench_period_predictor,
+    "inhour": bench_inhour,
+    "auto_controller": bench_auto_controller,
+    "pulse_sequence": bench_pulse_sequence,
+    "update_simulation": bench_update_simulation,
+    "rod_rho": bench_rod_rho,
+    "predict_temp_feedback": bench_predict_temp_feedback,
+    "gui_frame": bench_gui_frame,
+    "csv_save": bench_csv_save,
+}
+
+# Result keys that are timings; only these are checked for regressions (accuracy and physics results are not)
+TIMING_SUFFIXES = ("_us", "_ms", "_s", "_us_per_tick", "_us_per_row")
+NON_TIMING_SUFFIXES = ("_settle_s", "_period_s")
+
+def is_timing(key):
+    return key.endswith(TIMING_SUFFIXES) and not key.endswith(NON_TIMING_SUFFIXES)
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def find_regressions(history, results, threshold=0.25, window=5):
+    """Timings more than `threshold` (relative) above the median of the last `window` recorded runs.
+
+    Returns a list of (benchmark, key, baseline, value).
+    """
+    regressions = []
+    for name, values in results.items():
+        for key, value in values.items():
+            if not is_timing(key):
+                continue
+            past = [entry["results"][name][key] for entry in history
+                    if key in entry["results"].get(name, {})][-window:]
+            if not past:
+                continue
+            baseline = float(np.median(past))
+            if baseline > 0 and value > baseline * (1.0 + threshold):
+                regressions.append((name, key, baseline, value))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the benchmarks, append them to a JSON history and flag regressions.")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--history", default="benchmark_history.json", help="JSON history file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative slowdown reported as a regression")
+    parser.add_argument("--no-record", action="store_true", help="compare against the history without appending")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    for name in args.benchmarks or BENCHMARKS:
+        results[name] = {key: float(value) for key, value in BENCHMARKS[name]().items()}
+        print(name + ": " + ", ".join(f"{key}={value:.4g}" for key, value in results[name].items()), flush=True)
+
+    history = load_history(args.history)
+    regressions = find_regressions(history, results, args.threshold)
+    for name, key, baseline, value in regressions:
+        print(f"REGRESSION {name}.{key}: {value:.4g} vs. {baseline:.4g} ({value / baseline - 1.0:+.0%})")
+    if not args.no_record:
+        history.append({
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "results": results,
+        })
+        with open(args.history, "w") as f:
+            json.dump(history, f, indent=1)
+    print(f"{len(regressions)} regressions (threshold {args.threshold:.0%}, {len(history)} runs in {args.history})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
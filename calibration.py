@@ -0,0 +1,368 @@
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from data_logger import read_log
+from replay import LogReplay
+from rod_worth import RodWorth
+from simulation import ReactorSimulator
+from sweep import apply_parameters
+from temp_feedback import TempFeedback
+
+# Calibrated parameters: rod constants "<rod>.<alpha|beta|L>" and the temperature
+# reactivity coefficients "rho_0", "rho_1", "rho_2" of TempFeedback (cents, standardized power)
+FEEDBACK_PARAMETERS = ("rho_0", "rho_1", "rho_2")
+
+def inverse_kinetics(t, power, sim, source=None):
+    """Reactivity (cents) implied by a power trace, from the point-kinetics equations.
+
+    Precursors are integrated exactly for power varying linearly between
+    samples, starting in equilibrium with the first sample;
+        rho = beta_eff + Lambda (d ln P/dt) - Lambda (sum lam_i C_i + S) / P
+    `source` is the per-sample source strength (default none).
+    """
+    t = np.asarray(t, dtype=float)
+    P = np.maximum(np.asarray(power, dtype=float), 1e-30)
+    lam = sim.lam_i
+    C = np.empty((len(P), len(lam)))
+    C[0] = sim.beta_i / (sim.Lambda * lam) * P[0]
+    h = np.diff(t)[:, None]
+    decay = np.exp(-lam * h)
+    # Weights of P_k and P_k+1 in the integral of exp(-lam (h - s)) P(s) ds over the interval
+    w_start = (1.0 - decay - lam * h * decay) / (lam * lam * h)
+    w_end = (1.0 - decay) / lam - w_start
+    drive = sim.beta_i / sim.Lambda * (w_start * P[:-1, None] + w_end * P[1:, None])
+    for k in range(len(P) - 1):
+        C[k + 1] = C[k] * decay[k] + drive[k]
+    S = 0.0 if source is None else np.asarray(source, dtype=float)
+    rho = sim.beta_eff + sim.Lambda * np.gradient(np.log(P), t) - sim.Lambda * (C @ lam + S) / P
+    return rho / (0.01 * sim.beta_eff)
+
+def inverse_semi_implicit(t, power, sim, source=None):
+    """Reactivity (cents) ReactorSimulator.semi_implicit_step must have used for each interval between samples.
+
+    The step is solved backwards: given P_k and P_k+1 the quadratic is
+    linear in its reactivity, which is rod_rho(x_k+1) + rho_T(P_k) +
+    rho_T'(P_k) (P_k+1 - P_k). Precursors follow the step's own update.
+    Exact for logs taken every integrator step; returns len(t) - 1 values.
+    `source` is the per-sample source strength in effect during the step
+    ending at that sample.
+    """
+    t = np.asarray(t, dtype=float)
+    P = np.maximum(np.asarray(power, dtype=float), 1e-30)
+    S = np.zeros(len(P)) if source is None else np.broadcast_to(np.asarray(source, dtype=float), P.shape)
+    lam = sim.lam_i
+    beta_div_L = sim.beta_i / sim.Lambda
+    C = beta_div_L / lam * P[0]
+    rho = np.empty(len(P) - 1)
+    for k, dt in enumerate(np.diff(t).tolist()):
+        d = 1.0 + dt * lam
+        c = -(P[k] + dt * S[k + 1] + dt * np.dot(lam / d, C))
+        rho[k] = sim.beta_eff + sim.Lambda / (dt * P[k + 1]) * (P[k + 1] * (1.0 + dt * np.dot(lam / d, beta_div_L)) + c)
+        C = (C + dt * beta_div_L * P[k + 1]) / d
+    return rho / (0.01 * sim.beta_eff)
+
+def apply_calibration(sim, parameters):
+    """Write calibrated values (name -> value) into a ReactorSimulator."""
+    rod_names = [name for name in parameters if "." in name]
+    apply_parameters(sim, rod_names, [parameters[name] for name in rod_names])
+    feedback = [name for name in FEEDBACK_PARAMETERS if name in parameters]
+    if feedback:
+        C_temp = sim.temp_feedback.C_temp.copy()
+        for name in feedback:
+            C_temp[int(name[-1]), 2] = parameters[name]
+        sim.temp_feedback = TempFeedback(C_temp, sim.x_mu, sim.x_sig)
+        sim.C_temp = sim.temp_feedback.C_temp
+
+def _source_strength(log, sim, source):
+    if "source" in log:
+        return sim.source_strength * (log["source"] > 0.5)
+    return np.full(len(log["time"]), sim.source_strength if source == "IN" else 0.0)
+
+# Per-process state for the parallel replays, set once by the pool initializer
+_worker = {}
+
+def _init_worker(paths, names, options):
+    measured = []
+    for path in paths:
+        log = read_log(path)
+        measured.append((np.log(np.maximum(log["power"], 1e-30)), _fit_mask(log, options["min_power"], options["skip"])))
+    _worker.update(paths=paths, names=names, options=options, measured=measured)
+
+def _fit_mask(log, min_power, skip):
+    return (log["power"] > min_power) & (log["time"] >= log["time"][0] + skip)
+
+def _replay_residuals(theta, index):
+    # One-step ln P(simulated) - ln P(logged) over the fitted samples of one log
+    w = _worker
+    options = w["options"]
+    sim = ReactorSimulator()
+    apply_calibration(sim, dict(zip(w["names"], theta)))
+    replay = LogReplay(w["paths"][index], sim=sim, source=options["source"], integrator=options["integrator"],
+                       from_reset=options["from_reset"], keep_power=True, teacher_forcing=True)
+    log_power, mask = w["measured"][index]
+    simulated = np.log(np.maximum(replay.run()["power"], 1e-30))
+    return (simulated - log_power)[mask]
+
+class Calibrator:
+    """Fits rod worth constants and temperature reactivity coefficients to recorded sessions.
+
+    Logs are read with read_log() and need time, power and the rod
+    positions; a "source" column and F_Temp1/F_Temp2 fuel temperatures are
+    used when present.
+
+    fit_static(): inverse kinetics turns each power trace into the total
+    reactivity it implies, for the integrator the simulator uses (the
+    semi-implicit step inverted exactly, or the continuous equations for
+    "adaptive"); the rod worth curves plus the quadratic temperature
+    reactivity are then fitted to it by Levenberg-Marquardt with analytic
+    derivatives (the feedback coefficients enter linearly). No simulation
+    is needed, so a day of logs fits in seconds. Fuel temperature columns,
+    when present, are a linear least-squares fit.
+
+    fit_dynamic(): for logs the static inverse does not match exactly (sub-
+    stepped at speed > 1, pulses), refines the parameters against the
+    simulator as it actually steps by replaying every log with
+    teacher forcing and minimizing the one-step log-power error; a
+    free-running replay amplifies small reactivity errors exponentially
+    and is too ill-conditioned to fit. The finite-difference Jacobian needs
+    one replay per parameter and log; these run on a process pool that
+    reads the logs once per worker.
+    """
+
+    def __init__(self, paths, sim=None, rods=None, rod_keys=("alpha", "beta", "L"), fit_feedback=True,
+                 min_power=1.0, skip=0.0, source="OUT", integrator=None, from_reset=True, workers=None):
+        self.paths = list(paths)
+        self.sim = sim if sim is not None else ReactorSimulator()
+        rods = self.sim.rod_names if rods is None else rods
+        self.names = [f"{rod}.{key}" for rod in rods for key in rod_keys]
+        if fit_feedback:
+            self.names += list(FEEDBACK_PARAMETERS)
+        self.rod_index = [(self.sim.rod_names.index(rod), key) for rod in rods for key in rod_keys]
+        self.options = {"min_power": min_power, "skip": skip, "source": source, "integrator": integrator,
+                        "from_reset": from_reset}
+        self.workers = workers
+        self.theta = self._current()
+        self.elapsed = 0.0
+        self._load()
+
+    def _current(self):
+        sim = self.sim
+        theta = []
+        for name in self.names:
+            if "." in name:
+                rod, key = name.split(".", 1)
+                theta.append(sim.rod_params[rod][key])
+            else:
+                theta.append(sim.temp_feedback.C_temp[int(name[-1]), 2])
+        return np.array(theta, dtype=float)
+
+    def _load(self):
+        # Concatenated fit samples of all logs for the static fit: rod positions, power the
+        # feedback is evaluated at, its change over the step (semi-implicit only) and implied reactivity
+        sim = self.sim
+        discrete = (self.options["integrator"] or sim.integrator) == "semi-implicit"
+        positions, power, power_step, rho, temps = [], [], [], [], []
+        for path in self.paths:
+            log = read_log(path)
+            source = _source_strength(log, sim, self.options["source"])
+            mask = _fit_mask(log, self.options["min_power"], self.options["skip"])
+            rods = np.column_stack([log[name] for name in sim.rod_names])
+            if discrete:
+                implied = inverse_semi_implicit(log["time"], log["power"], sim, source)
+                mask = mask[1:] & mask[:-1]
+                positions.append(rods[1:][mask])
+                power.append(log["power"][:-1][mask])
+                power_step.append(np.diff(log["power"])[mask])
+                rho.append(implied[mask])
+            else:
+                mask = mask & np.isfinite(log["power"])
+                positions.append(rods[mask])
+                power.append(log["power"][mask])
+                power_step.append(np.zeros(mask.sum()))
+                rho.append(inverse_kinetics(log["time"], log["power"], sim, source)[mask])
+            if "F_Temp1" in log and "F_Temp2" in log:
+                fit_rows = _fit_mask(log, self.options["min_power"], self.options["skip"])
+                temps.append((log["power"][fit_rows], np.column_stack([log["F_Temp1"], log["F_Temp2"]])[fit_rows]))
+        self.positions = np.concatenate(positions)
+        self.power = np.concatenate(power)
+        self.power_step = np.concatenate(power_step)
+        self.rho = np.concatenate(rho)
+        self.fuel_temps = temps
+        if not len(self.power):
+            raise ValueError(f"No samples above {self.options['min_power']} W to fit")
+
+    def _static_residual(self, theta):
+        # Model minus implied reactivity (cents) and its Jacobian wrt theta
+        sim = self.sim
+        params = dict(zip(self.names, theta))
+        rod_params = {rod: dict(values) for rod, values in sim.rod_params.items()}
+        for name, value in params.items():
+            if "." in name:
+                rod, key = name.split(".", 1)
+                rod_params[rod][key] = value
+        worth = RodWorth.from_params(sim.rod_names, rod_params, max_position=sim.max_position)
+        z = (self.power - sim.x_mu) / sim.x_sig
+        C_rho = sim.temp_feedback.C_temp[:, 2].copy()
+        for name in FEEDBACK_PARAMETERS:
+            if name in params:
+                C_rho[int(name[-1])] = params[name]
+        dz = self.power_step / sim.x_sig
+        # Feedback at the start power plus its linearization over the step, as the semi-implicit step uses it
+        basis = (np.ones_like(z), z + dz, z * z + 2 * z * dz)
+        model = worth.total(self.positions) + C_rho[0] * basis[0] + C_rho[1] * basis[1] + C_rho[2] * basis[2]
+
+        J = np.empty((len(model), len(theta)))
+        for j, name in enumerate(self.names):
+            if "." not in name:
+                J[:, j] = basis[int(name[-1])]
+                continue
+            i, key = self.rod_index[j]
+            alpha, beta, L = worth.alpha[i], worth.beta[i], worth.L[i]
+            k = 2 * np.pi / L
+            x = self.positions[:, i]
+            if key == "alpha":
+                J[:, j] = worth.rod_worths(self.positions)[:, i] / alpha
+            elif key == "beta":
+                J[:, j] = alpha / 2 * (np.cos(k * (x - beta)) - np.cos(k * beta))
+            else:
+                J[:, j] = alpha / (4 * np.pi) * (-np.sin(k * beta) + k * beta * np.cos(k * beta)
+                                                 - np.sin(k * (x - beta)) + k * (x - beta) * np.cos(k * (x - beta)))
+        return model - self.rho, J
+
+    def _levenberg_marquardt(self, residual, theta, max_iter, tol):
+        # residual(theta) -> (r, J); returns the fitted theta and final RMS residual
+        r, J = residual(theta)
+        cost = r @ r
+        mu = 1e-3
+        for iteration in range(max_iter):
+            JTJ = J.T @ J
+            g = J.T @ r
+            diag = np.maximum(np.diag(JTJ), 1e-12)
+            while True:
+                step = np.linalg.solve(JTJ + mu * np.diag(diag), -g)
+                r_new, J_new = residual(theta + step)
+                cost_new = r_new @ r_new
+                if cost_new < cost:
+                    break
+                mu *= 4.0
+                if mu > 1e10:
+                    return theta, np.sqrt(cost / len(r)), iteration
+            converged = cost - cost_new <= tol * cost
+            theta, r, J, cost = theta + step, r_new, J_new, cost_new
+            mu = max(mu / 3.0, 1e-9)
+            if converged:
+                break
+        return theta, np.sqrt(cost / len(r)), iteration + 1
+
+    def fit_fuel_temps(self):
+        # Least-squares quadratic for F_Temp1/F_Temp2 on the simulator's standardized power; None without data
+        if not self.fuel_temps:
+            return None
+        sim = self.sim
+        power = np.concatenate([p for p, _ in self.fuel_temps])
+        temps = np.concatenate([t for _, t in self.fuel_temps])
+        z = (power - sim.x_mu) / sim.x_sig
+        A = np.column_stack([np.ones_like(z), z, z**2])
+        coefficients, *_ = np.linalg.lstsq(A, temps, rcond=None)
+        return coefficients
+
+    def fit_static(self, max_iter=50, tol=1e-10):
+        """Fit to the inverse-kinetics reactivity; returns a dict with the parameters and RMS residual (cents)."""
+        start = time.perf_counter()
+        self.theta, rms, iterations = self._levenberg_marquardt(self._static_residual, self.theta, max_iter, tol)
+        self.fuel_temp_coefficients = self.fit_fuel_temps()
+        self.elapsed += time.perf_counter() - start
+        return {"parameters": self.parameters(), "rms_rho": float(rms), "iterations": iterations,
+                "samples": len(self.rho), "elapsed": time.perf_counter() - start}
+
+    def fit_dynamic(self, max_iter=5, tol=1e-6, rel_step=1e-4):
+        """Refine by replaying the logs; returns a dict with the parameters and RMS log-power error."""
+        start = time.perf_counter()
+        n_logs = len(self.paths)
+        initargs = (self.paths, self.names, self.options)
+        steps = rel_step * np.maximum(np.abs(self.theta), 1e-2)
+
+        def evaluate(pool, thetas):
+            # Residual vectors for each theta, all logs concatenated; one replay per (theta, log) task
+            tasks = [(theta, index) for theta in thetas for index in range(n_logs)]
+            if pool is None:
+                parts = [_replay_residuals(theta, index) for theta, index in tasks]
+            else:
+                parts = list(pool.map(_replay_residuals, *zip(*tasks)))
+            return [np.concatenate(parts[i * n_logs:(i + 1) * n_logs]) for i in range(len(thetas))]
+
+        def run(pool):
+            def residual(theta):
+                shifted = [theta] + [theta + np.eye(len(theta))[j] * steps[j] for j in range(len(theta))]
+                r, *perturbed = evaluate(pool, shifted)
+                J = np.column_stack([(rj - r) / steps[j] for j, rj in enumerate(perturbed)])
+                return r, J
+            return self._levenberg_marquardt(residual, self.theta, max_iter, tol)
+
+        if self.workers is not None and self.workers <= 1:
+            _init_worker(*initargs)
+            self.theta, rms, iterations = run(None)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                self.theta, rms, iterations = run(pool)
+        self.elapsed += time.perf_counter() - start
+        return {"parameters": self.parameters(), "rms_step_log_power": float(rms), "iterations": iterations,
+                "elapsed": time.perf_counter() - start}
+
+    def parameters(self):
+        return {name: float(value) for name, value in zip(self.names, self.theta)}
+
+    def apply(self, sim):
+        apply_calibration(sim, self.parameters())
+        if getattr(self, "fuel_temp_coefficients", None) is not None:
+            C_temp = sim.temp_feedback.C_temp.copy()
+            C_temp[:, :2] = self.fuel_temp_coefficients
+            sim.temp_feedback = TempFeedback(C_temp, sim.x_mu, sim.x_sig)
+            sim.C_temp = sim.temp_feedback.C_temp
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit rod worth and temperature feedback coefficients to session logs.")
+    parser.add_argument("logs", nargs="+", help="CSV or .trglog logs with time, power and rod positions")
+    parser.add_argument("--rods", default=None, help="comma-separated rods to fit (default: all)")
+    parser.add_argument("--no-feedback", action="store_true", help="keep the temperature reactivity coefficients")
+    parser.add_argument("--min-power", type=float, default=1.0, help="ignore samples below this power (W)")
+    parser.add_argument("--integrator", choices=("semi-implicit", "adaptive"), default=None,
+                        help="integrator the fit should match (default: the simulator's)")
+    parser.add_argument("--dynamic", action="store_true", help="refine by replaying the logs through the simulator")
+    parser.add_argument("--mid-session", action="store_true", help="logs do not start at a reset")
+    parser.add_argument("--source", choices=("IN", "OUT"), default="OUT",
+                        help="source state for logs without a source column")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the fitted parameters to this JSON file")
+    args = parser.parse_args(argv)
+
+    try:
+        calibrator = Calibrator(args.logs, rods=args.rods.split(",") if args.rods else None,
+                                fit_feedback=not args.no_feedback, min_power=args.min_power, source=args.source,
+                                integrator=args.integrator, from_reset=not args.mid_session, workers=args.workers)
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Could not load logs: {exc}", file=sys.stderr)
+        return 2
+    result = calibrator.fit_static()
+    rms = result["rms_rho"]
+    print(f"static: rms {rms:.3g} cents over {result['samples']} samples, {result['elapsed']:.2f} s")
+    if args.dynamic:
+        result = calibrator.fit_dynamic()
+        rms = result["rms_step_log_power"]
+        print(f"dynamic: rms one-step ln P {rms:.3g}, {result['elapsed']:.2f} s")
+    for name, value in result["parameters"].items():
+        print(f"  {name} = {value:.6g}")
+    if not (np.isfinite(rms) and np.all(np.isfinite(list(result["parameters"].values())))):
+        print("Fit failed: non-finite residual or parameters", file=sys.stderr)
+        return 1
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result["parameters"], f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
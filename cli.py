@@ -0,0 +1,130 @@
+import time
+_START = time.perf_counter() # taken before numpy is imported, so the reported startup includes the imports
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+from data_logger import write_log
+from headless import HeadlessRunner, Scenario
+
+# Headless entry point: runs scenario files through the simulator core and writes the trajectories.
+# Only the simulator modules are imported (no PyQt5, no matplotlib), so it starts in well under 200 ms:
+#   python cli.py startup.json pulse.json --workers 2 --out-dir runs --format bin
+#   cat scenario.json | python cli.py - --json
+
+OUTPUT_SUFFIXES = {"csv": ".csv", "bin": ".trglog", "npz": ".npz"}
+
+def write_trajectory(path, trajectory, fmt):
+    if fmt == "npz":
+        np.savez(path, **trajectory)
+    else:
+        write_log(path, trajectory, fmt=fmt)
+
+def run_one(scenario_dict, out_path=None, fmt="csv"):
+    """Run one scenario (as a dict, so it pickles cheaply to a worker) and optionally write its trajectory."""
+    scenario = Scenario.from_dict(scenario_dict)
+    runner = HeadlessRunner(scenario)
+    trajectory = runner.run()
+    if out_path is not None:
+        write_trajectory(out_path, trajectory, fmt)
+    power = trajectory["power"]
+    return {
+        "name": scenario.name,
+        "steps": len(power) - 1,
+        "final_power": float(power[-1]),
+        "peak_power": float(power.max()),
+        "final_temperature": float(trajectory["temperature"][-1]),
+        "wall_s": runner.elapsed,
+        "realtime_factor": runner.realtime_factor(),
+        "output": out_path,
+    }
+
+def _load(path):
+    if path == "-":
+        return Scenario.from_dict(json.load(sys.stdin))
+    return Scenario.load(path)
+
+def _output_paths(paths, scenarios, out_dir, fmt):
+    # <out_dir>/<file stem>.<ext> (the scenario name for stdin), numbered if two runs would share a file
+    used = set()
+    outputs = []
+    for path, scenario in zip(paths, scenarios):
+        stem = scenario.name if path == "-" else os.path.splitext(os.path.basename(path))[0]
+        name, k = stem, 1
+        while name in used:
+            k += 1
+            name = f"{stem}_{k}"
+        used.add(name)
+        outputs.append(os.path.join(out_dir, name + OUTPUT_SUFFIXES[fmt]))
+    return outputs
+
+def run_many(scenarios, outputs, fmt="csv", workers=1):
+    """Yields (index, summary or exception) as runs finish; runs in this process if workers <= 1."""
+    if workers <= 1 or len(scenarios) <= 1:
+        for i, (scenario, out_path) in enumerate(zip(scenarios, outputs)):
+            try:
+                yield i, run_one(scenario.to_dict(), out_path, fmt)
+            except Exception as exc:
+                yield i, exc
+        return
+    # Imported here: the pool machinery is only worth its import time when there is more than one run
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, scenario.to_dict(), out_path, fmt): i
+                   for i, (scenario, out_path) in enumerate(zip(scenarios, outputs))}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as exc:
+                yield futures[future], exc
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run reactor scenarios headless (no GUI) and write their trajectories.")
+    parser.add_argument("scenarios", nargs="+", help="scenario JSON files (see headless.Scenario); - reads one from stdin")
+    parser.add_argument("--out-dir", default=".", help="directory for the trajectory files")
+    parser.add_argument("--format", choices=tuple(OUTPUT_SUFFIXES), default="csv",
+                        help="csv or bin (the session log formats, readable by replay.py) or npz")
+    parser.add_argument("--no-output", action="store_true", help="only print the summaries")
+    parser.add_argument("--workers", type=int, default=None, help="parallel processes (default: one per scenario, up to the CPU count)")
+    parser.add_argument("--json", action="store_true", help="print one JSON summary per line instead of text")
+    args = parser.parse_args(argv)
+
+    if args.scenarios.count("-") > 1:
+        parser.error("stdin (-) can only be given once")
+    try:
+        scenarios = [_load(path) for path in args.scenarios]
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Could not load scenario: {exc}", file=sys.stderr)
+        return 2
+    if args.no_output:
+        outputs = [None] * len(scenarios)
+    else:
+        os.makedirs(args.out_dir, exist_ok=True)
+        outputs = _output_paths(args.scenarios, scenarios, args.out_dir, args.format)
+    workers = args.workers or min(len(scenarios), os.cpu_count() or 1)
+    startup = time.perf_counter() - _START
+
+    failures = 0
+    for i, result in run_many(scenarios, outputs, args.format, workers):
+        if isinstance(result, Exception):
+            failures += 1
+            print(f"{args.scenarios[i]}: failed: {result}", file=sys.stderr)
+            continue
+        result["scenario"] = args.scenarios[i]
+        if args.json:
+            print(json.dumps(result), flush=True)
+        else:
+            where = f" -> {result['output']}" if result["output"] else ""
+            print(f"{args.scenarios[i]}: {result['steps']} steps, final {result['final_power']:.4g} W, "
+                  f"peak {result['peak_power']:.4g} W, {result['realtime_factor']:.0f}x real time{where}", flush=True)
+
+    total = time.perf_counter() - _START
+    print(f"{len(scenarios) - failures}/{len(scenarios)} scenarios in {total:.2f} s "
+          f"(startup {startup * 1e3:.0f} ms, {workers} workers)", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
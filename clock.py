@@ -0,0 +1,64 @@
+import time
+
+class SimulationClock:
+    """Fixed-timestep accumulator driven by the monotonic clock.
+
+    due() adds the real time since the previous call to an accumulator and
+    returns how many whole `step`s it now holds, so the caller runs exactly
+    as many fixed physics steps as real time has passed, however late or
+    bunched up its wake-ups are. At most `max_catch_up` steps are returned
+    at once; steps beyond that are dropped (counted in `dropped`) so a long
+    stall does not turn into a burst that stalls again.
+
+    `drift` is the real time not covered by steps taken: the dropped steps
+    plus the part of a step still in the accumulator. Simulated time lags
+    wall time by drift * speed.
+    """
+
+    def __init__(self, step=0.05, max_catch_up=5, time_fn=time.perf_counter):
+        self.step = step
+        self.max_catch_up = max_catch_up
+        self.time_fn = time_fn
+        self.last = None
+        self.reset()
+
+    def reset(self):
+        # Zero the counters; the time base is kept, so a running clock carries on from now
+        if self.last is not None:
+            self.last = self.time_fn()
+        self.accumulator = 0.0
+        self.elapsed = 0.0
+        self.steps = 0
+        self.dropped = 0
+        self.lateness = 0.0
+
+    def start(self):
+        # (Re)start measuring from now; time while stopped is not owed
+        self.last = self.time_fn()
+
+    def due(self):
+        now = self.time_fn()
+        if self.last is None:
+            self.last = now
+        delta = now - self.last
+        self.last = now
+        self.accumulator += delta
+        self.elapsed += delta
+
+        n = int(self.accumulator / self.step + 1e-9)
+        if n > self.max_catch_up:
+            self.dropped += n - self.max_catch_up
+            self.accumulator -= (n - self.max_catch_up) * self.step
+            n = self.max_catch_up
+        self.accumulator -= n * self.step
+        self.steps += n
+        # How long after the first of these steps fell due this call came
+        self.lateness = (n - 1) * self.step + self.accumulator if n else 0.0
+        return n
+
+    def time_to_next(self):
+        return max(0.0, self.step - self.accumulator - (self.time_fn() - self.last))
+
+    @property
+    def drift(self):
+        return self.elapsed - self.steps * self.step
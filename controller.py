@@ -0,0 +1,96 @@
+import numpy as np
+
+from history import HistoryBuffer
+from inhour import inhour_rho
+
+class AutoController:
+    """Auto-mode servo: drives one rod (Reg) so power tracks the demand.
+
+    Called from ReactorSimulator.advance() every integrator step while the
+    mode is "Auto". The outer loop turns the log power error into a demanded
+    inverse period, limited to the operating period (20 s, never below
+    `min_period`). The inner loop converts the gap between demanded and
+    measured inverse period into a reactivity change with the explicit
+    inhour relation rho(omega), and moves the rod to close it within
+    `response_time`, at most at the simulator's rod speed.
+    """
+
+    def __init__(self, sim, rod="Reg", target_period=20.0, min_period=10.0, time_constant=5.0,
+                 response_time=1.0, filter_time=0.5):
+        self.sim = sim
+        self.rod = rod
+        self.target_period = target_period
+        self.min_period = min_period
+        self.time_constant = time_constant # seconds to remove a log power error once off the period limit
+        self.response_time = response_time
+        self.filter_time = filter_time
+        self.demand = 0.0 # W
+
+        self.active = False
+        self.omega = 0.0 # filtered measured inverse period (1/s)
+        self.omega_demand = 0.0
+        self.rho_error = 0.0 # cents
+        self.rod_velocity = 0.0 # units/s
+        self._last_power = None
+        self.history = HistoryBuffer(["time", "demand", "power", "omega_demand", "omega", "rho_error", "rod_velocity"],
+                                     int(np.ceil(sim.history_window / 0.05)) + 1, grow=True)
+
+    def reset(self):
+        self.active = False
+        self.omega = 0.0
+        self.omega_demand = 0.0
+        self.rho_error = 0.0
+        self.rod_velocity = 0.0
+        self._last_power = None
+        self.history.clear()
+
+    def _inhour(self, omega):
+        sim = self.sim
+        return float(inhour_rho(omega, sim.beta_i, sim.lam_i, sim.Lambda, sim.beta_eff))
+
+    def update(self, dt):
+        """Returns the rod velocity (units/s) for the next step of `dt` seconds."""
+        sim = self.sim
+        power = max(sim.power, 1e-20)
+        if not self.active:
+            # Bumpless entry: start from the current state
+            self.active = True
+            self._last_power = power
+            self.omega = 0.0
+        raw_omega = float(np.log(power / self._last_power)) / dt
+        self.omega += (raw_omega - self.omega) * min(1.0, dt / self.filter_time)
+        self._last_power = power
+
+        if self.demand > 0:
+            limit = 1.0 / self.target_period
+            self.omega_demand = min(max(float(np.log(self.demand / power)) / self.time_constant, -limit), limit)
+        else:
+            self.omega_demand = 0.0
+        if self.omega > 1.0 / self.min_period:
+            self.omega_demand = min(self.omega_demand, 0.0) # period limit: never climb faster than min_period
+
+        # rho(omega) has a pole at -min(lam_i); keep the measured value on the physical branch
+        omega_floor = -0.9 * np.min(sim.lam_i)
+        self.rho_error = self._inhour(max(self.omega_demand, omega_floor)) - self._inhour(max(self.omega, omega_floor))
+
+        index = sim.rod_names.index(self.rod)
+        worth_per_unit = max(float(sim.rod_worth.differential([sim.rod_positions[name] for name in sim.rod_names])[index]), 1e-3)
+        velocity = self.rho_error / (self.response_time * worth_per_unit)
+        self.rod_velocity = min(max(velocity, -sim.rod_speed), sim.rod_speed)
+
+        self.history.append([sim.current_time, self.demand, power, self.omega_demand, self.omega, self.rho_error, self.rod_velocity])
+        if sim.current_time > sim.history_window:
+            self.history.drop_before("time", sim.current_time - sim.history_window)
+        return self.rod_velocity
+
+    def state(self):
+        # Current internal state, e.g. for a status line or plot annotation
+        return {
+            "active": self.active,
+            "demand": self.demand,
+            "omega_demand": self.omega_demand,
+            "omega": self.omega,
+            "period": 1.0 / self.omega if self.omega != 0 else float("inf"),
+            "rho_error": self.rho_error,
+            "rod_velocity": self.rod_velocity,
+        }
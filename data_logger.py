@@ -0,0 +1,191 @@
+import csv
+import itertools
+import json
+import os
+import queue
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import numpy as np
+
+BINARY_MAGIC = b"TRIGALOG1\n"
+
+class StreamingLogger:
+    """Writes logged rows to disk in chunks from a background thread.
+
+    Rows are collected into fixed-size NumPy chunks on the caller's thread;
+    full chunks are handed to a writer thread, so memory stays bounded and a
+    crash loses at most one chunk. Two formats are supported:
+
+    - "csv": the same layout the Save button always produced.
+    - "bin": a header line with the column names, then per chunk an int64
+      row count followed by each column as contiguous float64 values.
+    """
+
+    def __init__(self, columns, path=None, fmt="csv", chunk_rows=200):
+        if fmt not in ("csv", "bin"):
+            raise ValueError(f"Unknown log format: {fmt!r}")
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        if path is None:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            suffix = ".csv" if fmt == "csv" else ".trglog"
+            fd, path = tempfile.mkstemp(prefix=f"triga_doppelganger_{stamp}_", suffix=suffix)
+            os.close(fd)
+        self.path = path
+        self.rows_logged = 0
+
+        self._chunk = np.empty((chunk_rows, len(self.columns)))
+        self._n = 0
+        self._queue = queue.Queue()
+        self._file = None
+        self._open_file()
+        self._thread = threading.Thread(target=self._writer, name="StreamingLogger", daemon=True)
+        self._thread.start()
+
+    def _open_file(self):
+        if self.fmt == "csv":
+            self._file = open(self.path, "w", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(self.columns)
+        else:
+            self._file = open(self.path, "wb")
+            self._file.write(BINARY_MAGIC)
+            self._file.write(json.dumps({"columns": self.columns}).encode("utf-8") + b"\n")
+        self._file.flush()
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if callable(item):
+                    item()
+                elif self.fmt == "csv":
+                    self._csv.writerows(item.tolist())
+                    self._file.flush()
+                else:
+                    self._file.write(struct.pack("<q", len(item)))
+                    self._file.write(np.ascontiguousarray(item.T).tobytes())
+                    self._file.flush()
+            finally:
+                self._queue.task_done()
+
+    def log(self, row):
+        self._chunk[self._n] = row
+        self._n += 1
+        self.rows_logged += 1
+        if self._n == self.chunk_rows:
+            self._queue.put(self._chunk)
+            self._chunk = np.empty((self.chunk_rows, len(self.columns)))
+            self._n = 0
+
+    def flush(self):
+        # Hand over the partial chunk and wait until everything is on disk
+        if self._n:
+            self._queue.put(self._chunk[:self._n].copy())
+            self._n = 0
+        self._queue.join()
+
+    def save_as(self, dest_path):
+        # The session is already on disk: flush, then copy (or convert if the extension asks for the other format)
+        self.flush()
+        dest_fmt = "bin" if dest_path.endswith(".trglog") else "csv"
+        if dest_fmt == self.fmt:
+            shutil.copyfile(self.path, dest_path)
+        else:
+            write_log(dest_path, read_log(self.path), fmt=dest_fmt)
+
+    def reset(self):
+        # Drop everything logged so far and start the file over
+        self.flush()
+        self._n = 0
+        self.rows_logged = 0
+
+        def reopen():
+            self._file.close()
+            self._open_file()
+        self._queue.put(reopen)
+        self._queue.join()
+
+    def close(self, delete=False):
+        if self._thread.is_alive():
+            self.flush()
+            self._queue.put(None)
+            self._thread.join()
+            self._file.close()
+        if delete and os.path.exists(self.path):
+            os.remove(self.path)
+
+def _open_log(path, chunk_rows):
+    # Column names plus a generator of (n_columns, n_rows) blocks
+    with open(path, "rb") as f:
+        is_binary = f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    if not is_binary:
+        with open(path, "r", newline="") as f:
+            columns = next(csv.reader(f))
+
+        def blocks():
+            with open(path, "r", newline="") as f:
+                reader = csv.reader(f)
+                next(reader)
+                while True:
+                    rows = [row for row in itertools.islice(reader, chunk_rows) if row]
+                    if not rows:
+                        return
+                    yield np.array([[float(v) for v in row] for row in rows], dtype=float).reshape(-1, len(columns)).T
+        return columns, blocks()
+
+    with open(path, "rb") as f:
+        f.read(len(BINARY_MAGIC))
+        columns = json.loads(f.readline().decode("utf-8"))["columns"]
+        offset = f.tell()
+
+    def blocks():
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return
+                (n_rows,) = struct.unpack("<q", header)
+                block = np.frombuffer(f.read(8 * n_rows * len(columns)), dtype=np.float64)
+                if block.size < n_rows * len(columns):
+                    return # truncated final chunk (e.g. after a crash)
+                yield block.reshape(len(columns), n_rows)
+    return columns, blocks()
+
+def iter_log(path, chunk_rows=4096):
+    """Stream a CSV or binary log as dicts of column arrays, so long sessions need not fit in memory.
+
+    CSV logs are read `chunk_rows` rows at a time; binary logs yield the chunks as they were written.
+    """
+    columns, blocks = _open_log(path, chunk_rows)
+    for block in blocks:
+        yield {name: block[i].copy() for i, name in enumerate(columns)}
+
+def read_log(path):
+    """Read a CSV or binary log back as a dict of column arrays."""
+    columns, blocks = _open_log(path, 4096)
+    chunks = list(blocks)
+    data = np.concatenate(chunks, axis=1) if chunks else np.empty((len(columns), 0))
+    return {name: data[i].copy() for i, name in enumerate(columns)}
+
+def write_log(path, log, fmt="csv"):
+    columns = list(log)
+    data = np.column_stack([np.asarray(log[name], dtype=float) for name in columns]) if columns else np.empty((0, 0))
+    if fmt == "csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(data.tolist())
+    else:
+        with open(path, "wb") as f:
+            f.write(BINARY_MAGIC)
+            f.write(json.dumps({"columns": columns}).encode("utf-8") + b"\n")
+            f.write(struct.pack("<q", len(data)))
+            f.write(np.ascontiguousarray(data.T).tobytes())
@@ -0,0 +1,127 @@
+import numpy as np
+
+from history import HistoryBuffer
+
+class MinMaxDownsampler:
+    """Incremental min/max decimation of HistoryBuffer columns for plotting.
+
+    Samples are grouped into fixed-width time buckets and each bucket keeps
+    its minimum and maximum, in time order, so narrow peaks such as a pulse
+    in the power history survive however long the plot window is. Closed
+    buckets live in their own HistoryBuffer; each update() only processes
+    the samples appended since the previous one.
+    """
+
+    def __init__(self, columns, time_column="time"):
+        self.columns = list(columns)
+        self.time_column = time_column
+        self.window = None
+        self.bucket_width = None
+        self.n_buckets = 0
+        self.history = None
+        self._generation = None
+        self._consumed = 0
+        self._buckets = None
+        self._open_id = None
+        self._open = {}
+
+    def configure(self, window, max_points):
+        # Two points (min and max) per bucket, at most max_points per line over `window` seconds
+        n_buckets = max(1, int(max_points) // 2)
+        if window != self.window or n_buckets != self.n_buckets:
+            self.window = window
+            self.n_buckets = n_buckets
+            self.bucket_width = window / n_buckets
+            self.history = None # rebuild on the next update
+
+    def update(self, history):
+        # `history` may be a HistorySnapshot; incremental state follows the live buffer behind it
+        if (history.source is not self.history or history.generation != self._generation
+                or history.appended - len(history) > self._consumed):
+            self._rebuild(history)
+        n_new = history.appended - self._consumed
+        if n_new > 0:
+            self._consume(
+                history.view(self.time_column)[-n_new:],
+                {name: history.view(name)[-n_new:] for name in self.columns},
+            )
+            self._consumed = history.appended
+
+    def series(self, name, t_start=-np.inf):
+        # (t, y) for one column, including the bucket that is still filling
+        t = self._buckets.view("t:" + name)
+        y = self._buckets.view(name)
+        if self._open_id is not None:
+            t_a, y_a, t_b, y_b = self._ordered(self._open[name])
+            t = np.concatenate([t, (t_a, t_b)])
+            y = np.concatenate([y, (y_a, y_b)])
+        first = int(np.searchsorted(t, t_start, side="left"))
+        return t[first:], y[first:]
+
+    def _rebuild(self, history):
+        self.history = history.source
+        self._generation = history.generation
+        flat_columns = ["bucket"]
+        for name in self.columns:
+            flat_columns += ["t:" + name, name]
+        self._buckets = HistoryBuffer(flat_columns, 2 * (self.n_buckets + 2))
+        self._open_id = None
+        self._open = {}
+
+        # Only the part of the history that can still be on screen needs decimating. Start on a bucket
+        # boundary, at the oldest bucket update() keeps, so the first bucket is complete and the result
+        # matches an incremental run
+        t = history.view(self.time_column)
+        first = 0
+        if len(t):
+            oldest = int(np.floor(t[-1] / self.bucket_width)) - self.n_buckets - 1
+            start = int(np.searchsorted(t, (oldest - 1) * self.bucket_width, side="left"))
+            bucket_ids = np.floor(t[start:] / self.bucket_width).astype(np.int64)
+            first = start + int(np.searchsorted(bucket_ids, oldest, side="left"))
+        self._consumed = history.appended - (len(t) - first)
+
+    @staticmethod
+    def _ordered(extrema):
+        t_min, v_min, t_max, v_max = extrema
+        if t_min <= t_max:
+            return t_min, v_min, t_max, v_max
+        return t_max, v_max, t_min, v_min
+
+    def _close_open_bucket(self):
+        first_row = [self._open_id]
+        second_row = [self._open_id]
+        for name in self.columns:
+            t_a, y_a, t_b, y_b = self._ordered(self._open[name])
+            first_row += [t_a, y_a]
+            second_row += [t_b, y_b]
+        self._buckets.append(first_row)
+        self._buckets.append(second_row)
+
+    def _consume(self, t, values):
+        bucket_ids = np.floor(t / self.bucket_width).astype(np.int64)
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(bucket_ids)) + 1, [len(t)]])
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            bucket_id = int(bucket_ids[start])
+            group = {}
+            for name in self.columns:
+                v = values[name][start:end]
+                i_min = start + int(np.argmin(v))
+                i_max = start + int(np.argmax(v))
+                group[name] = [t[i_min], values[name][i_min], t[i_max], values[name][i_max]]
+
+            if bucket_id == self._open_id:
+                for name, (t_min, v_min, t_max, v_max) in group.items():
+                    extrema = self._open[name]
+                    if v_min < extrema[1]:
+                        extrema[0], extrema[1] = t_min, v_min
+                    if v_max > extrema[3]:
+                        extrema[2], extrema[3] = t_max, v_max
+            else:
+                if self._open_id is not None:
+                    self._close_open_bucket()
+                self._open_id = bucket_id
+                self._open = group
+
+        # Buckets that have scrolled out of the window
+        oldest = self._open_id - self.n_buckets - 1
+        self._buckets.drop_before("bucket", oldest)
@@ -0,0 +1,147 @@
+import time
+import numpy as np
+
+from simulation import ReactorSimulator
+from rod_worth import RodWorth
+
+class EnsembleSimulator:
+    """N independent reactors advanced together, one NumPy pass per step.
+
+    Every kinetics and rod-worth parameter is stored per member so sensitivity
+    studies can perturb beta_i, lam_i, Lambda or the rod alpha/beta/L values.
+    State arrays: power (N,), C (N, 6), temperature (N,), rod_positions (N, 4).
+    The step is the same semi-implicit quadratic solve as
+    ReactorSimulator.advance, with the complex-root fallback applied by mask.
+    """
+
+    def __init__(self, n, base=None, **overrides):
+        base = base if base is not None else ReactorSimulator()
+        self.n = int(n)
+        self.rod_names = list(base.rod_names)
+        self.rod_speed = base.rod_speed
+        self.min_position = base.min_position
+        self.max_position = base.max_position
+
+        def per_member(name, default, shape):
+            value = overrides.pop(name, default)
+            return np.array(np.broadcast_to(np.asarray(value, dtype=float), shape))
+
+        n_groups = base.beta_i.size
+        n_rods = len(self.rod_names)
+        self.beta_i = per_member("beta_i", base.beta_i, (self.n, n_groups))
+        self.lam_i = per_member("lam_i", base.lam_i, (self.n, n_groups))
+        self.Lambda = per_member("Lambda", base.Lambda, (self.n,))
+        self.beta_eff = per_member("beta_eff", base.beta_eff, (self.n,))
+        self.source_strength = per_member("S", base.S, (self.n,))
+        self.S = self.source_strength.copy()
+        self.source_state = "IN"
+        self.heat_loss_coefficient = per_member("heat_loss_coefficient", base.heat_loss_coefficient, (self.n,))
+        self.alpha = per_member("alpha", [base.rod_params[r]["alpha"] for r in self.rod_names], (self.n, n_rods))
+        self.beta = per_member("beta", [base.rod_params[r]["beta"] for r in self.rod_names], (self.n, n_rods))
+        self.L = per_member("L", [base.rod_params[r]["L"] for r in self.rod_names], (self.n, n_rods))
+        self.rod_positions = per_member("rod_positions", [base.rod_positions[r] for r in self.rod_names], (self.n, n_rods))
+        self.rod_worth = RodWorth(self.alpha, self.beta, self.L, rod_names=self.rod_names)
+        if overrides:
+            raise TypeError(f"Unknown ensemble parameters: {', '.join(sorted(overrides))}")
+
+        # Temperature feedback fit is shared by all members
+        self.temp_feedback = base.temp_feedback
+
+        self.rod_targets = np.full((self.n, n_rods), np.nan) # NaN = no target
+        self.scram_active = np.zeros(self.n, dtype=bool)
+        self.current_time = 0.0
+        self.elapsed = 0.0
+        self.member_steps = 0
+        self.reset_state()
+
+    def calculate_rod_rho(self):
+        # Same integral rod worth as ReactorSimulator.calculate_rod_rho, in cents
+        return self.rod_worth.total(self.rod_positions)
+
+    def reset_state(self):
+        self.rod_rho = self.calculate_rod_rho()
+        self.total_rho = self.rod_rho.copy()
+        rho0 = self.total_rho * 0.01 * self.beta_eff
+        critical = np.abs(rho0) <= 1e-10
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n0 = np.maximum(1e-20, -self.S * self.Lambda / rho0)
+        self.power = np.where(critical, 1e-6, n0)
+        self.C = (self.beta_i / (self.Lambda[:, None] * self.lam_i)) * self.power[:, None]
+        self.temperature = np.full(self.n, 18.0)
+
+    def set_source(self, state):
+        # Mirrors the source handling at the top of ReactorSimulator.advance
+        if self.source_state == "OUT" and state == "IN":
+            self.power[:] = 2.53e-3
+        self.S = self.source_strength * (1.0 if state == "IN" else 0.0)
+        self.source_state = state
+
+    def move_rods(self, dt):
+        step = self.rod_speed * dt
+        x = self.rod_positions
+        has_target = ~np.isnan(self.rod_targets) & ~self.scram_active[:, None]
+        delta = np.clip(np.where(has_target, self.rod_targets - x, 0.0), -step, step)
+        x = x + delta
+        x[self.scram_active] = np.maximum(x[self.scram_active] - step, self.min_position)
+        self.rod_positions = np.clip(x, self.min_position, self.max_position)
+
+        reached = has_target & (self.rod_positions == self.rod_targets)
+        self.rod_targets[reached | self.scram_active[:, None]] = np.nan
+        done = self.scram_active & np.all(self.rod_positions <= self.min_position, axis=1)
+        self.scram_active[done] = False
+
+    def step(self, dt):
+        self.current_time += dt
+        self.move_rods(dt)
+
+        self.rod_rho = self.calculate_rod_rho()
+        temp_rho, d_rho_dP = self.temp_feedback.rho(self.power)
+        self.total_rho = self.rod_rho + temp_rho
+
+        dr_dP = d_rho_dP * 0.01 * self.beta_eff
+        r_k = self.total_rho * 0.01 * self.beta_eff
+        r_0 = r_k - dr_dP * self.power
+
+        Lambda = self.Lambda
+        decay = 1.0 + dt * self.lam_i
+        beta_div_L = self.beta_i / Lambda[:, None]
+        sum_term_b = np.sum(self.lam_i * beta_div_L / decay, axis=1)
+        sum_term_c = np.sum(self.lam_i * self.C / decay, axis=1)
+
+        a = -dt / Lambda * dr_dP
+        b = 1.0 - dt / Lambda * (r_0 - self.beta_eff) + dt * sum_term_b
+        c = -(self.power + dt * self.S + dt * sum_term_c)
+
+        discriminant = b**2 - 4 * a * c
+        real_roots = discriminant >= 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            root = np.sqrt(np.where(real_roots, discriminant, 0.0))
+            sol1 = (-b + root) / (2 * a)
+            sol2 = (-b - root) / (2 * a)
+            linear = -c / b
+        new_power = np.where(sol1 > 0, sol1, sol2)
+        new_power = np.where(a == 0, linear, new_power)
+        # Fall back to the previous power where the roots are complex
+        new_power = np.where(real_roots | (a == 0), new_power, self.power)
+        self.power = np.maximum(new_power, 1e-25)
+
+        self.C = (self.C + dt * beta_div_L * self.power[:, None]) / decay
+
+        self.temperature += (self.power * 1e-6 * 0.001) - (self.temperature - 20) * self.heat_loss_coefficient * dt
+        self.temperature = np.maximum(self.temperature, 20)
+
+    def run(self, n_steps, dt=0.05, record_every=0):
+        """Advance all members `n_steps` times; optionally return every `record_every`-th power sample."""
+        records = []
+        start = time.perf_counter()
+        for k in range(1, n_steps + 1):
+            self.step(dt)
+            if record_every and k % record_every == 0:
+                records.append(self.power.copy())
+        self.elapsed += time.perf_counter() - start
+        self.member_steps += self.n * n_steps
+        return np.array(records) if record_every else None
+
+    def throughput(self):
+        # Member-steps per wall-clock second over all calls to run()
+        return self.member_steps / self.elapsed if self.elapsed > 0 else 0.0
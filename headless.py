@@ -0,0 +1,144 @@
+import json
+import time
+import numpy as np
+
+from simulation import ReactorSimulator
+
+# Scenario events are plain dicts so they can live in JSON files:
+#   {"time": 2.0, "action": "rod", "rod": "Tran", "target": 480}
+#   {"time": 5.0, "action": "source", "state": "IN"}
+#   {"time": 9.0, "action": "scram"}
+#   {"time": 1.0, "action": "mode", "mode": "Auto"}
+#   {"time": 1.0, "action": "mode", "mode": "Pulse", "cylinder": 960}   (TR drive cylinder for Square/Pulse)
+#   {"time": 2.0, "action": "fire"}
+#   {"time": 1.0, "action": "demand", "power": 1e5}   (W, for the Auto controller)
+EVENT_ACTIONS = ("rod", "source", "scram", "mode", "fire", "demand")
+
+class Scenario:
+    def __init__(self, duration, dt=0.05, events=None, source="OUT", initial_rods=None, name="scenario"):
+        if dt <= 0 or duration <= 0:
+            raise ValueError("duration and dt must be positive")
+        self.name = name
+        self.duration = float(duration)
+        self.dt = float(dt)
+        self.source = source
+        self.initial_rods = dict(initial_rods or {})
+        self.events = sorted((dict(e) for e in (events or [])), key=lambda e: e["time"])
+        for event in self.events:
+            if event.get("action") not in EVENT_ACTIONS:
+                raise ValueError(f"Unknown scenario action: {event.get('action')!r}")
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            duration=data["duration"],
+            dt=data.get("dt", 0.05),
+            events=data.get("events", []),
+            source=data.get("source", "OUT"),
+            initial_rods=data.get("initial_rods"),
+            name=data.get("name", "scenario"),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "duration": self.duration,
+            "dt": self.dt,
+            "source": self.source,
+            "initial_rods": self.initial_rods,
+            "events": self.events,
+        }
+
+class HeadlessRunner:
+    """Runs a Scenario on a ReactorSimulator as fast as possible, without any GUI."""
+
+    def __init__(self, scenario, sim=None):
+        self.scenario = scenario
+        self.sim = sim if sim is not None else ReactorSimulator()
+        # "source" is 1.0 while the source is IN, as in the session logs, so the output replays like a GUI log
+        self.columns = ["time", "power", "rho", "temperature", "F_Temp1", "F_Temp2"] + self.sim.rod_names + ["source"]
+        self.elapsed = 0.0
+
+    def prepare(self):
+        sim = self.sim
+        sim.reset_simulation()
+        for name, position in self.scenario.initial_rods.items():
+            sim.rod_positions[name] = min(max(position, sim.min_position), sim.max_position)
+        if self.scenario.initial_rods:
+            sim.reset_simulation_state()
+        sim.running = True
+        sim.previous_source_state = self.scenario.source
+        return sim
+
+    def apply_event(self, event):
+        sim = self.sim
+        action = event["action"]
+        if action == "rod":
+            if event["rod"] not in sim.rod_names:
+                raise ValueError(f"Unknown rod: {event['rod']!r}")
+            target = float(event["target"])
+            if not np.isfinite(target):
+                raise ValueError(f"Rod target must be a finite position, got {event['target']!r}")
+            sim.rod_targets[event["rod"]] = min(max(target, sim.min_position), sim.max_position)
+        elif action == "source":
+            self.source_state = event["state"]
+        elif action == "scram":
+            sim.scram_active = True
+        elif action == "mode":
+            if sim.modes.select(event["mode"]) and "cylinder" in event:
+                sim.modes.cylinder_position = min(max(event["cylinder"], sim.min_position), sim.max_position)
+        elif action == "fire":
+            sim.modes.fire()
+        elif action == "demand":
+            sim.auto_controller.demand = float(event["power"])
+
+    def run(self):
+        """Returns the trajectory as a dict of equally long NumPy arrays."""
+        scenario = self.scenario
+        sim = self.prepare()
+        self.source_state = scenario.source
+
+        n_steps = int(round(scenario.duration / scenario.dt))
+        trajectory = {name: np.empty(n_steps + 1) for name in self.columns}
+        rod_names = sim.rod_names
+        events = scenario.events
+        next_event = 0
+
+        start = time.perf_counter()
+        for k in range(n_steps + 1):
+            if k > 0:
+                # Events scheduled up to the start of this step take effect before it
+                t_step = (k - 1) * scenario.dt
+                while next_event < len(events) and events[next_event]["time"] <= t_step + 1e-9:
+                    self.apply_event(events[next_event])
+                    next_event += 1
+                sim.advance(scenario.dt, self.source_state)
+
+            trajectory["time"][k] = sim.current_time
+            trajectory["power"][k] = sim.power
+            trajectory["rho"][k] = sim.total_rho
+            trajectory["temperature"][k] = sim.temperature
+            for name in rod_names:
+                trajectory[name][k] = sim.rod_positions[name]
+            trajectory["source"][k] = 1.0 if sim.previous_source_state == "IN" else 0.0
+
+        # Fuel temperatures are a pure function of power, so evaluate them in one batch
+        fuel_temps = sim.predict_temp_feedback(trajectory["power"])
+        trajectory["F_Temp1"][:] = fuel_temps[:, 0]
+        trajectory["F_Temp2"][:] = fuel_temps[:, 1]
+        self.elapsed = time.perf_counter() - start
+        return trajectory
+
+    def realtime_factor(self):
+        # Simulated seconds per wall-clock second of the last run
+        return self.scenario.duration / self.elapsed if self.elapsed > 0 else float("inf")
+
+def run_scenario(scenario, sim=None):
+    if isinstance(scenario, dict):
+        scenario = Scenario.from_dict(scenario)
+    return HeadlessRunner(scenario, sim).run()
@@ -0,0 +1,129 @@
+import numpy as np
+
+class HistoryBuffer:
+    """Preallocated circular store for the simulator history.
+
+    Every sample is written twice, at ``slot`` and ``slot + capacity``, so the
+    live window is always one contiguous slice of the backing array and
+    ``view()`` can hand out zero-copy NumPy views for plotting.
+
+    ``reserve`` extra slots are allocated beyond ``capacity``: after
+    ``snapshot()`` that many samples can be appended before the snapshot's
+    oldest sample is overwritten, so another thread can keep reading it.
+
+    With ``grow=True`` a full buffer doubles its capacity instead of
+    evicting the oldest sample, so only ``drop_before()`` removes data;
+    use it when samples are windowed by time rather than by count.
+    Snapshots taken before a resize keep the old array and stay valid.
+    """
+
+    def __init__(self, columns, capacity, reserve=0, grow=False):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.columns = list(columns)
+        self.capacity = int(capacity)
+        self.reserve = int(reserve)
+        self.grow = grow
+        self._ring = self.capacity + self.reserve
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._buffer = np.zeros((len(self.columns), 2 * self._ring))
+        self._start = 0 # absolute index of the oldest sample
+        self._end = 0   # absolute index one past the newest sample
+        self.generation = 0 # bumped by clear() so incremental readers can tell they must restart
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def appended(self):
+        # Samples appended since the last clear(), including ones already dropped
+        return self._end
+
+    @property
+    def source(self):
+        # The live buffer behind this object (snapshots return the buffer they were taken from)
+        return self
+
+    def append(self, values):
+        # values are given in column order
+        if self._end - self._start == self.capacity:
+            if self.grow:
+                self._resize(2 * self.capacity)
+            else:
+                self._start += 1
+        slot = self._end % self._ring
+        self._buffer[:, slot] = values
+        self._buffer[:, slot + self._ring] = values
+        self._end += 1
+
+    def _resize(self, capacity):
+        # Copy the live window into a new array; absolute indices (and so `appended`) are unchanged
+        live = self._buffer[:, self._start % self._ring:self._start % self._ring + len(self)]
+        ring = capacity + self.reserve
+        slots = np.arange(self._start, self._end) % ring
+        buffer = np.zeros((len(self.columns), 2 * ring))
+        buffer[:, slots] = live
+        buffer[:, slots + ring] = live
+        self.capacity = capacity
+        self._ring = ring
+        self._buffer = buffer
+
+    def view(self, name):
+        offset = self._start % self._ring
+        return self._buffer[self._column_index[name], offset:offset + len(self)]
+
+    def last(self, name):
+        if self._end == self._start:
+            raise IndexError("history is empty")
+        return self._buffer[self._column_index[name], (self._end - 1) % self._ring]
+
+    def snapshot(self):
+        return HistorySnapshot(self)
+
+    def drop_before(self, name, threshold):
+        # Column must be non-decreasing (e.g. time); O(log n) instead of popping
+        n_old = int(np.searchsorted(self.view(name), threshold, side="left"))
+        self._start += n_old
+        return n_old
+
+    def clear(self):
+        self._start = 0
+        self._end = 0
+        self.generation += 1
+
+class HistorySnapshot:
+    """Read-only HistoryBuffer window frozen at the moment it was taken.
+
+    Shares the backing array (no copy); valid while fewer than
+    ``history.reserve`` samples have been appended since, or until clear().
+    """
+
+    __slots__ = ("columns", "source", "generation", "_column_index", "_buffer", "_ring", "_start", "_end")
+
+    def __init__(self, history):
+        self.columns = history.columns
+        self.source = history
+        self.generation = history.generation
+        self._column_index = history._column_index
+        self._buffer = history._buffer
+        self._ring = history._ring
+        self._start = history._start
+        self._end = history._end
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def appended(self):
+        return self._end
+
+    def view(self, name):
+        offset = self._start % self._ring
+        view = self._buffer[self._column_index[name], offset:offset + len(self)]
+        view.flags.writeable = False
+        return view
+
+    def last(self, name):
+        if self._end == self._start:
+            raise IndexError("history is empty")
+        return self._buffer[self._column_index[name], (self._end - 1) % self._ring]
@@ -0,0 +1,109 @@
+import functools
+import numpy as np
+
+def inhour_rho(omega, beta_i, lam_i, Lambda, beta_eff):
+    """Reactivity (cents) whose stable inverse period is `omega` (1/s).
+
+    From the point-kinetics equations with P, C ~ exp(omega t):
+        rho = omega Lambda + beta_eff - sum(lam_i beta_i / (omega + lam_i))
+    Explicit, so it is the cheap direction (used for period limiting).
+    """
+    omega = np.asarray(omega, dtype=float)
+    rho = omega * Lambda + beta_eff - np.sum(lam_i * beta_i / (omega[..., None] + lam_i), axis=-1)
+    return rho / (0.01 * beta_eff)
+
+def inhour_roots(rho, beta_i, lam_i, Lambda, beta_eff):
+    """All 7 roots omega of the inhour equation for each reactivity (cents), sorted descending.
+
+    The roots are the eigenvalues of the point-kinetics matrix, which is
+    the companion form of the inhour equation; one batched eigvals call
+    covers any number of reactivities. Returns shape rho.shape + (7,).
+    """
+    rho_abs = np.asarray(rho, dtype=float) * 0.01 * beta_eff
+    flat = rho_abs.reshape(-1)
+    A = np.zeros((len(flat), 7, 7))
+    A[:, 0, 0] = (flat - beta_eff) / Lambda
+    A[:, 0, 1:] = lam_i
+    A[:, 1:, 0] = beta_i / Lambda
+    A[:, 1:, 1:] = -np.diag(lam_i)
+    roots = np.sort(np.linalg.eigvals(A).real, axis=-1)[:, ::-1]
+    return roots.reshape(rho_abs.shape + (7,))
+
+def inhour_root_direct(rho, beta_i, lam_i, Lambda, beta_eff, tol=1e-13):
+    # Dominant root by bisection: inhour_rho is increasing on (-min(lam_i), inf)
+    lo = -np.min(lam_i) * (1.0 - 1e-12)
+    hi = 1.0
+    while inhour_rho(hi, beta_i, lam_i, Lambda, beta_eff) < rho:
+        hi *= 2.0
+    if inhour_rho(lo, beta_i, lam_i, Lambda, beta_eff) > rho:
+        return lo
+    while hi - lo > tol * max(1.0, abs(hi)):
+        mid = 0.5 * (lo + hi)
+        if inhour_rho(mid, beta_i, lam_i, Lambda, beta_eff) < rho:
+            lo = mid
+        else:
+            hi = mid
+    return 0.5 * (lo + hi)
+
+class InhourTable:
+    """Memoized reactivity -> stable period table.
+
+    The dominant inhour root is solved once for a uniform reactivity grid
+    (cents) with inhour_roots(); period() and omega() then interpolate in
+    O(1). The inverse period omega is interpolated rather than the period,
+    which is singular at critical.
+    """
+
+    def __init__(self, beta_i, lam_i, Lambda, beta_eff, rho_min=-1500.0, rho_max=800.0, rho_step=0.25):
+        self.beta_i = np.asarray(beta_i, dtype=float)
+        self.lam_i = np.asarray(lam_i, dtype=float)
+        self.Lambda = float(Lambda)
+        self.beta_eff = float(beta_eff)
+        self.rho_min = rho_min
+        self.rho_step = rho_step
+        self.rho_grid = np.arange(rho_min, rho_max + rho_step, rho_step)
+        self.omega_grid = inhour_roots(self.rho_grid, self.beta_i, self.lam_i, self.Lambda, self.beta_eff)[:, 0]
+        self._omega_list = self.omega_grid.tolist() # plain floats for the scalar lookup
+        self._last = len(self.rho_grid) - 2
+
+    @classmethod
+    def for_simulator(cls, sim):
+        return _cached_table(tuple(sim.beta_i), tuple(sim.lam_i), float(sim.Lambda), float(sim.beta_eff))
+
+    def omega(self, rho):
+        # Stable inverse period (1/s) at reactivity rho (cents); arrays are interpolated elementwise
+        if np.ndim(rho):
+            return np.interp(rho, self.rho_grid, self.omega_grid)
+        pos = (rho - self.rho_min) / self.rho_step
+        if pos <= 0.0:
+            return self._omega_list[0]
+        i = int(pos)
+        if i > self._last:
+            return self._omega_list[-1]
+        frac = pos - i
+        return self._omega_list[i] + frac * (self._omega_list[i + 1] - self._omega_list[i])
+
+    def period(self, rho):
+        omega = self.omega(rho)
+        if np.ndim(omega):
+            with np.errstate(divide="ignore"):
+                return np.where(omega != 0.0, 1.0 / np.where(omega == 0.0, 1.0, omega), np.inf)
+        return 1.0 / omega if omega != 0.0 else float("inf")
+
+    def rho_for_period(self, period):
+        # Exact inverse lookup: reactivity (cents) that gives a stable `period` (s)
+        return inhour_rho(1.0 / np.asarray(period, dtype=float), self.beta_i, self.lam_i, self.Lambda, self.beta_eff)
+
+    def check(self, n=500, seed=0):
+        """Largest relative error of omega() against the direct root find, over n random reactivities."""
+        rng = np.random.default_rng(seed)
+        rhos = rng.uniform(self.rho_grid[0], self.rho_grid[-1], n)
+        worst = 0.0
+        for rho in rhos:
+            exact = inhour_root_direct(rho, self.beta_i, self.lam_i, self.Lambda, self.beta_eff)
+            worst = max(worst, abs(self.omega(rho) - exact) / max(abs(exact), 1e-3))
+        return worst
+
+@functools.lru_cache(maxsize=8)
+def _cached_table(beta_i, lam_i, Lambda, beta_eff):
+    return InhourTable(np.array(beta_i), np.array(lam_i), Lambda, beta_eff)
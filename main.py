@@ -1,10 +1,21 @@
+import time
+_START = time.perf_counter() # startup timeline origin, taken before the Qt import
+
 import sys
-from PyQt5.QtWidgets import QApplication
-from ui import ReactorSimulatorWindow
+from profiling import StartupTimeline
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    sim = ReactorSimulatorWindow()
+    timeline = StartupTimeline(origin=_START)
+    with timeline.phase("import Qt"):
+        from PyQt5.QtWidgets import QApplication
+        from PyQt5.QtCore import QTimer
+    with timeline.phase("QApplication"):
+        app = QApplication(sys.argv)
+    with timeline.phase("import ui"):
+        from ui import ReactorSimulatorWindow
+    sim = ReactorSimulatorWindow(timeline)
     # sim.showMaximized()
-    sim.show()
+    with timeline.phase("show"):
+        sim.show()
+    QTimer.singleShot(0, lambda: timeline.mark("event loop running"))
     sys.exit(app.exec_())
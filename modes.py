@@ -0,0 +1,175 @@
+from rod_worth import SQUARE_WAVE_MAX_DOLLARS, PULSE_MAX_DOLLARS
+
+# Console limits from manual_for_chatbot.md
+FIRE_MAX_POWER = 1e3           # W, power must be below this to arm square wave or pulse
+SQUARE_WAVE_MAX_DEMAND = 5e5   # W, square waves are limited to 500 kW
+PEAK_TURNOVER = 0.9            # a pulse peaked if the power at the scram is below this fraction of its maximum
+
+class ModeStateMachine:
+    """Console operating modes, including the square wave and pulse sequences.
+
+    States: MANUAL, AUTO, SQUARE_READY, SQUARE_FIRED, PULSE_READY,
+    PULSE_FIRED and SCRAM (end of a pulse, holding the pulse data).
+
+    In the READY states the air is off: the TR stays put and its up/down
+    buttons move the drive cylinder instead (a pulse starts with the
+    cylinder at 100 %). fire() applies air and the TR follows the cylinder
+    at `pneumatic_speed` rather than the motor `rod_speed`.
+
+    - Square wave: once power reaches the Auto demand the servo takes over
+      (AUTO); if it is not reached within `square_wave_timeout` s, MANUAL.
+    - Pulse: the adaptive integrator resolves the excursion, then after
+      `pulse_scram_delay` s the rods are scrammed and `pulse_report` holds
+      peak power, time to peak, energy and inserted reactivity. If the
+      power was still rising or level at the scram (no turnover, e.g. a
+      small insertion that plateaus), "peak_reached" is False and
+      "peak_time" is None: "peak_power" is then only the highest power seen.
+
+    While the TR is moving pneumatically, advance() is split into steps of
+    at most `fine_step` s so the rod ramp is followed closely.
+
+    select() and fire() run on the physics thread between ticks (the GUI
+    and the server queue them there); refusals leave the reason in
+    `message` for the status display.
+    """
+
+    def __init__(self, sim, rod="Tran", pneumatic_speed=9600.0, square_wave_timeout=10.0,
+                 pulse_scram_delay=1.0, fine_step=1e-3):
+        self.sim = sim
+        self.rod = rod
+        self.pneumatic_speed = pneumatic_speed # units/s, full stroke in 0.1 s
+        self.square_wave_timeout = square_wave_timeout
+        self.pulse_scram_delay = pulse_scram_delay
+        self.fine_step = fine_step
+        self.reset()
+
+    def reset(self):
+        self.state = "MANUAL"
+        self.cylinder_position = self.sim.min_position
+        self.fire_time = None
+        self.inserted_dollars = 0.0
+        self.previous_integrator = None
+        self.pulse_report = None
+        self.message = ""
+
+    @property
+    def rod_moving(self):
+        # TR travelling to the cylinder under air
+        return self.state in ("SQUARE_FIRED", "PULSE_FIRED") and self.sim.rod_positions[self.rod] != self.cylinder_position
+
+    def _refuse(self, message):
+        self.message = message
+        return False
+
+    def select(self, mode):
+        """Console mode switch: "Manual", "Auto", "Square" or "Pulse". Returns False (with self.message) if refused."""
+        sim = self.sim
+        if mode in ("Manual", "Auto"):
+            self._restore_integrator()
+            self.message = ""
+            sim.mode_selected = mode
+            self.state = mode.upper()
+            return True
+        if mode not in ("Square", "Pulse"):
+            raise ValueError(f"Unknown mode: {mode!r}")
+        if self.state in ("SQUARE_FIRED", "PULSE_FIRED"):
+            return self._refuse("Cannot change mode while the transient rod is fired")
+        if sim.power >= FIRE_MAX_POWER:
+            return self._refuse(f"{mode} mode requires power below {FIRE_MAX_POWER / 1e3:.0f} kW")
+        if sim.rod_positions[self.rod] > sim.min_position:
+            return self._refuse(f"{mode} mode requires the {self.rod} rod at its low limit")
+        self.message = ""
+        self.cylinder_position = sim.max_position if mode == "Pulse" else sim.min_position
+        sim.mode_selected = mode
+        self.state = "PULSE_READY" if mode == "Pulse" else "SQUARE_READY"
+        return True
+
+    def fire(self):
+        sim = self.sim
+        if self.state not in ("SQUARE_READY", "PULSE_READY"):
+            return self._refuse("Fire requires square wave or pulse ready")
+        inserted = self.cylinder_dollars()
+        if self.state == "SQUARE_READY":
+            if not 0 < inserted < SQUARE_WAVE_MAX_DOLLARS:
+                return self._refuse(f"Square wave insertion must be below ${SQUARE_WAVE_MAX_DOLLARS:.2f} (cylinder gives ${inserted:.2f})")
+            if not 0 < sim.auto_controller.demand <= SQUARE_WAVE_MAX_DEMAND:
+                return self._refuse(f"Set a square wave demand of at most {SQUARE_WAVE_MAX_DEMAND / 1e3:.0f} kW")
+            next_state = "SQUARE_FIRED"
+        else:
+            excess = sim.total_rho / 100 + inserted
+            if excess > PULSE_MAX_DOLLARS:
+                return self._refuse(f"Pulse would insert ${excess:.2f}; the limit is ${PULSE_MAX_DOLLARS:.2f}")
+            self.previous_integrator = sim.integrator
+            sim.integrator = "adaptive"
+            self.pulse_report = {"peak_power": sim.power, "peak_time": 0.0, "peak_reached": False, "energy": 0.0,
+                                 "dollars": excess}
+            next_state = "PULSE_FIRED"
+        self.message = ""
+        self.inserted_dollars = inserted
+        self.fire_time = sim.current_time
+        self.state = next_state
+        return True
+
+    def cylinder_dollars(self):
+        # Reactivity ($) the TR would insert if fired to the current cylinder position
+        sim = self.sim
+        worth = sim.rod_worth
+        return (worth.worth_at(self.rod, self.cylinder_position) - worth.worth_at(self.rod, sim.rod_positions[self.rod])) / 100
+
+    def _restore_integrator(self):
+        if self.previous_integrator is not None:
+            self.sim.integrator = self.previous_integrator
+            self.previous_integrator = None
+
+    def drives_rod(self, name):
+        return name == self.rod and self.state in ("SQUARE_READY", "PULSE_READY", "SQUARE_FIRED", "PULSE_FIRED")
+
+    def move_rod(self, dt):
+        # TR motion in the square wave / pulse states (called from ReactorSimulator.advance)
+        sim = self.sim
+        if self.state in ("SQUARE_READY", "PULSE_READY"):
+            if sim.pressed_state[self.rod + "_up"]:
+                self.cylinder_position = min(self.cylinder_position + sim.rod_speed * dt, sim.max_position)
+            if sim.pressed_state[self.rod + "_down"]:
+                self.cylinder_position = max(self.cylinder_position - sim.rod_speed * dt, sim.min_position)
+            return
+        position = sim.rod_positions[self.rod]
+        step = self.pneumatic_speed * dt
+        if abs(self.cylinder_position - position) <= step:
+            position = self.cylinder_position
+        else:
+            position = position + step if self.cylinder_position > position else position - step
+        sim.rod_positions[self.rod] = min(max(position, sim.min_position), sim.max_position)
+
+    def after_step(self, dt):
+        # Sequence checks once the kinetics step is done
+        sim = self.sim
+        if sim.scram_active and self.state not in ("MANUAL", "SCRAM"):
+            self._restore_integrator()
+            sim.mode_selected = "Manual"
+            self.state = "MANUAL"
+            return
+        if self.state == "SQUARE_FIRED":
+            if sim.power >= sim.auto_controller.demand:
+                sim.mode_selected = "Auto"
+                self.state = "AUTO"
+            elif sim.current_time - self.fire_time >= self.square_wave_timeout:
+                self.message = "Square wave demand not reached in time; switched to manual"
+                sim.mode_selected = "Manual"
+                self.state = "MANUAL"
+        elif self.state == "PULSE_FIRED":
+            kinetics = sim.adaptive_kinetics
+            report = self.pulse_report
+            report["energy"] += kinetics.energy
+            if kinetics.peak_power > report["peak_power"]:
+                report["peak_power"] = kinetics.peak_power
+                report["peak_time"] = sim.current_time - dt + kinetics.peak_offset - self.fire_time
+            if sim.current_time - self.fire_time >= self.pulse_scram_delay:
+                # A peak only counts if the power turned over before the scram
+                report["peak_reached"] = sim.power < PEAK_TURNOVER * report["peak_power"]
+                if not report["peak_reached"]:
+                    report["peak_time"] = None
+                self._restore_integrator()
+                sim.scram_active = True
+                sim.mode_selected = "Manual"
+                self.state = "SCRAM"
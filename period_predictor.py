@@ -0,0 +1,167 @@
+import numpy as np
+
+class PeriodPredictor:
+    """Projects the stable period and power a few seconds ahead.
+
+    For constant reactivity the kinetics (power + 6 precursor groups) are
+    linear, so the response from any state is a sum of 7 exponential modes.
+    The modes are precomputed once on a reactivity grid:
+
+        y(t) = V (exp(w t) * W y0 + phi(w, t) * q S),  W = V^-1
+
+    with phi(w, t) = (exp(w t) - 1) / w. For the semi-implicit integrator the
+    modes are those of the simulator's own one-step map at `step_dt`, so the
+    prediction matches what the simulator will actually do; for the adaptive
+    integrator they are the eigenmodes of the kinetics matrix.
+
+    predict() splits the horizon into segments with piecewise-constant
+    reactivity: rod positions follow the current rod motion (buttons,
+    targets, scram) and temperature feedback is evaluated at the projected
+    power at the start of each step; steps are cut so the feedback moves by
+    at most `max_feedback_change` cents between evaluations. Nothing is re-simulated per call.
+    """
+
+    def __init__(self, sim, horizon=3.0, segments=6, rho_min=-1500.0, rho_max=800.0, rho_step=0.5, step_dt=0.05, power_cap=1e10):
+        self.sim = sim
+        self.horizon = horizon
+        self.segments = segments
+        self.rho_min = rho_min
+        self.rho_step = rho_step
+        self.rho_grid = np.arange(rho_min, rho_max + rho_step, rho_step)
+        self.step_dt = step_dt
+        self.max_feedback_change = 2.0 # cents of temperature reactivity per step
+        self.max_steps = 60 # bounds the per-call work; a prompt-critical pulse is cut short here
+        self.power_cap = power_cap # projections past this are off scale (prompt critical without the pulse turnaround)
+        self._tables = {} # integrator name -> (omega, V, W, q, dominant omega)
+
+    def tables(self, integrator):
+        if integrator not in self._tables:
+            self._tables[integrator] = self._build(integrator)
+        return self._tables[integrator]
+
+    def _build(self, integrator):
+        sim = self.sim
+        n = len(self.rho_grid)
+        rho = self.rho_grid * 0.01 * sim.beta_eff # absolute
+        beta_div_L = sim.beta_i / sim.Lambda
+
+        if integrator == "adaptive":
+            A = np.zeros((n, 7, 7))
+            A[:, 0, 0] = (rho - sim.beta_eff) / sim.Lambda
+            A[:, 0, 1:] = sim.lam_i
+            A[:, 1:, 0] = beta_div_L
+            A[:, 1:, 1:] = -np.diag(sim.lam_i)
+            mu, V = np.linalg.eig(A)
+            omega, V = mu.real, V.real
+            W = np.linalg.inv(V)
+            q = W[:, :, 0] # the source feeds dP/dt directly
+        else:
+            # One step of ReactorSimulator.semi_implicit_step with the feedback slope dropped:
+            #   P' = (P + dt sum(lam C / d) + dt S) / b,  C' = (C + dt beta / Lambda P') / d
+            dt = self.step_dt
+            d = 1.0 + dt * sim.lam_i
+            b = 1.0 - dt / sim.Lambda * (rho - sim.beta_eff) + dt * np.sum(sim.lam_i * beta_div_L / d)
+            G = np.zeros((n, 7, 7))
+            G[:, 0, 0] = 1.0 / b
+            G[:, 0, 1:] = dt * sim.lam_i / d / b[:, None]
+            G[:, 1:, :] = dt * (beta_div_L / d)[None, :, None] * G[:, 0:1, :]
+            G[:, 1:, 1:] += np.diag(1.0 / d)
+            g = np.zeros((n, 7))
+            g[:, 0] = dt / b
+            g[:, 1:] = dt * beta_div_L / d * g[:, 0:1]
+            # Far above prompt critical b < 0 and the linearized map has no meaning
+            # (the real step is held up by feedback); those rows use the continuous modes
+            valid = b > 0
+            omega, V, W, q, _ = self.tables("adaptive")
+            omega, V, W, q = omega.copy(), V.copy(), W.copy(), q.copy()
+            mu, vectors = np.linalg.eig(G[valid])
+            mu, V[valid] = mu.real, vectors.real
+            W[valid] = np.linalg.inv(V[valid])
+            omega[valid] = np.log(mu) / dt
+            # Sum of mu^k over n steps is phi(omega, n dt) * omega / (mu - 1)
+            scale = np.where(np.abs(mu - 1.0) > 1e-12, omega[valid] / np.where(mu == 1.0, 1.0, mu - 1.0), 1.0 / dt)
+            q[valid] = np.einsum("nij,nj->ni", W[valid], g[valid]) * scale
+        return omega, V, W, q, omega.max(axis=1)
+
+    def _rod_positions(self, t):
+        # Rod positions after `t` seconds (array) of the rod motion currently commanded
+        sim = self.sim
+        travel = sim.rod_speed * np.asarray(t, dtype=float)
+        columns = []
+        for name in sim.rod_names:
+            x = sim.rod_positions[name]
+            if sim.scram_active:
+                x = np.maximum(x - travel, sim.min_position)
+            elif name in sim.rod_targets:
+                target = sim.rod_targets[name]
+                x = x + np.sign(target - x) * np.minimum(travel, abs(target - x))
+            else:
+                if sim.pressed_state[name + "_up"]:
+                    x = np.minimum(x + travel, sim.max_position)
+                if sim.pressed_state[name + "_down"]:
+                    x = np.maximum(x - travel, sim.min_position)
+                x = x + np.zeros_like(travel)
+            columns.append(x)
+        return np.stack(columns, axis=-1)
+
+    def _locate(self, omega_max, rho):
+        # Grid cell and interpolation weight for rho (cents), plus the interpolated dominant inverse period
+        pos = (min(max(rho, self.rho_grid[0]), self.rho_grid[-1]) - self.rho_min) / self.rho_step
+        i = min(int(pos), len(self.rho_grid) - 2)
+        frac = pos - i
+        return i, frac, (1.0 - frac) * omega_max[i] + frac * omega_max[i + 1]
+
+    def _project(self, tables, i, frac, y, source, t):
+        # State after t seconds at constant reactivity, blended between grid points i and i + 1
+        omega, V, W, q, _ = tables
+        w = omega[i:i + 2]
+        wt = np.minimum(w * t, 700.0)
+        z = (W[i:i + 2] @ y) * np.exp(wt)
+        if source:
+            phi = np.where(np.abs(wt) > 1e-9, np.expm1(wt) / np.where(w == 0.0, 1.0, w), t)
+            z += q[i:i + 2] * phi * source
+        y_new = np.einsum("kij,kj->ki", V[i:i + 2], z)
+        return (1.0 - frac) * y_new[0] + frac * y_new[1]
+
+    def predict(self):
+        """Returns a dict with the stable period (s), projected power and peak power (W) and reactivity (cents) at the horizon."""
+        sim = self.sim
+        tables = self.tables(sim.integrator)
+        omega_max = tables[4]
+        seg_dt = self.horizon / self.segments
+        rod_rho = sim.rod_worth.total(self._rod_positions((np.arange(self.segments) + 0.5) * seg_dt))
+
+        y = np.concatenate(([sim.power], sim.C))
+        peak = sim.power
+        n_steps = 0
+        for k in range(self.segments):
+            remaining = seg_dt
+            h = seg_dt
+            while remaining > 0.0:
+                temp_rho, _ = sim.temp_feedback.rho(y[0])
+                rho = rod_rho[k] + temp_rho
+                i, frac, _ = self._locate(omega_max, rho)
+                h = min(remaining, h)
+                y_new = self._project(tables, i, frac, y, sim.S, h)
+                # The feedback is frozen over a step: halve and retry if it would have moved too far
+                n_steps += 1
+                if n_steps >= self.max_steps:
+                    break
+                if abs(sim.temp_feedback.rho(min(max(y_new[0], 0.0), self.power_cap))[0] - temp_rho) > self.max_feedback_change:
+                    h *= 0.5
+                    continue
+                y = y_new
+                y[0] = max(y[0], 1e-25)
+                if y[0] > self.power_cap:
+                    y *= self.power_cap / y[0]
+                peak = max(peak, y[0])
+                remaining -= h
+                h *= 2.0
+            if n_steps >= self.max_steps:
+                break # prompt-critical excursion: report the state reached so far
+
+        temp_rho, _ = sim.temp_feedback.rho(y[0])
+        rho = rod_rho[k] + temp_rho
+        omega = self._locate(omega_max, rho)[2]
+        period = 1.0 / omega if omega != 0.0 else np.inf
+        return {"period": period, "power": y[0], "peak_power": peak, "rho": rho}
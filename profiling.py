@@ -0,0 +1,184 @@
+import csv
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+class StartupTimeline:
+    """Wall-clock phases of application startup, measured from a common origin.
+
+    Phases may be recorded from any thread (the background asset loader
+    records its own), so the report shows what overlapped with what.
+    mark() records an instant such as "window shown" or "first frame".
+    """
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = [] # (name, start, end, thread name), times relative to origin in seconds
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end):
+        # start and end are perf_counter() values
+        with self._lock:
+            self.phases.append((name, start - self.origin, end - self.origin, threading.current_thread().name))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter())
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def report(self):
+        """Phases in start order as dicts with start_ms, duration_ms and thread."""
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        return [{"phase": name, "start_ms": start * 1e3, "duration_ms": (end - start) * 1e3, "thread": thread}
+                for name, start, end, thread in phases]
+
+    def format(self):
+        lines = [f"{'phase':<24}{'start ms':>10}{'ms':>10}  thread"]
+        for row in self.report():
+            duration = "" if row["duration_ms"] == 0 else f"{row['duration_ms']:.1f}"
+            lines.append(f"{row['phase']:<24}{row['start_ms']:>10.1f}{duration:>10}  {row['thread']}")
+        return "\n".join(lines)
+
+class SpanBuffer:
+    """The last `capacity` start times and durations (seconds) of one named span, in a fixed-size ring."""
+
+    def __init__(self, capacity):
+        self.starts = np.zeros(capacity)
+        self.durations = np.zeros(capacity)
+        self.count = 0 # total ever recorded; the ring holds the last min(count, capacity)
+
+    def append(self, start, duration):
+        i = self.count % len(self.starts)
+        self.starts[i] = start
+        self.durations[i] = duration
+        self.count += 1
+
+    def ordered(self):
+        # (starts, durations) oldest first
+        n = min(self.count, len(self.starts))
+        i = self.count % len(self.starts)
+        if self.count <= len(self.starts):
+            return self.starts[:n].copy(), self.durations[:n].copy()
+        return np.roll(self.starts, -i), np.roll(self.durations, -i)
+
+_MISSING = object()
+
+class FrameProfiler:
+    """Monotonic-clock spans around the stages of a frame, kept in fixed-size ring buffers.
+
+    instrument(obj, "method") replaces the method on that one object with a
+    timed wrapper that records a span under the method's name; remove() puts
+    every original back. Nothing is wrapped while profiling is off, so it
+    then costs nothing. Spans may be recorded from several threads (GUI and
+    physics worker); each span name is expected to come from one thread.
+
+    Timer jitter is measured on one span (`interval_span`, the whole frame):
+    the spread of the intervals between its starts around `period`.
+    """
+
+    def __init__(self, capacity=2048, period=None, interval_span="frame"):
+        self.capacity = capacity
+        self.period = period
+        self.interval_span = interval_span
+        self.origin = time.perf_counter()
+        self.buffers = {}
+        self._wrapped = [] # (obj, attr, original instance attribute or _MISSING)
+
+    def record(self, name, start, end):
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            buffer = self.buffers[name] = SpanBuffer(self.capacity)
+        buffer.append(start - self.origin, end - start)
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def instrument(self, obj, attr, name=None):
+        name = name or attr
+        original = getattr(obj, attr)
+        record = self.record
+        perf_counter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                record(name, start, perf_counter())
+        self._wrapped.append((obj, attr, obj.__dict__.get(attr, _MISSING)))
+        setattr(obj, attr, timed)
+
+    def remove(self):
+        # Undo instrument() in reverse order: restore instance attributes, drop wrappers over class methods
+        while self._wrapped:
+            obj, attr, original = self._wrapped.pop()
+            if original is _MISSING:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, original)
+
+    @property
+    def active(self):
+        return bool(self._wrapped)
+
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.buffers = {}
+
+    def jitter(self):
+        # Deviations (s) of the intervals between starts of `interval_span` from `period` (or from their mean)
+        buffer = self.buffers.get(self.interval_span)
+        if buffer is None or min(buffer.count, self.capacity) < 2:
+            return np.zeros(0)
+        intervals = np.diff(buffer.ordered()[0])
+        return intervals - (self.period if self.period else intervals.mean())
+
+    def stats(self):
+        """Per span: count and mean, p50, p99 and max duration in ms over the buffered spans; plus "jitter"."""
+        report = {}
+        for name, buffer in self.buffers.items():
+            durations = buffer.ordered()[1] * 1e3
+            report[name] = {
+                "count": buffer.count,
+                "mean_ms": float(durations.mean()),
+                "p50_ms": float(np.percentile(durations, 50)),
+                "p99_ms": float(np.percentile(durations, 99)),
+                "max_ms": float(durations.max()),
+            }
+        jitter = np.abs(self.jitter()) * 1e3
+        if len(jitter):
+            report["jitter"] = {"count": len(jitter), "mean_ms": float(jitter.mean()),
+                                "p50_ms": float(np.percentile(jitter, 50)), "p99_ms": float(np.percentile(jitter, 99)),
+                                "max_ms": float(jitter.max())}
+        return report
+
+    def export(self, path):
+        """Write the buffered spans as CSV rows (span, start_s, duration_ms), ordered by start time."""
+        rows = []
+        for name, buffer in self.buffers.items():
+            starts, durations = buffer.ordered()
+            rows.extend(zip(itertools.repeat(name), starts.tolist(), (durations * 1e3).tolist()))
+        rows.sort(key=lambda row: row[1])
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["span", "start_s", "duration_ms"])
+            writer.writerows(rows)
+        return len(rows)
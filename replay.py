@@ -0,0 +1,193 @@
+import argparse
+import sys
+import time
+import numpy as np
+
+from data_logger import iter_log
+from simulation import ReactorSimulator
+
+class LogReplay:
+    """Re-simulates a saved session log and reports where the physics diverges from it.
+
+    The log is streamed chunk by chunk. Logs saved from the GUI begin at a
+    reset, so by default the first interval is re-run from the reset state
+    (rods in, steady state); with `from_reset=False` the simulator starts
+    at the first row instead, in equilibrium at the logged power. Every
+    later interval is re-run with the rod positions
+    taken from the log instead of from buttons, targets, scram or the Auto
+    servo. Intervals are split into steps of at most `max_step` s, like
+    update_simulation(); within an interval each rod runs at rod_speed
+    until it reaches its logged position, which is exact for buttons,
+    targets, scram and rods stopping at a limit (the Auto servo's slower
+    moves are approximated). Logs without a "source" column are replayed
+    with the source `source`.
+
+    With `teacher_forcing` each interval starts from the logged power
+    (precursors carry on from the simulation), so the errors are one-step
+    prediction errors that do not accumulate.
+
+    Divergence is measured on the log of power, so low-power and full-power
+    periods count alike; the first logged time where the recomputed power
+    is off by more than `rtol` is reported as `first_divergence`.
+    """
+
+    def __init__(self, path, sim=None, rtol=1e-2, max_step=0.05, source="OUT", integrator=None, from_reset=True,
+                 keep_power=False, teacher_forcing=False, chunk_rows=4096):
+        self.path = path
+        self.sim = sim if sim is not None else ReactorSimulator()
+        self.rtol = rtol
+        self.max_step = max_step
+        self.source = source
+        self.integrator = integrator
+        self.from_reset = from_reset
+        self.keep_power = keep_power # also return the recomputed power for every row
+        self.teacher_forcing = teacher_forcing
+        self.chunk_rows = chunk_rows
+
+    def _set_state(self, row, power):
+        # Steady state at `power` with the rods and temperature of `row`
+        sim = self.sim
+        for name in sim.rod_names:
+            sim.rod_positions[name] = row[name]
+        sim.current_time = row["time"]
+        sim.power = power
+        sim.C = (sim.beta_i / (sim.Lambda * sim.lam_i)) * power
+        sim.temperature = row["temperature"]
+        sim.rod_rho = sim.calculate_rod_rho()
+        sim.temp_rho, _ = sim.temp_feedback.rho(power)
+        sim.total_rho = sim.rod_rho + sim.temp_rho
+        sim.previous_source_state = row["source"]
+
+    def _start(self, row):
+        sim = self.sim
+        sim.reset_simulation()
+        if self.integrator is not None:
+            sim.integrator = self.integrator
+        sim.running = True
+        if not self.from_reset:
+            self._set_state(row, max(row["power"], 1e-20))
+            return
+        # A GUI log starts at a reset: rods in, steady state at a source-driven power P0 that is not logged.
+        # P0 is found by a few secant iterations on the first interval (nearly linear that low).
+        origin = dict(row, time=0.0, **{name: sim.min_position for name in sim.rod_names})
+
+        def first_interval(p0):
+            self._set_state(origin, p0)
+            self._step(origin, row)
+            return sim.power - row["power"]
+
+        p_a, p_b = max(row["power"], 1e-20), 2.0 * max(row["power"], 1e-20)
+        f_a, f_b = first_interval(p_a), first_interval(p_b)
+        for _ in range(5):
+            if f_b == f_a or abs(f_b) <= 1e-10 * row["power"]:
+                break
+            p_a, f_a, p_b = p_b, f_b, max(p_b - f_b * (p_b - p_a) / (f_b - f_a), 1e-20)
+            f_b = first_interval(p_b)
+        if abs(f_b) > abs(f_a):
+            first_interval(p_a)
+
+    def _step(self, previous, row):
+        # Re-run one logged interval with the rods following the log
+        sim = self.sim
+        dt = row["time"] - previous["time"]
+        if dt <= 0:
+            return
+        n_sub = max(1, int(np.ceil(dt / self.max_step - 1e-9)))
+        sub_dt = dt / n_sub
+        for j in range(1, n_sub + 1):
+            for name in sim.rod_names:
+                travel = row[name] - previous[name]
+                # Rods run at rod_speed (faster only under air) and stop at the logged position
+                step = max(sim.rod_speed, abs(travel) / dt) * sub_dt * j
+                sim.rod_positions[name] = previous[name] + np.sign(travel) * min(step, abs(travel))
+            sim.advance(sub_dt, row["source"])
+
+    def run(self):
+        """Returns a dict with the divergence statistics and replay speed."""
+        sim = self.sim
+        start = time.perf_counter()
+        rows = 0
+        previous = None
+        first_divergence = None
+        sum_sq = 0.0
+        max_log_error = max_rho_error = max_temperature_error = 0.0
+        t_start = t_end = 0.0
+        powers = []
+
+        for chunk in iter_log(self.path, self.chunk_rows):
+            if "source" in chunk:
+                sources = np.where(chunk.pop("source") > 0.5, "IN", "OUT")
+            else:
+                sources = np.full(len(chunk["time"]), self.source)
+            columns = list(chunk)
+            for values, source in zip(zip(*(chunk[name].tolist() for name in columns)), sources.tolist()):
+                row = dict(zip(columns, values))
+                row["source"] = source
+                rows += 1
+                if previous is None:
+                    self._start(row)
+                    t_start = row["time"]
+                else:
+                    if self.teacher_forcing:
+                        sim.power = max(previous["power"], 1e-20)
+                    self._step(previous, row)
+                    log_error = abs(np.log(max(sim.power, 1e-30) / max(row["power"], 1e-30)))
+                    sum_sq += log_error * log_error
+                    max_log_error = max(max_log_error, log_error)
+                    max_rho_error = max(max_rho_error, abs(sim.total_rho - row["rho"]))
+                    max_temperature_error = max(max_temperature_error, abs(sim.temperature - row["temperature"]))
+                    if first_divergence is None and log_error > np.log1p(self.rtol):
+                        first_divergence = row["time"]
+                if self.keep_power:
+                    powers.append(sim.power)
+                t_end = row["time"]
+                previous = row
+
+        wall = time.perf_counter() - start
+        duration = t_end - t_start
+        report = {
+            "path": self.path,
+            "rows": rows,
+            "duration": duration,
+            "max_log_error": max_log_error,
+            "rms_log_error": float(np.sqrt(sum_sq / (rows - 1))) if rows > 1 else 0.0,
+            "max_rho_error": max_rho_error, # cents
+            "max_temperature_error": max_temperature_error,
+            "first_divergence": first_divergence,
+            "diverged": first_divergence is not None,
+            "wall_s": wall,
+            "realtime_factor": duration / wall if wall > 0 else float("inf"),
+        }
+        if self.keep_power:
+            report["power"] = np.array(powers)
+        return report
+
+def replay_log(path, **kwargs):
+    return LogReplay(path, **kwargs).run()
+
+def replay_batch(paths, **kwargs):
+    """Replay many archived logs with one simulator; returns the reports in input order."""
+    sim = kwargs.pop("sim", None) or ReactorSimulator()
+    return [LogReplay(path, sim=sim, **kwargs).run() for path in paths]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-simulate saved session logs and report divergence from the logged power.")
+    parser.add_argument("logs", nargs="+", help="CSV or .trglog session logs")
+    parser.add_argument("--rtol", type=float, default=1e-2, help="relative power error counted as divergence")
+    parser.add_argument("--source", choices=("IN", "OUT"), default="OUT", help="source state for logs without a source column")
+    parser.add_argument("--integrator", choices=("semi-implicit", "adaptive"), default=None)
+    parser.add_argument("--mid-session", action="store_true", help="logs do not start at a reset; start from the first row")
+    args = parser.parse_args(argv)
+
+    reports = replay_batch(args.logs, rtol=args.rtol, source=args.source, integrator=args.integrator,
+                           from_reset=not args.mid_session)
+    for report in reports:
+        where = f"diverged at t={report['first_divergence']:.2f} s" if report["diverged"] else "ok"
+        print(f"{report['path']}: {report['rows']} rows, max |dlnP|={report['max_log_error']:.3g}, "
+              f"rms={report['rms_log_error']:.3g}, {report['realtime_factor']:.0f}x real time, {where}")
+    n_diverged = sum(report["diverged"] for report in reports)
+    print(f"{len(reports)} logs replayed, {n_diverged} diverged")
+    return 1 if n_diverged else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
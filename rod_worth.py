@@ -0,0 +1,98 @@
+import numpy as np
+
+# Reactivity (cents) of the core with every rod fully inserted
+ALL_RODS_IN_RHO = -750.5146318748818
+
+# Limits from the square wave and pulse procedures in manual_for_chatbot.md
+SQUARE_WAVE_MAX_DOLLARS = 1.0
+PULSE_MAX_DOLLARS = 3.0
+
+class RodWorth:
+    """Integral control-rod worth curves, in cents.
+
+    worth(x) = alpha / (4 pi) * (-L sin(2 pi beta / L) - L sin(2 pi (x - beta) / L) + 2 pi x)
+
+    The position-independent terms are computed once, and all rods are
+    evaluated in one vectorized call. alpha/beta/L may have shape (n_rods,)
+    or (N, n_rods) for ensembles; positions broadcast against them.
+    """
+
+    def __init__(self, alpha, beta, L, rod_names=None, offset=ALL_RODS_IN_RHO, max_position=960, table_step=1.0):
+        self.alpha = np.asarray(alpha, dtype=float)
+        self.beta = np.asarray(beta, dtype=float)
+        self.L = np.asarray(L, dtype=float)
+        self.rod_names = list(rod_names) if rod_names is not None else None
+        self.offset = offset
+        self.max_position = max_position
+        self.table_step = table_step
+
+        self._scale = self.alpha / 4 / np.pi
+        self._k = 2 * np.pi / self.L
+        self._const = -self.L * np.sin(self._k * self.beta)
+        self._table = None
+
+    @classmethod
+    def from_params(cls, rod_names, rod_params, **kwargs):
+        alpha = [rod_params[name]["alpha"] for name in rod_names]
+        beta = [rod_params[name]["beta"] for name in rod_names]
+        L = [rod_params[name]["L"] for name in rod_names]
+        return cls(alpha, beta, L, rod_names=rod_names, **kwargs)
+
+    def rod_worths(self, positions):
+        x = np.asarray(positions, dtype=float)
+        return self._scale * (self._const - self.L * np.sin(self._k * (x - self.beta)) + 2 * np.pi * x)
+
+    def total(self, positions):
+        # Core reactivity from the rods, in cents (what calculate_rod_rho returns)
+        return self.offset + self.rod_worths(positions).sum(axis=-1)
+
+    def differential(self, positions):
+        # d(worth)/dx in cents per unit of travel
+        x = np.asarray(positions, dtype=float)
+        return self.alpha / 2 * (1 - np.cos(self._k * (x - self.beta)))
+
+    # Dense tables (single reactor only)
+
+    def table(self):
+        if self._table is None:
+            if self.alpha.ndim != 1:
+                raise ValueError("worth tables are only available for a single set of rod parameters")
+            grid = np.arange(0, self.max_position + self.table_step, self.table_step, dtype=float)
+            grid[-1] = min(grid[-1], self.max_position)
+            worths = self.rod_worths(grid[:, None]) - self.rod_worths(np.zeros_like(self.alpha))
+            self._table = (grid, worths)
+        return self._table
+
+    def _rod_index(self, name):
+        if self.rod_names is None:
+            raise ValueError("rod names are required for lookups by name")
+        return self.rod_names.index(name)
+
+    def worth_at(self, name, position):
+        # Worth (cents) gained by withdrawing `name` from 0 to `position`, interpolated from the table
+        grid, worths = self.table()
+        return np.interp(position, grid, worths[:, self._rod_index(name)])
+
+    def position_for_worth(self, name, worth):
+        # Inverse lookup: withdrawal position at which `name` has added `worth` cents
+        grid, worths = self.table()
+        column = worths[:, self._rod_index(name)]
+        if np.any(np.asarray(worth) < column[0]) or np.any(np.asarray(worth) > column[-1]):
+            raise ValueError(f"{name} worth is limited to {column[-1]:.2f} cents")
+        return np.interp(worth, column, grid)
+
+    def total_worth(self, name):
+        grid, worths = self.table()
+        return worths[-1, self._rod_index(name)]
+
+    def square_wave_position(self, dollars, name="Tran"):
+        # TR position whose withdrawal from 0 inserts `dollars` of reactivity
+        if not 0 < dollars < SQUARE_WAVE_MAX_DOLLARS:
+            raise ValueError(f"square wave insertion must be below ${SQUARE_WAVE_MAX_DOLLARS:.2f}")
+        return self.position_for_worth(name, dollars * 100)
+
+    def pulse_start_position(self, dollars, name="Tran"):
+        # Pre-pulse TR position so that firing it to fully withdrawn inserts `dollars`
+        if not 0 < dollars <= PULSE_MAX_DOLLARS:
+            raise ValueError(f"pulse insertion must not exceed ${PULSE_MAX_DOLLARS:.2f}")
+        return self.position_for_worth(name, self.total_worth(name) - dollars * 100)
@@ -0,0 +1,442 @@
+import argparse
+import json
+import math
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+
+from clock import SimulationClock
+from simulation import MAX_SPEED, ReactorSimulator
+
+# Line-delimited JSON over TCP. Each request line gets one reply line with the same "id":
+#   {"id": 1, "cmd": "create"}                                      -> {"id": 1, "ok": true, "session": "s1"}
+#   {"id": 2, "cmd": "subscribe", "session": "s1", "every": 2}      state every 2nd tick: {"event": "state", ...}
+#   {"id": 3, "cmd": "start", "session": "s1"}                      also "hold", "scram", "reset", "fire"
+#   {"id": 4, "cmd": "rod", "session": "s1", "rod": "Tran", "target": 480}
+#   {"id": 5, "cmd": "rod", "session": "s1", "rod": "Reg", "direction": "up"}   (up, down or stop: holding a button)
+#   {"id": 6, "cmd": "source", "session": "s1", "state": "IN"}      also "speed" (value), "demand" (power, W),
+#                                                                  "mode" (mode, optional cylinder)
+#   {"id": 7, "cmd": "stats"}                                       per-session tick latency and loop counters
+# Errors come back as {"id": ..., "ok": false, "error": "..."}. A session whose step fails is closed and its
+# subscribers get {"event": "error", "session": "s1", "error": "..."}.
+COMMANDS = ("create", "close", "list", "stats", "state", "subscribe", "unsubscribe", "start", "hold", "scram",
+            "reset", "rod", "source", "speed", "mode", "fire", "demand")
+
+def _number(value):
+    # JSON has no inf/nan (e.g. the stable period at exactly critical)
+    return value if math.isfinite(value) else None
+
+def _finite(request, key, low=-math.inf, high=math.inf, label=None):
+    # A request field as a float; Python's json accepts NaN and Infinity, which must not reach the simulator
+    label = label or key
+    try:
+        value = float(request[key])
+    except KeyError:
+        raise ValueError(f"Missing field: {key!r}") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} must be a number") from None
+    if not (math.isfinite(value) and low <= value <= high):
+        raise ValueError(f"{label} must be a finite number in [{low:g}, {high:g}]")
+    return value
+
+class Session:
+    """One student's simulator plus its console inputs, subscribers and tick timings."""
+
+    def __init__(self, session_id):
+        self.id = session_id
+        self.sim = ReactorSimulator()
+        self.source_state = "OUT"
+        self.speed = 1.0
+        self.subscribers = {} # connection -> send state every n ticks
+        self.ticks = 0
+        self.latencies = deque(maxlen=200) # from the tick falling due to this session's step finishing
+        self.step_times = deque(maxlen=200)
+
+    def state(self):
+        sim = self.sim
+        return {
+            "session": self.id,
+            "tick": self.ticks,
+            "time": sim.current_time,
+            "running": sim.running,
+            "scram": sim.scram_active,
+            "mode": sim.modes.state,
+            "power": sim.power,
+            "rho": sim.total_rho,
+            "temperature": sim.temperature,
+            "period": _number(sim.stable_period()),
+            "rods": dict(sim.rod_positions),
+            "source": self.source_state,
+            "speed": self.speed,
+        }
+
+    def report(self):
+        report = {"ticks": self.ticks, "subscribers": len(self.subscribers)}
+        if self.latencies:
+            latencies = np.fromiter(self.latencies, dtype=float) * 1e3
+            step_times = np.fromiter(self.step_times, dtype=float) * 1e3
+            report.update({
+                "latency_mean_ms": float(latencies.mean()),
+                "latency_p95_ms": float(np.percentile(latencies, 95)),
+                "latency_max_ms": float(latencies.max()),
+                "step_mean_ms": float(step_times.mean()),
+            })
+        return report
+
+class _Connection:
+    """A client's outgoing lines, written by their own thread so a slow client never holds up the stepping loop.
+
+    Replies always queue; state messages are dropped (and counted) once `max_queued` lines are waiting.
+    """
+
+    def __init__(self, wfile, max_queued=256):
+        self.wfile = wfile
+        self.max_queued = max_queued
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, name="ServerConnection", daemon=True)
+        self._thread.start()
+
+    def send(self, message, droppable=False):
+        if droppable and self._queue.qsize() >= self.max_queued:
+            self.dropped += 1
+            return
+        self._queue.put(json.dumps(message).encode("utf-8") + b"\n")
+
+    def _writer(self):
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            try:
+                self.wfile.write(line)
+                self.wfile.flush()
+            except OSError:
+                return # client went away; the reader side cleans up
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server.simulation_server
+        connection = _Connection(self.wfile)
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Requests must be JSON objects")
+                except ValueError as exc:
+                    connection.send({"id": None, "ok": False, "error": f"Bad request: {exc}"})
+                    continue
+                try:
+                    reply = server.call(server.execute, connection, request).result()
+                    reply = dict(reply, ok=True)
+                except Exception as exc:
+                    reply = {"ok": False, "error": str(exc)}
+                reply["id"] = request.get("id")
+                connection.send(reply)
+        except OSError:
+            pass # connection reset by the client
+        finally:
+            server.call(server.detach, connection)
+            connection.close()
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class SimulationServer:
+    """Hosts many ReactorSimulator sessions in one process behind a localhost TCP API.
+
+    One stepping thread advances every session by one fixed tick per
+    SimulationClock step, in a single batched loop, so 20+ classroom
+    sessions share one clock and one thread instead of one Qt app each.
+    Client commands are queued and run on the stepping thread between
+    ticks (like PhysicsWorker.call), so a simulator is only ever touched
+    by that thread. Subscribed clients get a state message every `every`
+    ticks; they keep their own history and only render.
+
+    Per session, `stats` reports the tick latency (from the tick falling
+    due to that session's step finishing, which includes waiting behind
+    the sessions stepped before it) and the step cost.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, tick=0.05, max_catch_up=5, max_sessions=64):
+        self.tick = tick
+        self.max_sessions = max_sessions
+        self.clock = SimulationClock(tick, max_catch_up)
+        self.sessions = {}
+        self.ticks = 0
+        self.late_ticks = 0
+        self.failed_sessions = 0
+        self.batch_times = deque(maxlen=200)
+        self._next_id = 1
+        self._commands = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._tcp = _TCPServer((host, port), _Handler)
+        self._tcp.simulation_server = self
+        self.address = self._tcp.server_address
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="SimulationServer", daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._tcp.serve_forever, name="SimulationServerTCP", daemon=True).start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._tcp.shutdown()
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._tcp.server_close()
+        self._drain_commands()
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the stepping thread between ticks (inline if it is not running); returns a Future."""
+        future = Future()
+        if self._thread is not None and self._thread.is_alive():
+            self._commands.put((future, fn, args))
+        else:
+            self._execute(future, fn, args)
+        return future
+
+    def _execute(self, future, fn, args):
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+
+    def _drain_commands(self):
+        while True:
+            try:
+                future, fn, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            self._execute(future, fn, args)
+
+    def _run(self):
+        clock = self.clock
+        clock.start()
+        while not self._stop.is_set():
+            self._stop.wait(clock.time_to_next())
+            self._drain_commands()
+            n_ticks = clock.due()
+            if clock.lateness > 0.005:
+                self.late_ticks += 1
+            # When the k-th of these ticks fell due
+            newest_due = clock.last - clock.accumulator
+            for k in range(n_ticks):
+                self.step_all(newest_due - (n_ticks - 1 - k) * self.tick)
+
+    def step_all(self, due=None):
+        """One tick of every session, then the state messages that fall due.
+
+        A session whose step raises is closed (its subscribers get an
+        "error" event) so the other sessions keep ticking.
+        """
+        start = time.perf_counter()
+        due = start if due is None else due
+        failed = []
+        for session in self.sessions.values():
+            step_start = time.perf_counter()
+            try:
+                session.sim.update_simulation(self.tick * session.speed, session.source_state)
+            except Exception as exc:
+                failed.append((session, exc))
+                continue
+            end = time.perf_counter()
+            session.ticks += 1
+            session.step_times.append(end - step_start)
+            session.latencies.append(end - due)
+        for session in self.sessions.values():
+            if session.subscribers:
+                state = None
+                for connection, every in session.subscribers.items():
+                    if session.ticks % every == 0:
+                        if state is None:
+                            state = dict(session.state(), event="state")
+                        connection.send(state, droppable=True)
+        for session, exc in failed:
+            self.close_failed(session, exc)
+        self.ticks += 1
+        self.batch_times.append(time.perf_counter() - start)
+
+    def close_failed(self, session, exc):
+        self.failed_sessions += 1
+        del self.sessions[session.id]
+        message = {"event": "error", "session": session.id, "error": f"Session closed: step failed: {exc!r}"}
+        for connection in session.subscribers:
+            connection.send(message)
+        print(f"Session {session.id} closed: step failed: {exc!r}", file=sys.stderr)
+
+    def detach(self, connection):
+        for session in self.sessions.values():
+            session.subscribers.pop(connection, None)
+
+    def _session(self, request):
+        session = self.sessions.get(request.get("session"))
+        if session is None:
+            raise ValueError(f"Unknown session: {request.get('session')!r}")
+        return session
+
+    def execute(self, connection, request):
+        """Carry out one client request (on the stepping thread); returns the reply fields."""
+        cmd = request.get("cmd")
+        if cmd not in COMMANDS:
+            raise ValueError(f"Unknown command: {cmd!r}")
+        if cmd == "create":
+            if len(self.sessions) >= self.max_sessions:
+                raise ValueError(f"Session limit ({self.max_sessions}) reached")
+            session_id = f"s{self._next_id}"
+            self._next_id += 1
+            self.sessions[session_id] = Session(session_id)
+            return {"session": session_id}
+        if cmd == "list":
+            return {"sessions": list(self.sessions)}
+        if cmd == "stats":
+            return {"server": self.report(), "sessions": {sid: s.report() for sid, s in self.sessions.items()}}
+
+        session = self._session(request)
+        sim = session.sim
+        if cmd == "close":
+            del self.sessions[session.id]
+        elif cmd == "state":
+            return {"state": session.state()}
+        elif cmd == "subscribe":
+            session.subscribers[connection] = max(1, int(request.get("every", 1)))
+        elif cmd == "unsubscribe":
+            session.subscribers.pop(connection, None)
+        elif cmd == "start":
+            sim.running = True
+        elif cmd == "hold":
+            sim.running = False
+        elif cmd == "scram":
+            sim.scram_active = True
+        elif cmd == "reset":
+            sim.reset_simulation()
+        elif cmd == "rod":
+            rod = request.get("rod")
+            if rod not in sim.rod_names:
+                raise ValueError(f"Unknown rod: {rod!r}")
+            if "target" in request:
+                sim.rod_targets[rod] = _finite(request, "target", sim.min_position, sim.max_position)
+            else:
+                direction = request.get("direction", "stop")
+                if direction not in ("up", "down", "stop"):
+                    raise ValueError(f"Unknown rod direction: {direction!r}")
+                sim.pressed_state[rod + "_up"] = direction == "up"
+                sim.pressed_state[rod + "_down"] = direction == "down"
+        elif cmd == "source":
+            if request.get("state") not in ("IN", "OUT"):
+                raise ValueError("Source state must be IN or OUT")
+            session.source_state = request["state"]
+        elif cmd == "speed":
+            speed = _finite(request, "value", 0.0, MAX_SPEED, label="Speed")
+            if speed <= 0:
+                raise ValueError("Speed must be a positive number")
+            session.speed = speed
+        elif cmd == "demand":
+            sim.auto_controller.demand = _finite(request, "power", 0.0)
+        elif cmd == "mode":
+            if request.get("mode") not in ("Manual", "Auto", "Square", "Pulse"):
+                raise ValueError(f"Unknown mode: {request.get('mode')!r}")
+            cylinder = _finite(request, "cylinder", sim.min_position, sim.max_position) if "cylinder" in request else None
+            if not sim.modes.select(request["mode"]):
+                raise ValueError(sim.modes.message)
+            if cylinder is not None:
+                sim.modes.cylinder_position = cylinder
+        elif cmd == "fire":
+            if not sim.modes.fire():
+                raise ValueError(sim.modes.message)
+        return {}
+
+    def report(self):
+        # Loop counters, clock drift (s) and batch time (ms) for all sessions together
+        report = {"sessions": len(self.sessions), "ticks": self.ticks, "late_ticks": self.late_ticks,
+                  "failed_sessions": self.failed_sessions, "dropped_ticks": self.clock.dropped, "drift_s": self.clock.drift}
+        if self.batch_times:
+            batch_times = np.fromiter(self.batch_times, dtype=float) * 1e3
+            report.update({"batch_mean_ms": float(batch_times.mean()), "batch_p95_ms": float(np.percentile(batch_times, 95))})
+        return report
+
+class ServerClient:
+    """Minimal blocking client for the server's JSON-lines API, for thin clients and scripts.
+
+    State messages that arrive while waiting for a reply are kept in
+    `events`; next_event() returns them in order.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, timeout=5.0):
+        self.socket = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.socket.makefile("rwb")
+        self.events = deque()
+        self._next_id = 1
+
+    def _read(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    def request(self, cmd, **params):
+        request_id = self._next_id
+        self._next_id += 1
+        self.file.write(json.dumps(dict(params, id=request_id, cmd=cmd)).encode("utf-8") + b"\n")
+        self.file.flush()
+        while True:
+            message = self._read()
+            if "event" in message:
+                self.events.append(message)
+            elif message.get("id") == request_id:
+                if not message["ok"]:
+                    raise RuntimeError(message["error"])
+                return message
+
+    def next_event(self):
+        return self.events.popleft() if self.events else self._read()
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many reactor simulator sessions behind a local TCP JSON-lines API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tick", type=float, default=0.05, help="physics tick (s of real time)")
+    parser.add_argument("--max-sessions", type=int, default=64)
+    parser.add_argument("--report", type=float, default=10.0, help="print loop and latency stats every N s (0: never)")
+    args = parser.parse_args(argv)
+
+    server = SimulationServer(args.host, args.port, tick=args.tick, max_sessions=args.max_sessions)
+    server.start()
+    print(f"Serving reactor sessions on {server.address[0]}:{server.address[1]}")
+    try:
+        while True:
+            time.sleep(args.report or 3600)
+            if args.report:
+                stats = server.call(lambda: (server.report(), {sid: s.report() for sid, s in server.sessions.items()})).result()
+                loop, sessions = stats
+                worst = max((s.get("latency_p95_ms", 0.0) for s in sessions.values()), default=0.0)
+                print(f"{loop['sessions']} sessions, {loop['ticks']} ticks, batch {loop.get('batch_mean_ms', 0.0):.2f} ms, "
+                      f"worst p95 latency {worst:.2f} ms, drift {loop['drift_s'] * 1e3:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,13 @@
 import numpy as np
+from history import HistoryBuffer
+from rod_worth import RodWorth
+from temp_feedback import TempFeedback
+from kinetics import AdaptiveKinetics
+from inhour import InhourTable
+from controller import AutoController
+from modes import ModeStateMachine
+
+MAX_SPEED = 100.0 # largest speed multiplier; a tick is sub-stepped, so its cost grows with the speed
 
 class ReactorSimulator:
     def __init__(self):
@@ -14,12 +23,15 @@ class ReactorSimulator:
             "Shim1": {"alpha": 0.5457, "beta": -212.14, "L": 1305.19},
             "Reg":   {"alpha": 0.5121, "beta": -342.84, "L": 1738.45}
         }
+        # Rebuild with RodWorth.from_params if rod_params is changed
+        self.rod_worth = RodWorth.from_params(self.rod_names, self.rod_params, max_position=self.max_position)
         # Point kinetics parameters
         self.beta_i = np.array([0.000215, 0.001424, 0.001274, 0.002568, 0.000748, 0.000273])
         self.lam_i  = np.array([0.0124,   0.0305,   0.111,    0.301,    1.14,     3.01   ])
         self.beta_eff = 0.007
         self.Lambda = 42e-6
-        self.S = 2.54e-3 # Source term
+        self.source_strength = 2.54e-3 # Source term with the source IN
+        self.S = self.source_strength # Source term
 
         # Temperature feedback parameters
         temp_data = np.array([
@@ -35,24 +47,18 @@ class ReactorSimulator:
             [950,  351,   388,  -345.62],
         ], dtype=float)
 
-        x = temp_data[:, 0] * 1000.0
-        y1 = temp_data[:, 1]
-        y2 = temp_data[:, 2]
-        y3 = temp_data[:, 3]
-        
-        Y = np.column_stack([y1, y2, y3])
-
-        self.x_mu  = x.mean()
-        self.x_sig = x.std()
-        z = (x - self.x_mu) / self.x_sig
-
-        A = np.column_stack([np.ones_like(z), z, z**2])
-        self.C_temp, *_ = np.linalg.lstsq(A, Y, rcond=None)
+        # Quadratic fit of F.Temp1, F.Temp2 and temperature reactivity vs. power (W)
+        self.temp_feedback = TempFeedback.fit(temp_data[:, 0] * 1000.0, temp_data[:, 1:])
+        self.C_temp = self.temp_feedback.C_temp
+        self.x_mu = self.temp_feedback.x_mu
+        self.x_sig = self.temp_feedback.x_sig
 
         self.rod_positions = {name: 0 for name in self.rod_names}
         self.pressed_state = {name+"_up": False for name in self.rod_names}
         self.pressed_state.update({name+"_down": False for name in self.rod_names})
         self.scram_active = False
+        self.rod_targets = {} # rod name -> position the rod is driven to at rod_speed
+        self.previous_source_state = 'OUT'
 
         # Initial conditions
         self.rod_rho = self.calculate_rod_rho()
@@ -68,37 +74,79 @@ class ReactorSimulator:
         self.temperature = 18.0
         self.current_time = 0
 
-        # Initialize and append initial state to history lists
-        self.total_rho_history = [self.total_rho]
-        self.power_history = [self.power]
-        self.temp_history = [self.temperature]
-        self.time_history = [self.current_time]
-        self.rod_data = {name: [self.rod_positions[name]] for name in self.rod_names}
-
-        F_Temp1, F_Temp2, _ = self.predict_temp_feedback(self.power)
-        self.F_Temp1_history = [F_Temp1]
-        self.F_Temp2_history = [F_Temp2]
+        # History store (seconds of simulated time kept for plotting)
+        self.history_window = 600.0
+        self.set_history_window(self.history_window)
 
         self.heat_loss_coefficient = 0.01
 
+        # Operating mode selected on the console ("Manual", "Auto", "Pulse", "Square")
+        self.mode_selected = "Manual"
+        self.auto_controller = AutoController(self)
+        self.modes = ModeStateMachine(self)
+
+        # "semi-implicit": one fixed step per advance(); "adaptive": error-controlled
+        # Rosenbrock steps inside advance() for fast transients such as pulses
+        self.integrator = "semi-implicit"
+        self.adaptive_kinetics = AdaptiveKinetics(self)
+
+    def set_history_window(self, seconds, sample_dt=0.05):
+        """Reallocate the history store to hold the last `seconds` of simulated time.
+
+        It is sized for one sample every `sample_dt` and grows if samples
+        come faster (speed below 1, a shorter tick); samples are only
+        dropped once they are older than the window.
+        """
+        self.history_window = seconds
+        columns = ["time", "rho", "power", "temperature", "F_Temp1", "F_Temp2"] + self.rod_names
+        # The reserve keeps history snapshots handed to the GUI valid for 5 s of further samples
+        self.history = HistoryBuffer(columns, int(np.ceil(seconds / sample_dt)) + 1, reserve=int(np.ceil(5.0 / sample_dt)),
+                                     grow=True)
+        self.record_history()
+
+    def record_history(self):
+        F_Temp1, F_Temp2 = self.temp_feedback.fuel_temps(self.power)
+        self.history.append(
+            [self.current_time, self.total_rho, self.power, self.temperature, F_Temp1, F_Temp2]
+            + [self.rod_positions[name] for name in self.rod_names]
+        )
+
+    # Zero-copy views of the history store, oldest sample first
+    @property
+    def time_history(self):
+        return self.history.view("time")
+
+    @property
+    def total_rho_history(self):
+        return self.history.view("rho")
+
+    @property
+    def power_history(self):
+        return self.history.view("power")
+
+    @property
+    def temp_history(self):
+        return self.history.view("temperature")
+
+    @property
+    def F_Temp1_history(self):
+        return self.history.view("F_Temp1")
+
+    @property
+    def F_Temp2_history(self):
+        return self.history.view("F_Temp2")
+
+    @property
+    def rod_data(self):
+        return {name: self.history.view(name) for name in self.rod_names}
+
     def predict_temp_feedback(self, x_new):
-        xs = np.atleast_1d(x_new).astype(float)
-        zz = (xs - self.x_mu) / self.x_sig
-        A_new = np.column_stack([np.ones_like(zz), zz, zz**2])
-        Y_hat = A_new @ self.C_temp
-        return Y_hat[0] if np.isscalar(x_new) else Y_hat
+        values, _ = self.temp_feedback.evaluate_batch(x_new)
+        return values[0] if np.isscalar(x_new) else values
 
     def predict_temp_feedback_derivative(self, x_new):
-        xs = np.atleast_1d(x_new).astype(float)
-        zz = (xs - self.x_mu) / self.x_sig
-        # Derivative of Y_hat with respect to x_new
-        # Y_hat = C0 + C1*z + C2*z^2
-        # dY/dx = dY/dz * dz/dx
-        # dz/dx = 1/x_sig
-        # dY/dz = C1 + 2*C2*z
-        dY_dz = self.C_temp[1, :] + 2 * self.C_temp[2, :] * zz.reshape(-1, 1)
-        dY_dx = dY_dz / self.x_sig
-        return dY_dx[0] if np.isscalar(x_new) else dY_dx
+        _, derivatives = self.temp_feedback.evaluate_batch(x_new)
+        return derivatives[0] if np.isscalar(x_new) else derivatives
 
     def reset_simulation_state(self):
         """Helper to set or reset the simulation state variables."""
@@ -116,44 +164,107 @@ class ReactorSimulator:
         self.power = n0
         self.C = (self.beta_i / (self.Lambda * self.lam_i)) * n0
 
-    def update_simulation(self, dt, source_state):
+    def update_simulation(self, dt, source_state, max_step=0.05):
+        if not (np.isfinite(dt) and dt > 0):
+            raise ValueError(f"Simulation step must be a positive finite number of seconds, got {dt!r}")
         if not self.running:
             self.previous_source_state = source_state # Keep track even when paused
             return
 
+        # Sub-step long frames (speed multiplier) so each integrator step stays <= max_step;
+        # only the state at the end of the frame goes into the history store
+        n_sub = max(1, int(np.ceil(dt / max_step - 1e-9)))
+        sub_dt = dt / n_sub
+        for _ in range(n_sub):
+            self.advance(sub_dt, source_state)
+
+        # Append current state to the history store and drop samples older than the window
+        self.record_history()
+        if self.current_time > self.history_window:
+            self.history.drop_before("time", self.current_time - self.history_window)
+
+    def advance(self, dt, source_state):
+        """Advance the physics by `dt` seconds without touching the history store."""
+        if self.modes.rod_moving and dt > self.modes.fine_step * (1 + 1e-9):
+            # Follow the pneumatic TR stroke in fine steps
+            n_sub = int(np.ceil(dt / self.modes.fine_step - 1e-9))
+            for _ in range(n_sub):
+                self.advance(dt / n_sub, source_state)
+            return
+
         if self.previous_source_state == 'OUT' and source_state == 'IN':
             self.power = 2.53e-3
 
         if source_state == 'IN':
-            self.S = 2.54e-3
+            self.S = self.source_strength
         else: # OUT
             self.S = 0.0
 
         self.current_time += dt
 
+        # In Auto mode the servo owns its rod (buttons and targets for it are ignored)
+        auto_rod = None
+        if self.mode_selected == "Auto" and not self.scram_active:
+            auto_velocity = self.auto_controller.update(dt)
+            auto_rod = self.auto_controller.rod
+        else:
+            self.auto_controller.active = False
+
         for name in self.rod_names:
             if self.scram_active:
                 self.rod_positions[name] = max(self.rod_positions[name] - self.rod_speed * dt, self.min_position)
+            elif self.modes.drives_rod(name):
+                self.modes.move_rod(dt)
+            elif name == auto_rod:
+                self.rod_targets.pop(name, None)
+                self.rod_positions[name] = min(max(self.rod_positions[name] + auto_velocity * dt, self.min_position), self.max_position)
+            elif name in self.rod_targets:
+                target = self.rod_targets[name]
+                if not np.isfinite(target):
+                    del self.rod_targets[name] # never reachable
+                    continue
+                target = min(max(target, self.min_position), self.max_position)
+                step = self.rod_speed * dt
+                if abs(target - self.rod_positions[name]) <= step:
+                    self.rod_positions[name] = target
+                    del self.rod_targets[name]
+                elif target > self.rod_positions[name]:
+                    self.rod_positions[name] = min(self.rod_positions[name] + step, self.max_position)
+                else:
+                    self.rod_positions[name] = max(self.rod_positions[name] - step, self.min_position)
             else:
                 if self.pressed_state[name+"_up"]:
                     self.rod_positions[name] = min(self.rod_positions[name] + self.rod_speed * dt, self.max_position)
                 if self.pressed_state[name+"_down"]:
                     self.rod_positions[name] = max(self.rod_positions[name] - self.rod_speed * dt, self.min_position)
 
+        if self.scram_active:
+            self.rod_targets.clear()
         if self.scram_active and all(pos <= self.min_position for pos in self.rod_positions.values()):
             self.scram_active = False
 
+        rod_rho_start = self.rod_rho
         self.rod_rho = self.calculate_rod_rho()
-        _, _, self.temp_rho = self.predict_temp_feedback(self.power)
-        self.total_rho = self.rod_rho + self.temp_rho
 
+        if self.integrator == "adaptive":
+            self.adaptive_kinetics.integrate(dt, rod_rho_start, self.rod_rho)
+            self.temp_rho, _ = self.temp_feedback.rho(self.power)
+            self.total_rho = self.rod_rho + self.temp_rho
+        else:
+            self.semi_implicit_step(dt)
+
+        self.temperature += (self.power * 1e-6 * 0.001) - (self.temperature - 20) * self.heat_loss_coefficient * dt
+        self.temperature = max(self.temperature, 20)
+
+        self.previous_source_state = source_state
+        self.modes.after_step(dt)
+
+    def semi_implicit_step(self, dt):
         # Semi-implicit solver for point kinetics with linearized temperature feedback
-        _, _, temp_rho_k = self.predict_temp_feedback(self.power)
-        self.temp_rho = temp_rho_k
+        # (feedback value and its derivative wrt power come from one evaluation)
+        self.temp_rho, d_rho_dP = self.temp_feedback.rho(self.power)
         self.total_rho = self.rod_rho + self.temp_rho
 
-        # Derivative of reactivity feedback wrt power
-        _, _, d_rho_dP = self.predict_temp_feedback_derivative(self.power)
         dr_dP = d_rho_dP * 0.01 * self.beta_eff
 
         # Reactivity at k-th step
@@ -200,48 +311,21 @@ class ReactorSimulator:
         # Update precursor concentrations using the new power
         self.C = (C_i_k + dt * beta_div_L * self.power) / (1.0 + dt * self.lam_i)
 
-        # Append current state to history lists
-        self.time_history.append(self.current_time)
-        self.total_rho_history.append(self.total_rho)
-        self.power_history.append(self.power)
-        self.temperature += (self.power * 1e-6 * 0.001) - (self.temperature - 20) * self.heat_loss_coefficient * dt
-        self.temperature = max(self.temperature, 20)
-        self.temp_history.append(self.temperature)
-
-        F_Temp1, F_Temp2, _ = self.predict_temp_feedback(self.power)
-        self.F_Temp1_history.append(F_Temp1)
-        self.F_Temp2_history.append(F_Temp2)
-        
-        if self.current_time > 10:
-            while self.time_history and self.time_history[0] < self.current_time - 10:
-                self.time_history.pop(0)
-                self.total_rho_history.pop(0)
-                self.power_history.pop(0)
-                self.temp_history.pop(0) if self.temp_history else None
-                self.F_Temp1_history.pop(0) if self.F_Temp1_history else None
-                self.F_Temp2_history.pop(0) if self.F_Temp2_history else None
-                for name in self.rod_names:
-                    if self.rod_data[name]:
-                        self.rod_data[name].pop(0)
-
-        for name in self.rod_names:
-            self.rod_data[name].append(self.rod_positions[name])
-        
-        self.previous_source_state = source_state
+    def stable_period(self, rho=None):
+        """Stable period (s) at reactivity `rho` in cents (default: current total_rho), from the inhour table."""
+        return InhourTable.for_simulator(self).period(self.total_rho if rho is None else rho)
 
     def calculate_rod_rho(self):
         # Per user, this returns reactivity in cents
-        rod_rho_worth = -750.5146318748818
-        for name in self.rod_names:
-            x = self.rod_positions[name]
-            p = self.rod_params[name]
-            worth = p["alpha"] / 4 / np.pi * (-p["L"] * np.sin(np.pi * 2 * p["beta"] / p["L"]) - p["L"] * np.sin(2 * np.pi * (x - p["beta"]) / p["L"]) + 2 * x * np.pi)
-            rod_rho_worth += worth
-        return rod_rho_worth
+        return float(self.rod_worth.total([self.rod_positions[name] for name in self.rod_names]))
 
     def reset_simulation(self):
         self.running = False
         self.scram_active = False
+        self.rod_targets.clear()
+        self.auto_controller.reset()
+        self.modes.reset()
+        self.mode_selected = "Manual"
         self.current_time = 0
         self.rod_positions = {name: 0 for name in self.rod_names}
         
@@ -257,24 +341,6 @@ class ReactorSimulator:
         self.C = (self.beta_i / (self.Lambda * self.lam_i)) * self.power
         self.temperature = 18.0
 
-        # Clear and re-append initial state to history lists
-        self.total_rho_history.clear()
-        self.power_history.clear()
-        self.temp_history.clear()
-        self.time_history.clear()
-        self.rod_data = {name: [] for name in self.rod_names}
-
-        self.F_Temp1_history.clear()
-        self.F_Temp2_history.clear()
-
-        self.time_history.append(self.current_time)
-        self.total_rho_history.append(self.total_rho)
-        self.power_history.append(self.power)
-        self.temp_history.append(self.temperature)
-
-        F_Temp1, F_Temp2, _ = self.predict_temp_feedback(self.power)
-        self.F_Temp1_history.append(F_Temp1)
-        self.F_Temp2_history.append(F_Temp2)
-
-        for name in self.rod_names:
-            self.rod_data[name].append(self.rod_positions[name])
+        # Clear and re-append initial state to the history store
+        self.history.clear()
+        self.record_history()
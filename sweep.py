@@ -0,0 +1,203 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from headless import HeadlessRunner, Scenario
+from rod_worth import RodWorth
+from simulation import ReactorSimulator
+
+# Swept names are ReactorSimulator attributes ("heat_loss_coefficient", "source_strength", "Lambda", ...)
+# or rod parameters written "<rod>.<alpha|beta|L>", e.g. "Shim1.alpha"
+PARAMETER_ALIASES = {"S": "source_strength"}
+METRICS = ("final_power", "peak_power", "energy", "final_temperature", "peak_temperature", "final_rho", "wall_s")
+
+def check_parameter(sim, name):
+    name = PARAMETER_ALIASES.get(name, name)
+    if "." in name:
+        rod, key = name.split(".", 1)
+        if rod not in sim.rod_params or key not in sim.rod_params[rod]:
+            raise ValueError(f"Unknown rod parameter: {name!r}")
+    elif not isinstance(getattr(sim, name, None), (int, float)) or isinstance(getattr(sim, name), bool):
+        raise ValueError(f"Unknown or non-scalar simulator parameter: {name!r}")
+    return name
+
+def apply_parameters(sim, names, values):
+    # Set one sweep point on the simulator (names as returned by check_parameter)
+    rods_changed = False
+    for name, value in zip(names, values):
+        if "." in name:
+            rod, key = name.split(".", 1)
+            sim.rod_params[rod][key] = float(value)
+            rods_changed = True
+        else:
+            setattr(sim, name, float(value))
+    if "source_strength" in names:
+        # reset_simulation() starts from the source equilibrium for sim.S, which otherwise keeps the default strength
+        sim.S = sim.source_strength
+    if rods_changed:
+        sim.rod_worth = RodWorth.from_params(sim.rod_names, sim.rod_params, max_position=sim.max_position)
+
+def _run_point(scenario, names, values, record, record_every):
+    # A fresh simulator per point (about 0.2 ms): reset_simulation() keeps state such as S and the
+    # temperature from the previous run, which would make results depend on how points were chunked
+    start = time.perf_counter()
+    sim = ReactorSimulator()
+    apply_parameters(sim, names, values)
+    trajectory = HeadlessRunner(scenario, sim).run()
+    power, t = trajectory["power"], trajectory["time"]
+    metrics = (
+        power[-1],
+        power.max(),
+        float(np.sum(0.5 * (power[1:] + power[:-1]) * np.diff(t))),
+        trajectory["temperature"][-1],
+        trajectory["temperature"].max(),
+        trajectory["rho"][-1],
+        time.perf_counter() - start,
+    )
+    return metrics, [trajectory[name][::record_every] for name in record]
+
+# Per-process state, set once by the pool initializer so tasks carry only indices and parameter values
+_worker = {}
+
+def _init_worker(scenario_dict, names, record, record_every):
+    _worker.update(scenario=Scenario.from_dict(scenario_dict), names=names, record=record, record_every=record_every)
+
+def _run_chunk(start, rows):
+    w = _worker
+    return start, [_run_point(w["scenario"], w["names"], values, w["record"], w["record_every"]) for values in rows]
+
+class ParameterSweep:
+    """Runs one Scenario for many parameter sets across a process pool.
+
+    Points come from `grid` (name -> values, Cartesian product, last name
+    varying fastest) or from `points` (list of dicts with the same keys).
+    Each worker process builds the Scenario once in the pool initializer;
+    tasks send only a start index and a chunk of parameter rows, so the
+    scenario is not pickled per task.
+
+    run() returns one structured array in point order regardless of the
+    order in which chunks finish: the swept parameters, the METRICS and,
+    for each column in `record`, that trajectory column sampled every
+    `record_every` steps. `workers=1` runs in this process.
+    """
+
+    def __init__(self, scenario, grid=None, points=None, record=(), record_every=1, workers=None, chunksize=None):
+        if isinstance(scenario, dict):
+            scenario = Scenario.from_dict(scenario)
+        if (grid is None) == (points is None):
+            raise ValueError("Give either grid or points")
+        self.scenario = scenario
+        if grid is not None:
+            keys = list(grid)
+            rows = list(itertools.product(*(grid[key] for key in keys)))
+        else:
+            keys = list(points[0]) if points else []
+            if any(set(point) != set(keys) for point in points):
+                raise ValueError("All sweep points must set the same parameters")
+            rows = [[point[key] for key in keys] for point in points]
+        sim = ReactorSimulator()
+        self.keys = keys
+        self.names = [check_parameter(sim, key) for key in keys]
+        self.values = np.array(rows, dtype=float).reshape(len(rows), len(keys))
+        self.record = tuple(record)
+        self.record_every = int(record_every)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.elapsed = 0.0
+
+        n_steps = int(round(scenario.duration / scenario.dt))
+        n_record = len(range(0, n_steps + 1, self.record_every))
+        self.dtype = np.dtype([(key, float) for key in keys] + [(name, float) for name in METRICS]
+                              + [(name, float, (n_record,)) for name in self.record])
+
+    def __len__(self):
+        return len(self.values)
+
+    def _store(self, results, start, outcomes):
+        for offset, (metrics, recorded) in enumerate(outcomes):
+            row = results[start + offset]
+            for name, value in zip(METRICS, metrics):
+                row[name] = value
+            for name, series in zip(self.record, recorded):
+                row[name] = series
+
+    def run(self, progress=None):
+        """Returns the structured results array; progress(done, total) is called as points finish."""
+        n = len(self)
+        results = np.zeros(n, dtype=self.dtype)
+        for i, key in enumerate(self.keys):
+            results[key] = self.values[:, i]
+        start_time = time.perf_counter()
+
+        if self.workers <= 1 or n <= 1:
+            for k, values in enumerate(self.values.tolist()):
+                self._store(results, k, [_run_point(self.scenario, self.names, values, self.record, self.record_every)])
+                if progress is not None:
+                    progress(k + 1, n)
+        else:
+            # A few chunks per worker keeps them all busy without per-point IPC
+            chunksize = self.chunksize or max(1, int(np.ceil(n / (4 * self.workers))))
+            initargs = (self.scenario.to_dict(), self.names, self.record, self.record_every)
+            done = 0
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                futures = [pool.submit(_run_chunk, start, self.values[start:start + chunksize].tolist())
+                           for start in range(0, n, chunksize)]
+                for future in as_completed(futures):
+                    start, outcomes = future.result()
+                    self._store(results, start, outcomes)
+                    done += len(outcomes)
+                    if progress is not None:
+                        progress(done, n)
+
+        self.elapsed = time.perf_counter() - start_time
+        return results
+
+    def points_per_second(self):
+        return len(self) / self.elapsed if self.elapsed > 0 else 0.0
+
+def save_columns(path, results):
+    # One array per field in an .npz archive, so single columns load without the rest
+    np.savez(path, **{name: results[name] for name in results.dtype.names})
+
+def load_columns(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+def _parse_values(text):
+    # "0.005,0.01,0.02" or "start:stop:count" (inclusive, evenly spaced)
+    if text.count(":") == 2:
+        start, stop, count = text.split(":")
+        return np.linspace(float(start), float(stop), int(count)).tolist()
+    return [float(v) for v in text.split(",")]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep simulator parameters over a scenario on a process pool.")
+    parser.add_argument("scenario", help="scenario JSON file (see headless.Scenario)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUES",
+                        help='e.g. heat_loss_coefficient=0.005,0.01 or Shim1.alpha=0.4:0.6:5 (repeatable)')
+    parser.add_argument("--record", action="append", default=[], help="trajectory column to keep (repeatable)")
+    parser.add_argument("--record-every", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep.npz")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for item in args.param:
+        name, _, values = item.partition("=")
+        grid[name] = _parse_values(values)
+    sweep = ParameterSweep(Scenario.load(args.scenario), grid=grid, record=args.record,
+                           record_every=args.record_every, workers=args.workers)
+
+    def progress(done, total):
+        print(f"\r{done}/{total} points", end="", file=sys.stderr, flush=True)
+    results = sweep.run(progress)
+    print(file=sys.stderr)
+    save_columns(args.out, results)
+    print(f"{len(sweep)} points in {sweep.elapsed:.2f} s ({sweep.points_per_second():.1f}/s, {sweep.workers} workers) -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+
+class TempFeedback:
+    """Quadratic fit of fuel temperatures and temperature reactivity vs. power.
+
+    Y(x) = C0 + C1 z + C2 z^2 with z = (x - x_mu) / x_sig, one column per
+    output (F.Temp1, F.Temp2, rho in cents). rho() (value and derivative,
+    for the kinetics step) and fuel_temps() use plain float arithmetic in
+    Horner form and also work elementwise on arrays; evaluate_batch()
+    returns stacked (n, 3) arrays like the old lstsq path.
+    """
+
+    def __init__(self, C_temp, x_mu, x_sig):
+        self.C_temp = np.asarray(C_temp, dtype=float)
+        self.x_mu = float(x_mu)
+        self.x_sig = float(x_sig)
+        self._inv_sig = 1.0 / self.x_sig
+        (self._t1_0, self._t2_0, self._rho_0), (self._t1_1, self._t2_1, self._rho_1), (self._t1_2, self._t2_2, self._rho_2) = self.C_temp.tolist()
+
+    @classmethod
+    def fit(cls, power, outputs):
+        # Least-squares quadratic in standardized power; outputs has one column per fitted quantity
+        x = np.asarray(power, dtype=float)
+        x_mu = x.mean()
+        x_sig = x.std()
+        z = (x - x_mu) / x_sig
+        A = np.column_stack([np.ones_like(z), z, z**2])
+        C_temp, *_ = np.linalg.lstsq(A, np.asarray(outputs, dtype=float), rcond=None)
+        return cls(C_temp, x_mu, x_sig)
+
+    def rho(self, x):
+        # Temperature reactivity (cents) and its derivative wrt power, for the kinetics step
+        z = (x - self.x_mu) * self._inv_sig
+        return self._rho_0 + z * (self._rho_1 + self._rho_2 * z), (self._rho_1 + 2 * self._rho_2 * z) * self._inv_sig
+
+    def fuel_temps(self, x):
+        z = (x - self.x_mu) * self._inv_sig
+        return self._t1_0 + z * (self._t1_1 + self._t1_2 * z), self._t2_0 + z * (self._t2_1 + self._t2_2 * z)
+
+    def evaluate_batch(self, xs):
+        # Returns (values, derivatives), each of shape (n, 3)
+        z = (np.asarray(xs, dtype=float).reshape(-1, 1) - self.x_mu) * self._inv_sig
+        c0, c1, c2 = self.C_temp
+        return c0 + z * (c1 + c2 * z), (c1 + 2 * c2 * z) * self._inv_sig
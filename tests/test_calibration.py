@@ -0,0 +1,12 @@
+from calibration import main
+from data_logger import write_log
+from headless import HeadlessRunner, Scenario
+
+def test_main_returns_exit_status(tmp_path):
+    scenario = Scenario(duration=20.0, source="IN", events=[{"time": 1.0, "action": "rod", "rod": "Reg", "target": 400.0}])
+    trajectory = HeadlessRunner(scenario).run()
+    del trajectory["source"]
+    path = str(tmp_path / "session.csv")
+    write_log(path, trajectory, fmt="csv")
+    assert main([path, "--rods", "Reg", "--no-feedback", "--min-power", "1e-7", "--source", "IN"]) == 0
+    assert main([str(tmp_path / "missing.csv")]) == 2
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from downsample import MinMaxDownsampler
+from history import HistoryBuffer
+
+def _fill(history, t, power):
+    for row in zip(t, power):
+        history.append(row)
+
+def _series(downsampler, history, t_start):
+    downsampler.update(history)
+    return downsampler.series("power", t_start)
+
+@pytest.mark.parametrize("window, max_points, every", [(10.0, 400, 1), (10.0, 400, 7), (30.0, 999, 3), (60.0, 100, 50)])
+def test_incremental_matches_full_rebuild(window, max_points, every):
+    # Compared over the whole decimated range (t_start=-inf), so the oldest, partly scrolled out bucket counts too
+    rng = np.random.default_rng(0)
+    dt = np.tile([0.05, 0.0125, 0.0875], 1400)
+    t = np.cumsum(dt)
+    power = rng.random(len(t))
+    history = HistoryBuffer(["time", "power"], 64, grow=True)
+    incremental = MinMaxDownsampler(["power"])
+    incremental.configure(window, max_points)
+    for k in range(len(t)):
+        history.append([t[k], power[k]])
+        if k % every == 0:
+            incremental.update(history)
+        if k % 97 == 0:
+            full = MinMaxDownsampler(["power"])
+            full.configure(window, max_points)
+            for t_start in (-np.inf, t[k] - window):
+                t_inc, y_inc = _series(incremental, history, t_start)
+                t_full, y_full = _series(full, history, t_start)
+                np.testing.assert_array_equal(t_inc, t_full)
+                np.testing.assert_array_equal(y_inc, y_full)
+
+def test_buckets_hold_min_and_max_in_time_order():
+    t = np.arange(1, 201) * 0.05 # 10 s, 4 samples per 0.2 s bucket
+    power = np.sin(t * 7.0)
+    history = HistoryBuffer(["time", "power"], len(t))
+    _fill(history, t, power)
+    downsampler = MinMaxDownsampler(["power"])
+    downsampler.configure(10.0, 100)
+    t_out, y_out = _series(downsampler, history, -np.inf)
+    assert np.all(np.diff(t_out) >= 0)
+    ids = np.floor(t / downsampler.bucket_width).astype(np.int64)
+    for bucket in np.unique(ids):
+        in_bucket = (np.floor(t_out / downsampler.bucket_width).astype(np.int64) == bucket)
+        assert set(y_out[in_bucket]) == {power[ids == bucket].min(), power[ids == bucket].max()}
+
+def test_pulse_peak_survives_downsampling():
+    # A 10 ms spike in a 10 min window decimated to 200 points
+    t = np.arange(1, 600 * 200 + 1) * 0.005
+    power = np.full(len(t), 1.0)
+    peak_index = 70000
+    power[peak_index:peak_index + 2] = [5e8, 1e9]
+    history = HistoryBuffer(["time", "power"], len(t))
+    _fill(history, t, power)
+    downsampler = MinMaxDownsampler(["power"])
+    downsampler.configure(600.0, 200)
+    t_out, y_out = _series(downsampler, history, t[-1] - 600.0)
+    assert len(t_out) <= 2 * (200 // 2 + 2)
+    assert y_out.max() == 1e9
+    assert t_out[np.argmax(y_out)] == t[peak_index + 1]
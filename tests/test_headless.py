@@ -0,0 +1,12 @@
+import numpy as np
+
+from headless import HeadlessRunner, Scenario
+
+def test_trajectory_records_source_like_session_log():
+    scenario = Scenario(duration=2.0, source="IN", events=[{"time": 1.0, "action": "source", "state": "OUT"}])
+    trajectory = HeadlessRunner(scenario).run()
+    source = trajectory["source"]
+    t = trajectory["time"]
+    # Each row holds the source in effect during the step that ended there
+    np.testing.assert_array_equal(source[t <= 1.0 + 1e-9], 1.0)
+    np.testing.assert_array_equal(source[t > 1.0 + 1e-9], 0.0)
@@ -0,0 +1,27 @@
+import numpy as np
+
+from history import HistoryBuffer
+from simulation import ReactorSimulator
+
+def test_growing_buffer_keeps_order_and_absolute_indices():
+    history = HistoryBuffer(["time"], 4, reserve=2, grow=True)
+    for t in range(6):
+        history.append([t])
+    history.drop_before("time", 3) # wrap the ring before the next resize
+    snapshot = history.snapshot()
+    for t in range(6, 20):
+        history.append([t])
+    np.testing.assert_array_equal(history.view("time"), np.arange(3, 20))
+    assert history.appended == 20
+    np.testing.assert_array_equal(snapshot.view("time"), np.arange(3, 6))
+
+def test_history_covers_window_when_samples_come_faster():
+    # speed 0.25: one sample every 0.0125 s of simulated time, four times the default sizing
+    sim = ReactorSimulator()
+    sim.set_history_window(10.0)
+    sim.running = True
+    for _ in range(2000):
+        sim.update_simulation(0.0125, "OUT")
+    times = sim.history.view("time")
+    assert times[-1] - times[0] >= 10.0 - 0.0125
+    assert sim.current_time - times[0] <= 10.0 + 1e-9
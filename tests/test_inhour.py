@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from inhour import InhourTable, inhour_root_direct, inhour_roots
+from simulation import ReactorSimulator
+
+# Relative tolerance of the interpolated table against the exact dominant root
+TABLE_RTOL = 1e-3
+
+@pytest.fixture(scope="module")
+def kinetics():
+    sim = ReactorSimulator()
+    return sim.beta_i, sim.lam_i, sim.Lambda, sim.beta_eff
+
+@pytest.fixture(scope="module")
+def table(kinetics):
+    return InhourTable(*kinetics)
+
+SWEEPS = {
+    "positive": np.concatenate([np.linspace(0.5, 100.0, 60), np.linspace(100.0, 790.0, 60)]),
+    "negative": np.concatenate([np.linspace(-1490.0, -100.0, 60), np.linspace(-100.0, -0.5, 60)]),
+}
+
+@pytest.mark.parametrize("sweep", SWEEPS, ids=list(SWEEPS))
+def test_eigenvalue_roots_match_direct_root_find(kinetics, sweep):
+    rhos = SWEEPS[sweep]
+    exact = np.array([inhour_root_direct(rho, *kinetics) for rho in rhos])
+    np.testing.assert_allclose(inhour_roots(rhos, *kinetics)[:, 0], exact, rtol=1e-8)
+
+@pytest.mark.parametrize("sweep", SWEEPS, ids=list(SWEEPS))
+def test_table_matches_direct_root_find(table, kinetics, sweep):
+    rhos = SWEEPS[sweep]
+    exact = np.array([inhour_root_direct(rho, *kinetics) for rho in rhos])
+    scalar = np.array([table.omega(rho) for rho in rhos])
+    np.testing.assert_allclose(scalar, exact, rtol=TABLE_RTOL)
+    np.testing.assert_allclose(table.omega(rhos), exact, rtol=TABLE_RTOL)
+    np.testing.assert_allclose(table.period(rhos), 1.0 / exact, rtol=TABLE_RTOL)
+
+def test_table_check_within_tolerance(table):
+    assert table.check() < TABLE_RTOL
+
+def test_rho_for_period_inverts_period(table):
+    rhos = np.array([-500.0, -50.0, 50.0, 500.0])
+    np.testing.assert_allclose(table.rho_for_period(table.period(rhos)), rhos, rtol=TABLE_RTOL)
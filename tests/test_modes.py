@@ -0,0 +1,15 @@
+import benchmark
+from simulation import ReactorSimulator
+
+def test_refusal_sets_message_without_printing(capsys):
+    sim = ReactorSimulator()
+    assert not sim.modes.fire()
+    assert sim.modes.message == "Fire requires square wave or pulse ready"
+    assert capsys.readouterr().out == ""
+
+def test_plateaued_pulse_reports_no_peak():
+    # $2.83 from 50 W levels off around 450 kW before the scram: there is no turnover to time
+    results = benchmark.bench_pulse_sequence(cylinder=650.0, power=50.0)
+    assert results["peak_reached"] == 0.0
+    assert "peak_time" not in results
+    assert results["peak_power"] > 1e5
@@ -0,0 +1,29 @@
+import pytest
+
+from headless import HeadlessRunner, Scenario
+from simulation import ReactorSimulator
+
+@pytest.mark.parametrize("dt", [0.0, -0.05, float("nan"), float("inf")])
+def test_update_simulation_rejects_bad_step(dt):
+    sim = ReactorSimulator()
+    sim.running = True
+    with pytest.raises(ValueError):
+        sim.update_simulation(dt, "OUT")
+
+def test_rod_targets_stay_in_range_and_non_finite_targets_are_dropped():
+    sim = ReactorSimulator()
+    sim.running = True
+    sim.rod_targets["Tran"] = float("nan")
+    sim.rod_targets["Shim1"] = 5000.0
+    sim.rod_targets["Shim2"] = -200.0
+    for _ in range(100):
+        sim.update_simulation(0.05, "OUT")
+    assert "Tran" not in sim.rod_targets
+    assert sim.rod_positions["Tran"] == sim.min_position
+    assert sim.rod_positions["Shim1"] == sim.max_position
+    assert sim.rod_positions["Shim2"] == sim.min_position
+
+def test_headless_rejects_non_finite_rod_target():
+    scenario = Scenario(duration=1.0, events=[{"time": 0.0, "action": "rod", "rod": "Tran", "target": float("nan")}])
+    with pytest.raises(ValueError):
+        HeadlessRunner(scenario).run()
@@ -0,0 +1,13 @@
+import pytest
+
+from headless import Scenario
+from sweep import ParameterSweep
+
+def test_swept_source_strength_sets_initial_equilibrium():
+    # The source equilibrium -S * Lambda / rho0 scales with S, so each point starts in proportion to its own S
+    scenario = Scenario(duration=1.0, source="IN")
+    sweep = ParameterSweep(scenario, grid={"S": [1e-3, 2.54e-3, 5e-3]}, record=("power",), workers=1)
+    results = sweep.run()
+
+    initial = results["power"][:, 0]
+    assert initial / initial[1] == pytest.approx(results["S"] / 2.54e-3, rel=1e-9)
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from simulation import ReactorSimulator
+
+POWERS = np.array([1e-3, 1.0, 1e3, 5e4, 2.5e5, 1e6, 5e8])
+
+@pytest.fixture(scope="module")
+def feedback():
+    return ReactorSimulator().temp_feedback
+
+def test_scalar_paths_match_batch(feedback):
+    values, derivatives = feedback.evaluate_batch(POWERS)
+    for i, power in enumerate(POWERS):
+        rho, d_rho = feedback.rho(float(power))
+        t1, t2 = feedback.fuel_temps(float(power))
+        assert (t1, t2, rho) == pytest.approx(tuple(values[i]), rel=1e-12, abs=1e-12)
+        assert d_rho == pytest.approx(derivatives[i, 2], rel=1e-12, abs=1e-18)
+
+def test_rho_derivative_matches_finite_difference(feedback):
+    for power in POWERS:
+        h = max(1e-6 * power, 1e-3)
+        numeric = (feedback.rho(power + h)[0] - feedback.rho(power - h)[0]) / (2 * h)
+        assert feedback.rho(power)[1] == pytest.approx(numeric, rel=1e-6, abs=1e-15)
+
+def test_elementwise_on_arrays(feedback):
+    rho, d_rho = feedback.rho(POWERS)
+    np.testing.assert_allclose(rho, [feedback.rho(float(p))[0] for p in POWERS], rtol=1e-12)
+    np.testing.assert_allclose(d_rho, [feedback.rho(float(p))[1] for p in POWERS], rtol=1e-12)
@@ -0,0 +1,29 @@
+import time
+
+from simulation import ReactorSimulator
+from worker import PhysicsWorker
+
+def test_failing_tick_holds_simulator_and_keeps_thread():
+    sim = ReactorSimulator()
+    worker = PhysicsWorker(sim, tick=0.01)
+    sim.running = True
+    worker.set_controls("OUT", float("nan"))
+    worker.start()
+    try:
+        deadline = time.perf_counter() + 2.0
+        while worker.snapshot().error is None and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert worker.alive
+        assert not sim.running
+        assert worker.snapshot().error.startswith("Physics stopped")
+        assert worker.tick_report()["error"] == worker.snapshot().error
+
+        # Reset on the worker clears the error and ticking resumes
+        worker.set_controls("OUT", 1.0)
+        worker.call(lambda: (sim.reset_simulation(), worker.reset_error())).result()
+        sim.running = True
+        time.sleep(0.1)
+        assert worker.snapshot().error is None
+        assert worker.snapshot().current_time > 0
+    finally:
+        worker.stop()
@@ -1,30 +1,65 @@
 import sys
-import csv
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import LogLocator
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import (
     QFrame, QSizePolicy, QGroupBox,
     QApplication, QWidget, QPushButton, QLabel, QTableWidget, QTableWidgetItem,
     QVBoxLayout, QHBoxLayout, QGridLayout, QStackedLayout, QFileDialog, QHeaderView, QButtonGroup
 )
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QPixmap, QPainter, QColor
+from PyQt5.QtGui import QPixmap, QPainter, QColor, QImage
 from simulation import ReactorSimulator
+from data_logger import StreamingLogger
+from period_predictor import PeriodPredictor
+from worker import PhysicsWorker
+from profiling import StartupTimeline, FrameProfiler
+from ui_chatbot import read_manual
 
 # Import the new UI components
 from ui_top import TopPanel
 from ui_left import LeftPanel
 from ui_plots import RightPanel
 
+def _import_matplotlib():
+    # RightPanel.build_plots() imports these again; on the GUI thread that is then only a lookup
+    import matplotlib.figure
+    import matplotlib.backends.backend_qt5agg
+
+def load_startup_assets(assets, timeline):
+    # Runs on a background thread: file reads, parsing and the matplotlib import only, no widgets.
+    # Each result goes into its own Future so the window can use it as soon as it is ready.
+    loaders = [("manual", read_manual), ("image", lambda: QImage("images.jpg")), ("plots", _import_matplotlib)]
+    for name, load in loaders:
+        try:
+            with timeline.phase(f"load {name}"):
+                assets[name].set_result(load())
+        except Exception as exc:
+            assets[name].set_exception(exc)
+
 class ReactorSimulatorWindow(QWidget):
-    def __init__(self):
+    """Main window, started in stages so it appears before the slow parts are loaded.
+
+    The constructor builds only the window shell, the controls and the
+    physics worker. The chatbot manual, the panel image and the matplotlib
+    import are loaded on a background thread; update_gui() puts each one
+    in place on the GUI thread when it is ready, building the plot canvas
+    last. Each phase is recorded in `timeline` (a StartupTimeline), which is
+    printed once startup is complete.
+    """
+
+    def __init__(self, timeline=None):
         super().__init__()
+        self.timeline = timeline if timeline is not None else StartupTimeline()
         self.setWindowTitle("NETL TRIGA Reactor Simulator ver.1.3")
         self.setStyleSheet("background-color: white;")
 
-        self.sim = ReactorSimulator()
+        with self.timeline.phase("simulator"):
+            self.sim = ReactorSimulator()
+            self.period_predictor = PeriodPredictor(self.sim)
 
         self.rod_keymap = {
             Qt.Key_Q: ("Tran", "_up"), Qt.Key_A: ("Tran", "_down"),
@@ -33,16 +68,40 @@ class ReactorSimulatorWindow(QWidget):
             Qt.Key_R: ("Reg", "_up"), Qt.Key_F: ("Reg", "_down")
         }
 
-        self.init_ui()
+        with self.timeline.phase("window shell"):
+            self.init_ui()
 
-        # CSV logging modification
-        self.log_data = []
-        self.log_data.append(["time", "rho", "temperature", "power"] + self.sim.rod_names)
+        self.assets = {name: Future() for name in ("manual", "image", "plots")}
+        self.startup_complete = False
+        threading.Thread(target=load_startup_assets, args=(self.assets, self.timeline), name="StartupLoader", daemon=True).start()
+
+        with self.timeline.phase("physics worker"):
+            # Session log is streamed to disk as it is recorded; Save copies the file
+            self.logger = StreamingLogger(["time", "rho", "temperature", "power"] + self.sim.rod_names + ["source"])
+            print(f"Logging session to {self.logger.path}")
+
+            # Physics runs on its own fixed-rate thread; the GUI timer only draws the latest snapshot
+            self.worker = PhysicsWorker(self.sim, tick=0.05, predictor=self.period_predictor, on_tick=self.log_tick)
+            self.top_panel.worker = self.worker
+            self.drawn_tick = None
+            self.worker.start()
 
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_gui)
         self.timer.start(50)
 
+        # Frame instrumentation, toggled with F12 (or on from the start with TRIGA_PROFILE=<export path>)
+        self.profiler = FrameProfiler(period=0.05)
+        self.profile_path = os.environ.get("TRIGA_PROFILE") or None
+        self.profile_overlay = QLabel(self)
+        self.profile_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: white; font-family: monospace; font-size: 12px; padding: 4px;")
+        self.profile_overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.profile_overlay.hide()
+        self.profile_timer = QTimer()
+        self.profile_timer.timeout.connect(self.update_profile_overlay)
+        if self.profile_path:
+            self.set_profiling(True)
+
     def init_ui(self):
         # Define common styles here, or pass them to sub-panels
         self.default_style = """
@@ -81,8 +140,8 @@ class ReactorSimulatorWindow(QWidget):
         """
 
         self.top_panel = TopPanel(self.sim, self.default_style, self.mode_button_style)
-        self.left_panel = LeftPanel(self.sim, self.mode_button_style)
-        self.right_panel = RightPanel(self.sim, self.top_panel)
+        self.left_panel = LeftPanel(self.sim, self.mode_button_style, staged=True)
+        self.right_panel = RightPanel(self.sim, self.top_panel, staged=True)
 
         # Connect signals from TopPanel
         self.top_panel.save_data_signal.connect(self.save_data)
@@ -98,6 +157,8 @@ class ReactorSimulatorWindow(QWidget):
         layout.setColumnStretch(1, 7)
 
     def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F12:
+            self.set_profiling(not self.profiler.active)
         if event.key() in self.rod_keymap:
             rod, direction = self.rod_keymap[event.key()]
             self.sim.pressed_state[rod + direction] = True
@@ -120,10 +181,97 @@ class ReactorSimulatorWindow(QWidget):
             if key_char in self.left_panel.control_buttons:
                 self.left_panel.control_buttons[key_char].setDown(False)
 
+    def instrument(self):
+        # Runs on the physics thread between ticks, so no stage is swapped out half way through a tick
+        profiler = self.profiler
+        profiler.instrument(self, "update_gui", "frame")
+        profiler.instrument(self.right_panel, "update_plots")
+        profiler.instrument(self.right_panel, "update_status_table")
+        profiler.instrument(self.top_panel, "show_mode")
+        profiler.instrument(self.worker, "step", "physics_tick")
+        profiler.instrument(self.sim, "update_simulation")
+        profiler.instrument(self.period_predictor, "predict")
+        profiler.instrument(self.worker, "on_tick", "log_append")
+
+    def set_profiling(self, enabled):
+        """Wrap the frame and physics stages in timed spans, or take the wrappers off and export the spans."""
+        if enabled == self.profiler.active:
+            return
+        if enabled:
+            self.profiler.reset()
+            self.worker.call(self.instrument).result()
+            self.profile_timer.start(500)
+        else:
+            self.worker.call(self.profiler.remove).result()
+            self.profile_timer.stop()
+            path = self.profile_path
+            if path is None:
+                fd, path = tempfile.mkstemp(prefix=f"triga_profile_{time.strftime('%Y%m%d_%H%M%S')}_", suffix=".csv")
+                os.close(fd)
+            n_spans = self.profiler.export(path)
+            print(f"Saved {n_spans} profiling spans to {path}")
+        # The timer calls the bound method it was connected with, so reconnect it to pick up or drop the wrapper
+        self.timer.timeout.disconnect()
+        self.timer.timeout.connect(self.update_gui)
+        self.profile_overlay.setVisible(enabled)
+
+    def update_profile_overlay(self):
+        stats = self.profiler.stats()
+
+        def p50_p99(name):
+            if name not in stats:
+                return "-"
+            return f"p50 {stats[name]['p50_ms']:6.2f}  p99 {stats[name]['p99_ms']:6.2f} ms"
+        lines = [f"{label:<8}{p50_p99(name)}" for label, name in (
+            ("frame", "frame"), ("jitter", "jitter"), ("plots", "update_plots"), ("status", "update_status_table"),
+            ("physics", "physics_tick"), ("log", "log_append"))]
+        clock = self.worker.clock
+        lines.append(f"{'drift':<8}{clock.drift * 1e3:8.1f} ms  dropped {clock.dropped}")
+        self.profile_overlay.setText("\n".join(lines))
+        self.profile_overlay.adjustSize()
+        self.profile_overlay.move(self.width() - self.profile_overlay.width() - 10, self.height() - self.profile_overlay.height() - 10)
+        self.profile_overlay.raise_()
+
+    def finish_startup(self):
+        # Put each background-loaded asset in place once it is ready; at most one per frame,
+        # so the window keeps responding between them
+        for name, future in list(self.assets.items()):
+            if not future.done():
+                continue
+            del self.assets[name]
+            try:
+                asset = future.result()
+            except Exception as exc:
+                print(f"Could not load {name}: {exc}")
+                asset = None
+            with self.timeline.phase(f"show {name}"):
+                if name == "manual":
+                    self.right_panel.chatbot_panel.set_manual(asset or {})
+                elif name == "image" and asset is not None:
+                    self.left_panel.set_image(asset)
+                elif name == "plots":
+                    self.right_panel.build_plots()
+                    self.drawn_tick = None # draw the current snapshot on the new canvas
+            return
+
     def update_gui(self):
+        if self.assets:
+            self.finish_startup()
         source_state = self.top_panel.get_source_state()
-        self.sim.update_simulation(0.05, source_state)
-        self.right_panel.update_plots(self.sim)
+        # Each 50 ms physics tick advances speed x 50 ms of simulated time
+        self.worker.set_controls(source_state, self.top_panel.get_speed_value())
+        snapshot = self.worker.snapshot()
+        if snapshot.tick == self.drawn_tick:
+            return # nothing new since the last frame
+        self.drawn_tick = snapshot.tick
+        if self.startup_complete:
+            self.right_panel.update_plots(snapshot)
+        elif self.right_panel.plots_ready:
+            # The first frame on the new canvas is a full draw
+            with self.timeline.phase("first plot frame"):
+                self.right_panel.update_plots(snapshot)
+            self.startup_complete = True
+            print("Startup timeline:\n" + self.timeline.format())
         
         # Get demand value and unit from TopPanel
         demand_value = self.top_panel.get_demand_value()
@@ -131,36 +279,42 @@ class ReactorSimulatorWindow(QWidget):
         speed_value = self.top_panel.get_speed_value()
         pump_state = self.top_panel.get_pump_state()
         source_state = self.top_panel.get_source_state()
-        mode_state = self.top_panel.get_mode_state()
-        self.right_panel.update_status_table(self.sim, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state)
+        self.top_panel.show_mode(snapshot.mode_state)
+        mode_state = snapshot.mode_state.replace("_", " ")
+        self.right_panel.update_status_table(snapshot, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state, snapshot.prediction)
         
         # Update rod labels in LeftPanel
-        for name in self.sim.rod_names:
-            self.left_panel.rod_overlay.set_position(name, 960 - self.sim.rod_positions[name])
+        for name in snapshot.rod_names:
+            self.left_panel.rod_overlay.set_position(name, 960 - snapshot.rod_positions[name])
 
-        # CSV logging modification
-        if self.sim.running: # Only log if simulation is running
-            self.log_data.append([self.sim.current_time, self.sim.total_rho, self.sim.temperature, self.sim.power] + [self.sim.rod_positions[name] for name in self.sim.rod_names])
+    def log_tick(self, sim):
+        # Called on the physics thread after every tick while running
+        self.logger.log([sim.current_time, sim.total_rho, sim.temperature, sim.power] + [sim.rod_positions[name] for name in sim.rod_names]
+                        + [1.0 if sim.previous_source_state == "IN" else 0.0])
 
     def save_data(self):
-        file_path, _ = QFileDialog.getSaveFileName(self, "Save Log File", "triga_doppelganger_log.csv", "CSV Files (*.csv);;All Files (*)")
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Log File", "triga_doppelganger_log.csv", "CSV Files (*.csv);;Binary Log Files (*.trglog);;All Files (*)")
         if file_path:
-            with open(file_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerows(self.log_data)
+            self.worker.call(self.logger.save_as, file_path).result()
             print(f"Data saved to {file_path}")
 
+    def closeEvent(self, event):
+        # Unsaved session logs are discarded on a clean exit (they survive a crash)
+        self.timer.stop()
+        self.worker.stop()
+        self.set_profiling(False)
+        self.logger.close(delete=True)
+        super().closeEvent(event)
+
     def reset_simulation(self):
+        self.worker.call(self.reset_physics).result()
+        self.drawn_tick = None
+        self.right_panel.clear_plots()
+
+    def reset_physics(self):
+        # Runs on the physics thread between ticks
         self.sim.reset_simulation()
-        # Reset plots in RightPanel
-        self.right_panel.line_rho.set_data([], [])
-        self.right_panel.line_power.set_data([], [])
-        self.right_panel.line_F_Temp1.set_data([], [])
-        self.right_panel.line_F_Temp2.set_data([], [])
-        for name in self.sim.rod_names:
-            self.right_panel.rod_lines[name].set_data([], [])
-        self.right_panel.canvas.draw()
-
-        # Clear log data and re-add header
-        self.log_data.clear()
-        self.log_data.append(["time", "rho", "temperature", "power"] + self.sim.rod_names)
+        self.worker.reset_error()
+        # Start the session log and the clock drift over
+        self.logger.reset()
+        self.worker.clock.reset()
@@ -5,8 +5,41 @@ from PyQt5.QtCore import Qt
 import re
 import html
 
+MANUAL_PATH = 'manual_for_chatbot.md'
+
+def parse_manual(content):
+    sections = {}
+    parts = re.split(r'\n(?=\d+\.)', content)
+    if parts and not parts[0].strip().startswith("1."):
+        parts.pop(0)
+
+    for i, part in enumerate(parts):
+        lines = part.strip().split('\n')
+        title_line = lines[0]
+        body = '\n'.join(lines[1:]).strip()
+        
+        if "Manual Mode" in title_line:
+            sections["Manual"] = body
+        elif "Auto Mode" in title_line:
+            sections["Auto"] = body
+        elif "Square" in title_line and "Wave" in title_line:
+            sections["Square wave"] = body
+        elif "pulse" in title_line and "mode" in title_line:
+            sections["Pulse"] = body
+    return sections
+
+def read_manual(path=MANUAL_PATH):
+    # No widgets are touched, so this can run on the startup loader thread
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except FileNotFoundError:
+        print(f"Error: {path} not found.")
+        return {}
+    return parse_manual(content)
+
 class ChatbotPanel(QGroupBox):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, defer_manual=False):
         super().__init__("Chatbot", parent)
         # Base stylesheet without font-size, will be controlled by resizeEvent
         self.base_stylesheet = "QGroupBox { font-weight: bold; }"
@@ -100,7 +133,10 @@ class ChatbotPanel(QGroupBox):
 
         self.setLayout(main_layout)
 
-        self.load_manual()
+        if defer_manual:
+            self.manual_data = {} # set_manual() fills this in once the manual has been read in the background
+        else:
+            self.load_manual()
 
         self.steps = []
         self.current_step_index = 0
@@ -149,34 +185,14 @@ class ChatbotPanel(QGroupBox):
         self.separator.setVisible(visible)
 
     def load_manual(self):
-        try:
-            with open('manual_for_chatbot.md', 'r', encoding='utf-8') as f:
-                content = f.read()
-            self.manual_data = self.parse_manual_content(content)
-        except FileNotFoundError:
-            self.manual_data = {}
-            print("Error: manual_for_chatbot.md not found.")
+        self.manual_data = read_manual()
+
+    def set_manual(self, sections):
+        self.manual_data = sections
+        self.update_display()
 
     def parse_manual_content(self, content):
-        sections = {}
-        parts = re.split(r'\n(?=\d+\.)', content)
-        if parts and not parts[0].strip().startswith("1."):
-            parts.pop(0)
-
-        for i, part in enumerate(parts):
-            lines = part.strip().split('\n')
-            title_line = lines[0]
-            body = '\n'.join(lines[1:]).strip()
-            
-            if "Manual Mode" in title_line:
-                sections["Manual"] = body
-            elif "Auto Mode" in title_line:
-                sections["Auto"] = body
-            elif "Square" in title_line and "Wave" in title_line:
-                sections["Square wave"] = body
-            elif "pulse" in title_line and "mode" in title_line:
-                sections["Pulse"] = body
-        return sections
+        return parse_manual(content)
 
     def update_display(self):
         chatbot_type = self.chatbot_type_combo.currentText()
@@ -150,7 +150,7 @@ class OverlayContainer(QWidget):
         super().resizeEvent(event)
 
 class LeftPanel(QWidget):
-    def __init__(self, sim, mode_button_style, parent=None):
+    def __init__(self, sim, mode_button_style, parent=None, staged=False):
         super().__init__(parent)
         self.sim = sim
         self.mode_button_style = mode_button_style
@@ -159,8 +159,8 @@ class LeftPanel(QWidget):
 
         self.media_label = QLabel()
         self.media_label.setAlignment(Qt.AlignCenter)
-        pixmap = QPixmap("images.jpg")
-        self.media_label.setPixmap(pixmap)
+        if not staged: # otherwise set_image() is called once the image has been loaded in the background
+            self.media_label.setPixmap(QPixmap("images.jpg"))
         self.media_label.setScaledContents(True)
 
         background = QWidget()
@@ -242,6 +242,10 @@ class LeftPanel(QWidget):
         
         self.setLayout(left_layout)
 
+    def set_image(self, image):
+        # QImage can be loaded off the GUI thread; the QPixmap has to be made here
+        self.media_label.setPixmap(QPixmap.fromImage(image))
+
     def set_button_state(self, name, state):
         self.sim.pressed_state[name] = state
 
@@ -1,21 +1,74 @@
+import time
+from collections import deque
 from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QHBoxLayout, QGroupBox, QSizePolicy
 )
 from PyQt5.QtCore import Qt
-import matplotlib.pyplot as plt
-from matplotlib.ticker import LogLocator
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+import numpy as np
 
+from downsample import MinMaxDownsampler
 from ui_status import StatusPanel
 from ui_chatbot import ChatbotPanel
 
 class RightPanel(QWidget):
-    def __init__(self, sim, top_panel, parent=None):
+    def __init__(self, sim, top_panel, parent=None, staged=False):
         super().__init__(parent)
         self.sim = sim
         self.top_panel = top_panel
+        self.base_plot_window = 10 # seconds shown on the time axis at 1x speed (set from the top panel's Plot choice)
+        self.plot_window = self.base_plot_window
+        self.canvas = None
 
-        self.fig, self.axes = plt.subplots(2, 2, figsize=(12, 8))
+        self.background = None
+        self.background_size = None
+        self.x_window = (0.0, 0.0)
+        self.x_window_width = None # plot_window the x limits were last set for
+        self.x_window_lead = 0.25 # fraction of the window left empty ahead of the newest sample
+        self.frame_time_target = 0.010 # seconds per plot frame
+        self.frame_times = deque(maxlen=200)
+
+        # Long windows are decimated to about one point per horizontal pixel
+        self.max_points = 1000
+        self.downsampler = MinMaxDownsampler(["rho", "power", "F_Temp1", "F_Temp2"] + self.sim.rod_names)
+        
+        right_column = QVBoxLayout()
+        
+        canvas_container = QWidget()
+        canvas_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.canvas_layout = QVBoxLayout(canvas_container)
+        self.canvas_layout.setContentsMargins(0, 0, 0, 0)
+        self.plot_placeholder = QLabel("Loading plots...")
+        self.plot_placeholder.setAlignment(Qt.AlignCenter)
+        self.canvas_layout.addWidget(self.plot_placeholder)
+        
+        chat_status_container = QWidget()
+        chat_status_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        chat_status_layout = QHBoxLayout(chat_status_container)
+        chat_status_layout.setContentsMargins(0, 0, 0, 0)
+
+        self.status_panel = StatusPanel()
+        chat_status_layout.addWidget(self.status_panel, 3)
+
+        self.chatbot_panel = ChatbotPanel(defer_manual=staged)
+        chat_status_layout.addWidget(self.chatbot_panel, 7)
+
+        right_column.addWidget(chat_status_container, 4)
+        right_column.addWidget(canvas_container, 6)
+        
+        self.setLayout(right_column)
+
+        # Staged startup: the window calls build_plots() and chatbot_panel.set_manual() once it is on screen
+        if not staged:
+            self.build_plots()
+
+    def build_plots(self):
+        # matplotlib is imported here, not at module level, so the window can appear before it is loaded
+        from matplotlib.figure import Figure
+        from matplotlib.ticker import LogLocator
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+        self.fig = Figure(figsize=(12, 8))
+        self.axes = self.fig.subplots(2, 2)
         self.fig.tight_layout()
         self.canvas = FigureCanvas(self.fig)
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -70,39 +123,12 @@ class RightPanel(QWidget):
             line, = self.ax_rod.plot([], [], label=name)
             self.rod_lines[name] = line
         self.ax_rod.legend()
-        
-        right_column = QVBoxLayout()
-        
-        canvas_container = QWidget()
-        canvas_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        canvas_layout = QVBoxLayout(canvas_container)
-        canvas_layout.setContentsMargins(0, 0, 0, 0)
-        canvas_layout.addWidget(self.canvas)
-        
-        chat_status_container = QWidget()
-        chat_status_container.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        chat_status_layout = QHBoxLayout(chat_status_container)
-        chat_status_layout.setContentsMargins(0, 0, 0, 0)
-
-        self.status_panel = StatusPanel()
-        chat_status_layout.addWidget(self.status_panel, 3)
 
-        self.chatbot_panel = ChatbotPanel()
-        chat_status_layout.addWidget(self.chatbot_panel, 7)
-
-        right_column.addWidget(chat_status_container, 4)
-        right_column.addWidget(canvas_container, 6)
-        
-        self.setLayout(right_column)
-
-    def update_plots(self, sim_data):
-        self.line_rho.set_data(sim_data.time_history, sim_data.total_rho_history)
-        if hasattr(self, 'rho_text') and self.rho_text:
-            self.rho_text.remove()
+        # Current-value labels, updated in place every frame
         self.rho_text = self.ax_rho.annotate(
-            f"{sim_data.total_rho:.5f}",
-            xy=(sim_data.current_time, sim_data.total_rho),  
-            xytext=(-50, 5),  
+            "",
+            xy=(0, 0),
+            xytext=(-50, 5),
             textcoords='offset points',
             fontsize=10,
             color='blue',
@@ -110,19 +136,9 @@ class RightPanel(QWidget):
             va='bottom',
             bbox=dict(boxstyle="round,pad=0.2", facecolor="white", edgecolor="none", alpha=0.7)
         )
-        
-        power_floor = 2.2e-5
-        clipped_power_history = [max(p, power_floor) for p in sim_data.power_history]
-        clipped_current_power = max(sim_data.power, power_floor)
-
-        self.line_power.set_data(sim_data.time_history, clipped_power_history)
-        if hasattr(self, 'power_text') and self.power_text:
-            self.power_text.remove()
-        
-        formatted_power = self.status_panel.format_power_with_unit(clipped_current_power)
         self.power_text = self.ax_power.annotate(
-            formatted_power,
-            xy=(sim_data.current_time, clipped_current_power),
+            "",
+            xy=(0, 1),
             xytext=(-70, 0),
             textcoords='offset points',
             fontsize=10,
@@ -131,17 +147,117 @@ class RightPanel(QWidget):
             va='bottom',
             bbox=dict(boxstyle="round,pad=0.2", facecolor="white", edgecolor="none", alpha=0.7)
         )
-        
-        self.line_F_Temp1.set_data(sim_data.time_history, sim_data.F_Temp1_history)
-        self.line_F_Temp2.set_data(sim_data.time_history, sim_data.F_Temp2_history)
 
-        for ax in [self.ax_rho, self.ax_power, self.ax_rod, self.ax_temp]:
-            ax.set_xlim(sim_data.current_time - 10, sim_data.current_time)
-        
-        for name in self.sim.rod_names:
-            self.rod_lines[name].set_data(sim_data.time_history, sim_data.rod_data[name])
+        # Blitting: only these artists are redrawn each frame, on top of a cached background
+        self.animated_artists = [self.line_rho, self.line_power, self.line_F_Temp1, self.line_F_Temp2]
+        self.animated_artists += list(self.rod_lines.values())
+        self.animated_artists += [self.rho_text, self.power_text]
+        for artist in self.animated_artists:
+            artist.set_animated(True)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+        self.canvas_layout.removeWidget(self.plot_placeholder)
+        self.plot_placeholder.deleteLater()
+        self.canvas_layout.addWidget(self.canvas)
 
+    @property
+    def plots_ready(self):
+        return self.canvas is not None
+
+    def clear_plots(self):
+        if not self.plots_ready:
+            return
+        self.line_rho.set_data([], [])
+        self.line_power.set_data([], [])
+        self.line_F_Temp1.set_data([], [])
+        self.line_F_Temp2.set_data([], [])
+        for name in self.sim.rod_names:
+            self.rod_lines[name].set_data([], [])
         self.canvas.draw()
 
-    def update_status_table(self, sim_data, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state):
-        self.status_panel.update_status_table(sim_data, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state)
+    def update_plots(self, sim_data):
+        if not self.plots_ready:
+            return
+        frame_start = time.perf_counter()
+
+        # Widen the time axis when fast-forwarding so the number of plotted samples stays the same,
+        # up to the history the simulator keeps
+        self.base_plot_window = self.top_panel.get_plot_window()
+        self.plot_window = min(self.base_plot_window * max(1.0, self.top_panel.get_speed_value()), self.sim.history_window)
+
+        # The x window only jumps forward in steps, so the axes background stays valid in between
+        x_min, x_max = self.x_window
+        t = sim_data.current_time
+        if t > x_max or t < x_min or self.plot_window != self.x_window_width:
+            x_min = t - self.plot_window * (1 - self.x_window_lead)
+            x_max = x_min + self.plot_window
+            self.x_window = (x_min, x_max)
+            self.x_window_width = self.plot_window
+            for ax in [self.ax_rho, self.ax_power, self.ax_rod, self.ax_temp]:
+                ax.set_xlim(x_min, x_max)
+            self.background = None
+
+        # Only hand the visible part of the history to matplotlib, min/max decimated to the plot width
+        history = sim_data.history
+        time_history = history.view("time")
+        first = int(np.searchsorted(time_history, x_min, side="left"))
+        if len(time_history) - first > self.max_points:
+            self.downsampler.configure(self.plot_window, self.max_points)
+            self.downsampler.update(history)
+            series = {name: self.downsampler.series(name, x_min) for name in self.downsampler.columns}
+        else:
+            series = {name: (time_history[first:], history.view(name)[first:]) for name in self.downsampler.columns}
+
+        self.line_rho.set_data(*series["rho"])
+        self.rho_text.xy = (t, sim_data.total_rho)
+        self.rho_text.set_text(f"{sim_data.total_rho:.5f}")
+
+        power_floor = 2.2e-5
+        power_time, power_history = series["power"]
+        clipped_power_history = np.maximum(power_history, power_floor)
+        clipped_current_power = max(sim_data.power, power_floor)
+
+        self.line_power.set_data(power_time, clipped_power_history)
+        self.power_text.xy = (t, clipped_current_power)
+        self.power_text.set_text(self.status_panel.format_power_with_unit(clipped_current_power))
+
+        self.line_F_Temp1.set_data(*series["F_Temp1"])
+        self.line_F_Temp2.set_data(*series["F_Temp2"])
+
+        for name in self.sim.rod_names:
+            self.rod_lines[name].set_data(*series[name])
+
+        if self.background is None or self.background_size != self.canvas.get_width_height():
+            # Full redraw; on_draw recaptures the background and draws the animated artists
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.draw_animated()
+            self.canvas.blit(self.fig.bbox)
+
+        self.frame_times.append(time.perf_counter() - frame_start)
+
+    def on_draw(self, event):
+        # Called after every full draw (startup, resize, x-window shift, reset)
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.background_size = self.canvas.get_width_height()
+        self.max_points = max(2, int(self.ax_power.get_window_extent().width))
+        self.draw_animated()
+
+    def draw_animated(self):
+        for artist in self.animated_artists:
+            self.fig.draw_artist(artist)
+
+    def frame_time_report(self):
+        # Mean and 95th percentile plot frame time (ms), and the fraction of frames over target
+        if not self.frame_times:
+            return {"mean_ms": 0.0, "p95_ms": 0.0, "over_target": 0.0}
+        frame_times = np.fromiter(self.frame_times, dtype=float)
+        return {
+            "mean_ms": frame_times.mean() * 1e3,
+            "p95_ms": np.percentile(frame_times, 95) * 1e3,
+            "over_target": float(np.mean(frame_times > self.frame_time_target)),
+        }
+
+    def update_status_table(self, sim_data, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state, prediction=None):
+        self.status_panel.update_status_table(sim_data, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state, prediction)
@@ -1,5 +1,6 @@
+import numpy as np
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QGroupBox, QTableWidget, QTableWidgetItem, QHeaderView, QSizePolicy
+    QWidget, QVBoxLayout, QGroupBox, QTableWidget, QTableWidgetItem, QHeaderView, QSizePolicy, QLabel
 )
 from PyQt5.QtCore import Qt
 
@@ -11,7 +12,7 @@ class StatusPanel(QGroupBox):
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
         status_layout = QVBoxLayout()
-        self.status_table = QTableWidget(9, 4)
+        self.status_table = QTableWidget(10, 4)
         self.status_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.table_base_stylesheet = "border: none; QTableWidget::item { border: none; } gridline-color: transparent;"
         self.status_table.setStyleSheet(f"font-size: 15px; {self.table_base_stylesheet}")
@@ -21,11 +22,46 @@ class StatusPanel(QGroupBox):
         self.status_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.status_table.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.status_table.setHorizontalHeaderLabels(["Parameter", "Value"])
-        for i in range(9):
-            self.status_table.setItem(i, 0, QTableWidgetItem(f"Param {i+1}"))
-            self.status_table.setItem(i, 1, QTableWidgetItem(f"Value {i+1}"))
+
+        # Label cells are created once; value cells are persistent items whose text is
+        # only touched when the formatted value changes
+        rod_names = ["Tran", "Shim1", "Shim2", "Reg"]
+        left_rows = [("demand", "Demand:"), ("speed", "Speed:"), ("pump", "Pump:"), ("source", "Source:"), ("mode", "Mode:")]
+        left_rows += [(rod_name, f"{rod_name}:") for rod_name in rod_names]
+        right_rows = [("power", "Pow:"), ("nm", "NM:"), ("np", "NP:"), ("npp", "NPP:"), ("rho", "rho:"),
+                      ("period", "Period:"), ("peak", "Pk 3s:"), ("ftemp1", "F.Temp1:"), ("ftemp2", "F.Temp2:"), ("wtemp", "W.Temp:")]
+        self.value_items = {}
+        self.value_texts = {}
+        for col, rows in [(0, left_rows), (2, right_rows)]:
+            for row, (key, label) in enumerate(rows):
+                item_label = QTableWidgetItem(label)
+                item_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+                self.status_table.setItem(row, col, item_label)
+
+                item_value = QTableWidgetItem("-")
+                item_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.status_table.setItem(row, col + 1, item_value)
+                self.value_items[key] = item_value
+                self.value_texts[key] = "-"
+        self.rod_names = rod_names
+
+        # Slow-changing fields are refreshed every slow_update_interval ticks
+        self.slow_update_interval = 5
+        self.tick = 0
         
+        # Lines under the table: simulator errors and refused console actions, then the
+        # armed cylinder or the last pulse report
+        self.message_label = QLabel("")
+        self.message_label.setWordWrap(True)
+        self.message_label.setStyleSheet("font-size: 14px; color: #b00000;")
+        self.info_label = QLabel("")
+        self.info_label.setWordWrap(True)
+        self.info_label.setStyleSheet("font-size: 14px; color: black;")
+        self.label_texts = {self.message_label: "", self.info_label: ""}
+
         status_layout.addWidget(self.status_table)
+        status_layout.addWidget(self.message_label)
+        status_layout.addWidget(self.info_label)
         self.setLayout(status_layout)
 
     def resizeEvent(self, event):
@@ -67,141 +103,67 @@ class StatusPanel(QGroupBox):
         else:
             return f"{val:.3f} {unit}"
 
-    def update_status_table(self, sim_data, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state):
-        # Update status table with current simulation data
-        # Row 0: Demand
-        item_demand_label = QTableWidgetItem("Demand:")
-        item_demand_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(0, 0, item_demand_label)
-
-        item_demand_value = QTableWidgetItem(f"{int(demand_value)} {demand_unit}")
-        item_demand_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(0, 1, item_demand_value)
-
-        # Row 1: Speed
-        item_speed_label = QTableWidgetItem("Speed:")
-        item_speed_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(1, 0, item_speed_label)
-
-        item_speed_value = QTableWidgetItem(f"{speed_value:.1f}x")
-        item_speed_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(1, 1, item_speed_value)
-
-        # Row 2: Pump
-        item_pump_label = QTableWidgetItem("Pump:")
-        item_pump_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(2, 0, item_pump_label)
-
-        item_pump_state = QTableWidgetItem(pump_state)
-        item_pump_state.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(2, 1, item_pump_state)
-
-        # Row 3: Source
-        item_source_label = QTableWidgetItem("Source:")
-        item_source_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(3, 0, item_source_label)
-
-        item_source_state = QTableWidgetItem(source_state)
-        item_source_state.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(3, 1, item_source_state)
-
-        # Row 4: Mode
-        item_mode_label = QTableWidgetItem("Mode:")
-        item_mode_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(4, 0, item_mode_label)
-
-        item_mode_state = QTableWidgetItem(mode_state)
-        item_mode_state.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(4, 1, item_mode_state)
-
-        # Control Rods
-        rod_names = ["Tran", "Shim1", "Shim2", "Reg"]
-        for i, rod_name in enumerate(rod_names):
-            row_idx = 5 + i # Start from row 5
-            
-            item_rod_label = QTableWidgetItem(f"{rod_name}:")
-            item_rod_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-            self.status_table.setItem(row_idx, 0, item_rod_label)
-
-            # Assuming sim_data.rod_positions is a dictionary with rod names as keys
+    def format_period(self, period):
+        if period is None:
+            return "-" # not computed yet (first snapshot)
+        if not np.isfinite(period) or abs(period) >= 1000:
+            return "∞"
+        if abs(period) >= 10:
+            return f"{period:.1f} s"
+        return f"{period:.2f} s"
+
+    def set_label(self, label, text):
+        if self.label_texts[label] != text:
+            self.label_texts[label] = text
+            label.setText(text)
+
+    def format_pulse_report(self, report):
+        text = f"Pulse ${report['dollars']:.2f}: "
+        if report["peak_reached"]:
+            text += f"peak {self.format_power_with_unit(report['peak_power'])} at {report['peak_time'] * 1e3:.0f} ms"
+        else:
+            text += f"no peak before scram (max {self.format_power_with_unit(report['peak_power'])})"
+        return text + f", energy {report['energy'] / 1e6:.2f} MJ"
+
+    def format_mode_info(self, sim_data):
+        cylinder = getattr(sim_data, "cylinder", None)
+        if cylinder is not None:
+            position, dollars = cylinder
+            return f"Cylinder: {position:.0f} (${dollars:.2f})"
+        report = getattr(sim_data, "pulse_report", None)
+        if report is not None and getattr(sim_data, "mode_state", None) == "SCRAM":
+            return self.format_pulse_report(report)
+        return ""
+
+    def set_value(self, key, text):
+        if self.value_texts[key] != text:
+            self.value_texts[key] = text
+            self.value_items[key].setText(text)
+
+    def update_status_table(self, sim_data, demand_value, demand_unit, speed_value, pump_state, source_state, mode_state, prediction=None):
+        # Critical fields: every tick
+        self.set_value("power", self.format_power_with_unit(max(sim_data.power, 2.2e-5)))
+        self.set_value("rho", f"{sim_data.total_rho:.5f}")
+        if prediction is not None:
+            # Projected by PeriodPredictor from the current state and rod motion
+            self.set_value("period", self.format_period(prediction["period"]))
+            self.set_value("peak", self.format_power_with_unit(max(prediction["peak_power"], 2.2e-5)))
+        else:
+            self.set_value("period", self.format_period(sim_data.stable_period()))
+        for rod_name in self.rod_names:
             rod_position = sim_data.rod_positions.get(rod_name, 0) # Get position, default to 0 if not found
-            item_rod_value = QTableWidgetItem(f"{int(rod_position)}")
-            item_rod_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.status_table.setItem(row_idx, 1, item_rod_value)
-
-        # Row 0: Power
-        item_power_label = QTableWidgetItem("Pow:")
-        item_power_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(0, 2, item_power_label)
-
-        item_power_value = QTableWidgetItem(self.format_power_with_unit(max(sim_data.power, 2.2e-5)))
-        item_power_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(0, 3, item_power_value)
-
-        # Row 1: NM, NP, NPP
-        item_nm_label = QTableWidgetItem("NM:")
-        item_nm_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(1, 2, item_nm_label)
-        self.status_table.setItem(1, 3, QTableWidgetItem("-"))
-
-        item_np_label = QTableWidgetItem("NP:")
-        item_np_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(2, 2, item_np_label)
-        self.status_table.setItem(2, 3, QTableWidgetItem("-"))
-
-        item_npp_label = QTableWidgetItem("NPP:")
-        item_npp_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(3, 2, item_npp_label)
-        self.status_table.setItem(3, 3, QTableWidgetItem("-"))
-
-        # Row 4: rho
-        item_rho_label = QTableWidgetItem("rho:")
-        item_rho_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(4, 2, item_rho_label)
-
-        item_rho_value = QTableWidgetItem(f"{sim_data.total_rho:.5f}")
-        item_rho_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(4, 3, item_rho_value)
-
-        # Row 5: Period
-        item_period_label = QTableWidgetItem("Period:")
-        item_period_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(5, 2, item_period_label)
-        self.status_table.setItem(5, 3, QTableWidgetItem("-"))
-
-        # Row 6: F.Temp1
-        item_ftemp1_label = QTableWidgetItem("F.Temp1:")
-        item_ftemp1_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(6, 2, item_ftemp1_label)
-        item_ftemp1_value = QTableWidgetItem(f"{sim_data.F_Temp1_history[-1]:.2f}")
-        item_ftemp1_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(6, 3, item_ftemp1_value)
-
-        # Row 7: F.Temp2
-        item_ftemp2_label = QTableWidgetItem("F.Temp2:")
-        item_ftemp2_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(7, 2, item_ftemp2_label)
-        item_ftemp2_value = QTableWidgetItem(f"{sim_data.F_Temp2_history[-1]:.2f}")
-        item_ftemp2_value.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-        self.status_table.setItem(7, 3, item_ftemp2_value)
-
-        # Row 8: W.Temp
-        item_wtemp_label = QTableWidgetItem("W.Temp:")
-        item_wtemp_label.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-        self.status_table.setItem(8, 2, item_wtemp_label)
-        self.status_table.setItem(8, 3, QTableWidgetItem("-"))
-
-        # Fill the rest of the table with placeholder values
-        for row in range(9):
-            for col in range(4):
-                # Skip Demand, Speed, Pump, Source, Mode, Rods, and new columns
-                if (row == 0 and (col == 0 or col == 1 or col == 2 or col == 3)) or \
-                   (row == 1 and (col == 0 or col == 1 or col == 2 or col == 3)) or \
-                   (row == 2 and (col == 0 or col == 1 or col == 2 or col == 3)) or \
-                   (row == 3 and (col == 0 or col == 1 or col == 2 or col == 3)) or \
-                   (row == 4 and (col == 0 or col == 1 or col == 2 or col == 3)) or \
-                   (row >= 5 and row <= 8 and (col == 0 or col == 1 or col == 2 or col == 3)):
-                    continue
-                item = QTableWidgetItem(f"Row {row}, Col {col}")
-                item.setTextAlignment(Qt.AlignCenter)
-                self.status_table.setItem(row, col, item)
\ No newline at end of file
+            self.set_value(rod_name, f"{int(rod_position)}")
+        self.set_label(self.message_label, getattr(sim_data, "error", None) or getattr(sim_data, "mode_message", None) or "")
+        self.set_label(self.info_label, self.format_mode_info(sim_data))
+
+        # Operator settings and fuel temperatures: throttled
+        self.tick += 1
+        if (self.tick - 1) % self.slow_update_interval:
+            return
+        self.set_value("demand", f"{int(demand_value)} {demand_unit}")
+        self.set_value("speed", f"{speed_value:.1f}x")
+        self.set_value("pump", pump_state)
+        self.set_value("source", source_state)
+        self.set_value("mode", mode_state)
+        self.set_value("ftemp1", f"{sim_data.F_Temp1_history[-1]:.2f}")
+        self.set_value("ftemp2", f"{sim_data.F_Temp2_history[-1]:.2f}")
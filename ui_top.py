@@ -3,6 +3,9 @@ from PyQt5.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QGridLayout, QStackedLayout, QFileDialog, QHeaderView, QButtonGroup, QGroupBox, QLineEdit, QComboBox
 )
 from PyQt5.QtCore import Qt, pyqtSignal
+import numpy as np
+
+from simulation import MAX_SPEED
 
 class TopPanel(QWidget):
     save_data_signal = pyqtSignal()
@@ -11,6 +14,7 @@ class TopPanel(QWidget):
     def __init__(self, sim, default_style, mode_button_style, parent=None):
         super().__init__(parent)
         self.sim = sim
+        self.worker = None # PhysicsWorker, once the window has started it
         self.default_style = default_style
         self.mode_button_style = mode_button_style
 
@@ -63,6 +67,12 @@ class TopPanel(QWidget):
         mode_grid.addWidget(self.pulse_button, 1, 0)
         mode_grid.addWidget(self.square_button, 1, 1)
 
+        self.fire_button = QPushButton("FIRE")
+        self.fire_button.setMinimumSize(100, 50)
+        self.fire_button.setStyleSheet(self.default_style)
+        self.fire_button.clicked.connect(self.fire)
+        mode_grid.addWidget(self.fire_button, 2, 0, 1, 2)
+
         # Light Group
         self.light_on_button = QPushButton("ON")
         self.light_off_button = QPushButton("OFF")
@@ -105,6 +115,16 @@ class TopPanel(QWidget):
         speed_layout.addWidget(self.speed_input)
         speed_layout.addWidget(self.speed_apply_button)
 
+        # Plot window Group (seconds shown on the time axis at 1x speed)
+        self.plot_window_choices = {"10 s": 10.0, "1 min": 60.0, "5 min": 300.0, "10 min": 600.0}
+        self.plot_window_combo = QComboBox()
+        self.plot_window_combo.addItems(list(self.plot_window_choices))
+        self.plot_window_combo.setStyleSheet("background-color: white;" + self.default_style)
+        self.plot_window_combo.setFixedSize(90, 50)
+
+        plot_window_layout = QVBoxLayout()
+        plot_window_layout.addWidget(self.plot_window_combo)
+
         # Demand Group
         self.demand_input = QLineEdit()
         self.demand_input.setText("0") # Set default value to 0
@@ -234,6 +254,11 @@ class TopPanel(QWidget):
         speed_group.setLayout(speed_layout)
         speed_group.setMaximumWidth(100) # Limit width to prevent extra space
 
+        plot_window_group = QGroupBox("Plot")
+        plot_window_group.setStyleSheet("font-size: 16px; font-weight: bold;")
+        plot_window_group.setLayout(plot_window_layout)
+        plot_window_group.setMaximumWidth(110)
+
         light_group = QGroupBox("Light")
         light_group.setStyleSheet("font-size: 16px; font-weight: bold;")
         light_group.setLayout(light_grid)
@@ -253,6 +278,7 @@ class TopPanel(QWidget):
         
         top_button_layout.addWidget(light_group)
         top_button_layout.addWidget(speed_group)
+        top_button_layout.addWidget(plot_window_group)
         top_button_layout.addWidget(demand_group)
         top_button_layout.addWidget(pump_group)
         top_button_layout.addWidget(source_group)
@@ -262,17 +288,42 @@ class TopPanel(QWidget):
 
         self.setLayout(top_button_layout)
 
+    def call_physics(self, fn, *args):
+        # Mode changes swap the integrator and mode state, so they run on the physics thread between ticks
+        if self.worker is None:
+            return fn(*args)
+        return self.worker.call(fn, *args).result()
+
+    def select_mode(self, mode):
+        modes = self.sim.modes
+
+        def select():
+            return modes.select(mode), modes.state
+        selected, state = self.call_physics(select)
+        if not selected:
+            self.show_mode(state) # refused (e.g. Pulse above 1 kW): check the current mode's button again
+
     def select_manual(self):
-        self.sim.mode_selected = "Manual"
+        self.select_mode("Manual")
 
     def select_auto(self):
-        self.sim.mode_selected = "Auto"
+        self.select_mode("Auto")
     
     def select_pulse(self):
-        self.sim.mode_selected = "Pulse"
+        self.select_mode("Pulse")
     
     def select_square(self):
-        self.sim.mode_selected = "Square"
+        self.select_mode("Square")
+
+    def fire(self):
+        self.call_physics(self.sim.modes.fire)
+
+    def show_mode(self, state):
+        # Check the mode button matching a ModeStateMachine state (the simulator may change mode on its own)
+        button = {"AUTO": self.auto_button, "SQUARE_READY": self.square_button, "SQUARE_FIRED": self.square_button,
+                  "PULSE_READY": self.pulse_button, "PULSE_FIRED": self.pulse_button}.get(state, self.manual_button)
+        if not button.isChecked():
+            button.setChecked(True)
 
     def start_simulation(self):
         self.sim.running = True
@@ -289,6 +340,8 @@ class TopPanel(QWidget):
             unit = self.demand_unit_combo.currentText()
             self.applied_demand_value = value
             self.applied_demand_unit = unit
+            # The Auto controller tracks demand in W
+            self.sim.auto_controller.demand = value * {"W": 1.0, "kW": 1e3, "MW": 1e6}[unit]
             print(f"Demand applied: {self.applied_demand_value} {self.applied_demand_unit}")
         except ValueError:
             print("Invalid demand value entered.")
@@ -296,6 +349,11 @@ class TopPanel(QWidget):
     def apply_speed(self):
         try:
             value = float(self.speed_input.text())
+            if not np.isfinite(value) or value <= 0:
+                raise ValueError
+            if value > MAX_SPEED:
+                value = MAX_SPEED
+                self.speed_input.setText(f"{value:g}")
             self.applied_speed_value = value
             print(f"Speed applied: {self.applied_speed_value}")
         except ValueError:
@@ -316,6 +374,9 @@ class TopPanel(QWidget):
     def get_speed_value(self):
         return self.applied_speed_value
 
+    def get_plot_window(self):
+        return self.plot_window_choices[self.plot_window_combo.currentText()]
+
     def get_pump_state(self):
         if self.pump_on_button.isChecked():
             return "ON"
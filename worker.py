@@ -0,0 +1,261 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from types import MappingProxyType
+import numpy as np
+
+from clock import SimulationClock
+
+class SimSnapshot:
+    """Immutable copy of the simulator state the GUI reads each frame.
+
+    Scalars and rod positions are copied; `history` is a HistorySnapshot
+    sharing the simulator's history array, so no sample data is copied.
+    Attribute names follow ReactorSimulator so the panels accept either.
+    `period` is None when it was not computed (the first snapshot).
+    `error` is the last exception that stopped the physics, or None.
+    """
+
+    __slots__ = ("tick", "current_time", "running", "scram_active", "power", "total_rho", "rod_rho", "temp_rho",
+                 "temperature", "rod_names", "rod_positions", "history", "period", "prediction", "mode_state", "mode_message",
+                 "cylinder", "pulse_report", "error")
+
+    def __init__(self, sim, tick, prediction=None, period=None, error=None):
+        values = {
+            "tick": tick,
+            "current_time": sim.current_time,
+            "running": sim.running,
+            "scram_active": sim.scram_active,
+            "power": sim.power,
+            "total_rho": sim.total_rho,
+            "rod_rho": sim.rod_rho,
+            "temp_rho": sim.temp_rho,
+            "temperature": sim.temperature,
+            "rod_names": tuple(sim.rod_names),
+            "rod_positions": MappingProxyType(dict(sim.rod_positions)),
+            "history": sim.history.snapshot(),
+            "period": period,
+            "prediction": None if prediction is None else MappingProxyType(prediction),
+            "mode_state": sim.modes.state,
+            "mode_message": sim.modes.message,
+            # (position, $ it would insert) while a square wave or pulse is armed
+            "cylinder": (sim.modes.cylinder_position, sim.modes.cylinder_dollars())
+                        if sim.modes.state in ("SQUARE_READY", "PULSE_READY") else None,
+            "pulse_report": None if sim.modes.pulse_report is None else MappingProxyType(dict(sim.modes.pulse_report)),
+            "error": error,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SimSnapshot is immutable")
+
+    def stable_period(self):
+        return self.period
+
+    @property
+    def time_history(self):
+        return self.history.view("time")
+
+    @property
+    def total_rho_history(self):
+        return self.history.view("rho")
+
+    @property
+    def power_history(self):
+        return self.history.view("power")
+
+    @property
+    def temp_history(self):
+        return self.history.view("temperature")
+
+    @property
+    def F_Temp1_history(self):
+        return self.history.view("F_Temp1")
+
+    @property
+    def F_Temp2_history(self):
+        return self.history.view("F_Temp2")
+
+    @property
+    def rod_data(self):
+        return {name: self.history.view(name) for name in self.rod_names}
+
+class PhysicsWorker:
+    """Steps a ReactorSimulator on its own thread at a fixed tick rate.
+
+    Each tick advances `tick * speed` seconds of simulated time, then
+    publishes a SimSnapshot into a double buffer: the new snapshot goes into
+    the back slot and the front index is flipped, a single reference
+    assignment, so the GUI never waits on the physics and never sees a
+    half-written state. Simple flags (running, scram_active, pressed_state)
+    may still be set directly from the GUI; anything that restructures the
+    simulator (reset, history, logger) goes through call(), which runs on
+    the worker between ticks.
+
+    If a tick raises, the simulator is put on hold, the exception is kept
+    in `error` (and in the snapshots and tick_report) and the thread keeps
+    serving call(); reset_error(), e.g. on Reset, clears it.
+
+    The number of ticks run is set by a SimulationClock measuring real
+    time, so a late wake-up is made up with extra ticks and simulated time
+    keeps pace with the wall clock. A wake-up more than `late_tolerance`
+    after a tick fell due counts as late; more than `max_catch_up` ticks
+    owed at once are dropped, and `clock.drift` then shows how far
+    simulated time lags wall time. These counters restart whenever the
+    simulator is started, so they describe the current run.
+    """
+
+    def __init__(self, sim, tick=0.05, predictor=None, on_tick=None, late_tolerance=0.005, max_catch_up=5):
+        self.sim = sim
+        self.tick = tick
+        self.predictor = predictor
+        self.on_tick = on_tick # called with the simulator after every step while it is running
+        self.late_tolerance = late_tolerance
+        self.clock = SimulationClock(tick, max_catch_up)
+
+        # Inputs from the GUI, replaced as a whole tuple: (source_state, speed)
+        self.controls = (sim.previous_source_state, 1.0)
+
+        self.ticks = 0
+        self.late_ticks = 0
+        self.step_times = deque(maxlen=200)
+        self.error = None # str of the exception that last stopped the physics
+
+        self._commands = queue.Queue()
+        self._buffers = [None, None]
+        self._front = 0
+        # No period or prediction in the first snapshot: building the inhour and predictor tables
+        # is left to the first tick on the worker thread
+        self._publish(derived=False)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="PhysicsWorker", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._drain_commands()
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def set_controls(self, source_state, speed):
+        self.controls = (source_state, speed)
+
+    def snapshot(self):
+        return self._buffers[self._front]
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the worker between ticks (inline if it is not running); returns a Future."""
+        future = Future()
+        if self.alive:
+            self._commands.put((future, fn, args))
+        else:
+            self._execute(future, fn, args)
+        return future
+
+    def _execute(self, future, fn, args):
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+
+    def _drain_commands(self):
+        while True:
+            try:
+                future, fn, args = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            self._execute(future, fn, args)
+            try:
+                self._publish()
+            except Exception as exc:
+                self._fail(exc)
+
+    def _publish(self, derived=True):
+        # derived: also compute the stable period and the prediction, which need the inhour tables
+        period = self.sim.stable_period() if derived else None
+        prediction = self.predictor.predict() if derived and self.predictor is not None else None
+        back = 1 - self._front
+        self._buffers[back] = SimSnapshot(self.sim, self.ticks, prediction, period, self.error)
+        self._front = back
+
+    def step(self):
+        # One physics tick; also usable without the thread (e.g. headless)
+        start = time.perf_counter()
+        source_state, speed = self.controls
+        self.sim.update_simulation(self.tick * speed, source_state)
+        if self.sim.running and self.on_tick is not None:
+            self.on_tick(self.sim)
+        self.ticks += 1
+        self._publish()
+        self.step_times.append(time.perf_counter() - start)
+
+    @property
+    def dropped_ticks(self):
+        return self.clock.dropped
+
+    def reset_error(self):
+        self.error = None
+
+    def _fail(self, exc):
+        # Hold the simulator and show the error, instead of losing the thread
+        self.error = f"Physics stopped: {type(exc).__name__}: {exc}"
+        self.sim.running = False
+        print(self.error)
+        self.ticks += 1 # a new snapshot, so the GUI draws the error
+        try:
+            self._publish(derived=False)
+        except Exception:
+            pass # the old snapshot stays up; error is still reported by tick_report()
+
+    def _safe_step(self):
+        # No more ticks after an error until reset_error()
+        if self.error is not None:
+            return
+        try:
+            self.step()
+        except Exception as exc:
+            self._fail(exc)
+
+    def _run(self):
+        self.clock.start()
+        self._safe_step()
+        was_running = self.sim.running
+        while not self._stop.is_set():
+            self._stop.wait(self.clock.time_to_next())
+            self._drain_commands()
+            running = self.sim.running
+            if running and not was_running:
+                # Lateness, drops and drift are measured from Start, not from window creation
+                # (startup work such as the background matplotlib import would otherwise count)
+                self.clock.reset()
+                self.late_ticks = 0
+            was_running = running
+            n_ticks = self.clock.due()
+            if self.clock.lateness > self.late_tolerance:
+                self.late_ticks += 1
+            for _ in range(n_ticks):
+                self._safe_step()
+
+    def tick_report(self):
+        # Tick counters, clock drift (s) and mean and 95th percentile step time (ms), like RightPanel.frame_time_report
+        report = {"ticks": self.ticks, "late_ticks": self.late_ticks, "dropped_ticks": self.dropped_ticks,
+                  "drift_s": self.clock.drift, "error": self.error}
+        if not self.step_times:
+            report.update({"mean_ms": 0.0, "p95_ms": 0.0})
+        else:
+            step_times = np.fromiter(self.step_times, dtype=float)
+            report.update({"mean_ms": step_times.mean() * 1e3, "p95_ms": np.percentile(step_times, 95) * 1e3})
+        return report